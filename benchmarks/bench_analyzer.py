@@ -0,0 +1,33 @@
+"""
+Analyzer benchmark, run from repo root:
+python -m benchmarks.bench_analyzer
+"""
+from benchmarks.common import measure, random_candles
+from bot.analyzer import Analyzer
+from bot.indicators import Indicators
+
+
+def main(num_rows: int = 20000) -> None:
+    table = random_candles(num_rows)
+    Indicators().calc_indicators(table, drop_first=True)
+    table = table.drop(columns=['Next Close', 'Close Delta'])
+
+    for strategy_name in ["ADI", "CCI"]:
+        for vectorized in [True, False]:
+            spent = measure(
+                lambda: Analyzer().analyze(
+                    table,
+                    strategy_name,
+                    1e-3,
+                    vectorized=vectorized,
+                ),
+                repeat=1,
+            )
+            print(
+                f"{strategy_name}, vectorized={vectorized}: "
+                f"{spent:.3f} s per {num_rows} candles"
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,29 @@
+"""
+Indicators backends benchmark, run from repo root:
+python -m benchmarks.bench_backend
+"""
+from benchmarks.common import measure, random_candles
+from bot.indicators import Indicators, backends
+from bot.kernels import has_numba
+
+
+def main(num_rows: int = 1000000, windows: list = [12, 50, 200]) -> None:
+    table = random_candles(num_rows)
+    scale = 1000000 / num_rows
+    print(f"numba kernels: {has_numba}")
+
+    for window in windows:
+        for backend in backends:
+            indicators = Indicators(window, backend=backend)
+            spent = measure(
+                lambda: indicators.calc_indicators(table.copy()),
+                repeat=1,
+            )
+            print(
+                f"window {window}, {backend} backend: "
+                f"{spent * scale * 1000:.1f} ms per 1M candles"
+            )
+
+
+if __name__ == '__main__':
+    main()
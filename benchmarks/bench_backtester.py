@@ -0,0 +1,52 @@
+"""
+Chunked backtest scaling benchmark, run from repo root:
+python -m benchmarks.bench_backtester
+"""
+from benchmarks.common import measure, random_candles
+from bot.analyzer import Analyzer
+from bot.backtester import Backtester
+from bot.indicators import Indicators
+
+
+def main(
+    num_rows: int = 2000000,
+    workers: list = [1, 2, 4, 8],
+    indicators: list = ["ALL"],
+) -> None:
+    # about 4 years of 1m candles by default
+    table = random_candles(num_rows)
+
+    def single_pass():
+        indicator_table = table.copy()
+        Indicators().calc_indicators(
+            indicator_table,
+            indicators,
+            drop_first=True,
+        )
+        return Analyzer().analyze(
+            indicator_table.drop(columns=['Next Close', 'Close Delta']),
+            "CCI",
+            1e-3,
+        )
+
+    expected = single_pass()
+    base = measure(single_pass, repeat=1)
+    print(f"single pass: {base * 1000:.0f} ms")
+
+    for num_workers in workers:
+        backtester = Backtester(
+            table,
+            "CCI",
+            indicators,
+            num_workers=num_workers,
+        )
+        spent = measure(lambda: backtester.analyze(1e-3), repeat=1)
+        same = backtester.analyze(1e-3) == expected
+        print(
+            f"{num_workers} workers: {spent * 1000:.0f} ms, "
+            f"speedup {base / spent:.2f}, same metrics: {same}"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+"""
+EMA engine benchmark, run from repo root:
+python -m benchmarks.bench_ema
+"""
+import pandas as pd
+
+from benchmarks.common import measure, random_candles
+from bot.indicators import Indicators, calc_ema, ema_modes
+
+
+def legacy_ema(column: pd.Series, window: int) -> pd.Series:
+    """Old calculation with window shifted copies"""
+    alpha = 2 / (1 + window)
+    result = pd.Series(0.0, index=column.index)
+    coef = 0
+    for shift in range(window):
+        result += column.shift(shift).fillna(0) * ((1 - alpha) ** shift)
+        coef += (1 - alpha) ** shift
+    return result / coef
+
+
+def main(num_rows: int = 1000000, window: int = 12) -> None:
+    table = random_candles(num_rows)
+    column = table['Close']
+    values = column.to_numpy()
+    scale = 1000000 / num_rows
+
+    legacy = measure(lambda: legacy_ema(column, window))
+    print(f"legacy EMA: {legacy * scale * 1000:.1f} ms per 1M candles")
+    for mode in ema_modes:
+        spent = measure(lambda: calc_ema(values, window, mode))
+        print(f"{mode} EMA: {spent * scale * 1000:.1f} ms per 1M candles")
+
+    for mode in ema_modes:
+        spent = measure(
+            lambda: Indicators(window, mode).calc_indicators(table.copy()),
+            repeat=1,
+        )
+        print(
+            f"all indicators ({mode}): "
+            f"{spent * scale * 1000:.1f} ms per 1M candles"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,33 @@
+"""
+Feature cache benchmark, run from repo root:
+python -m benchmarks.bench_feature_cache
+"""
+from tempfile import TemporaryDirectory
+
+from benchmarks.common import measure, random_candles
+from bot.feature_cache import FeatureCache
+from bot.indicators import Indicators
+
+
+def main(num_rows: int = 1000000) -> None:
+    table = random_candles(num_rows)
+
+    spent = measure(
+        lambda: Indicators().calc_indicators(table.copy(), drop_first=True),
+        repeat=1,
+    )
+    print(f"calculation: {spent * 1000:.0f} ms per {num_rows} candles")
+
+    for dtype in ["float64", "float32"]:
+        with TemporaryDirectory() as tmp_dir:
+            cache = FeatureCache(tmp_dir, dtype=dtype)
+            spent = measure(lambda: cache.get(table), repeat=1)
+            print(f"{dtype} miss: {spent * 1000:.0f} ms")
+            spent = measure(lambda: cache.get_key(table, ["ALL"], 12))
+            print(f"{dtype} key: {spent * 1000:.0f} ms")
+            spent = measure(lambda: cache.get(table))
+            print(f"{dtype} hit: {spent * 1000:.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+"""
+OBV benchmark with growing window, run from repo root:
+python -m benchmarks.bench_obv
+"""
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import measure, random_candles
+from bot.indicators import Indicators, obv_modes
+
+
+def legacy_obv(table: pd.DataFrame, window: int) -> pd.Series:
+    """Old calculation with window shifted copies"""
+    result = pd.Series(0.0, index=table.index)
+    for i in range(window):
+        close_delta = np.sign(
+            table['Close'].shift(i).fillna(0) -
+            table['Close'].shift(i + 1).fillna(0)
+        )
+        result += close_delta * table['Volume coin'].shift(i).fillna(0)
+    return result
+
+
+def main(num_rows: int = 1000000, windows: list = [12, 50, 200, 500]):
+    table = random_candles(num_rows)
+    scale = 1000000 / num_rows
+
+    for window in windows:
+        legacy = measure(lambda: legacy_obv(table, window), repeat=1)
+        print(
+            f"window {window}, legacy OBV: "
+            f"{legacy * scale * 1000:.1f} ms per 1M candles"
+        )
+        for mode in obv_modes:
+            indicators = Indicators(window, obv_mode=mode)
+            spent = measure(
+                lambda: indicators.calc_indicators(table.copy(), ['OBV']),
+            )
+            print(
+                f"window {window}, {mode} OBV: "
+                f"{spent * scale * 1000:.1f} ms per 1M candles"
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+Klines decoding benchmark, run from repo root:
+python -m benchmarks.bench_parser_decode
+"""
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import measure
+from bot.dataset_parser import decode_klines, kline_types
+
+
+def random_batches(num_rows: int, batch_size: int = 1000) -> list:
+    """Market like klines json split to batches"""
+    rng = np.random.default_rng(0)
+    prices = 20000 + rng.normal(0, 10, (num_rows, 4))
+    rows = [
+        [
+            1499040000000 + i * 60000,
+            f"{prices[i, 0]:.8f}",
+            f"{prices[i, 1]:.8f}",
+            f"{prices[i, 2]:.8f}",
+            f"{prices[i, 3]:.8f}",
+            "148976.11427815",
+            1499040000000 + i * 60000 + 59999,
+            "2434.19055334",
+            308,
+            "1756.87402397",
+            "28.46694368",
+            "0",
+        ]
+        for i in range(num_rows)
+    ]
+    return [
+        rows[i: i + batch_size] for i in range(0, num_rows, batch_size)
+    ]
+
+
+def legacy_decode(batches: list) -> pd.DataFrame:
+    """Old decoding with concat in loop and float applying"""
+    resp = pd.DataFrame()
+    for batch in batches:
+        resp = pd.concat(
+            [resp, pd.DataFrame(batch)],
+            axis=0,
+            ignore_index=True
+        )
+    resp.sort_values(0, inplace=True, ignore_index=True)
+    df = pd.DataFrame()
+    df['Open'] = resp[1].apply(lambda x: float(x))
+    df['Close'] = resp[4].apply(lambda x: float(x))
+    df['Low'] = resp[3].apply(lambda x: float(x))
+    df['High'] = resp[2].apply(lambda x: float(x))
+    df['Volume coin'] = resp[5].apply(lambda x: float(x))
+    df['Volume usd'] = resp[7].apply(lambda x: float(x))
+    df['Open time'] = pd.to_datetime(resp[0], unit='ms')
+    df['Close time'] = pd.to_datetime(resp[6], unit='ms')
+    return df
+
+
+def decode(batches: list) -> pd.DataFrame:
+    """Decoding to preallocated arrays"""
+    num_rows = sum(len(batch) for batch in batches)
+    arrays = {
+        col: np.empty(num_rows, dtype=dtype)
+        for col, dtype in kline_types.items()
+    }
+    offset = 0
+    for batch in batches:
+        offset += decode_klines(batch, arrays, offset)
+    df = pd.DataFrame({
+        col: arrays[col] for col in [
+            'Open', 'Close', 'Low', 'High', 'Volume coin', 'Volume usd',
+        ]
+    }, copy=False)
+    df['Open time'] = arrays['Open time'].view('datetime64[ms]')
+    df['Close time'] = arrays['Close time'].view('datetime64[ms]')
+    return df
+
+
+def main() -> None:
+    for num_rows in [100000, 1000000]:
+        batches = random_batches(num_rows)
+        pd.testing.assert_frame_equal(legacy_decode(batches), decode(batches))
+        legacy = measure(lambda: legacy_decode(batches), repeat=1)
+        spent = measure(lambda: decode(batches))
+        print(
+            f"{num_rows} candles: legacy {legacy:.3f} s, "
+            f"preallocated {spent:.3f} s"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,28 @@
+"""
+Simulator benchmark, run from repo root:
+python -m benchmarks.bench_simulator
+"""
+from benchmarks.common import measure, random_candles
+from bot.indicators import Indicators
+from bot.kernels import has_numba
+from bot.simulator import Simulator
+
+
+def main(num_rows: int = 525600, withdrawal_coefs: list = [0, 0.1]) -> None:
+    # a year of 1m candles by default
+    table = random_candles(num_rows)
+    Indicators().calc_indicators(table, ['CCI'], drop_first=True)
+    table = table.reset_index(drop=True)
+    print(f"numba kernels: {has_numba}")
+
+    for withdrawal_coef in withdrawal_coefs:
+        simulator = Simulator(table, "CCI", withdrawal_coef=withdrawal_coef)
+        spent = measure(simulator.simulate)
+        print(
+            f"withdrawal coef {withdrawal_coef}: "
+            f"{spent * 1000:.1f} ms per {num_rows} candles"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,36 @@
+"""
+Time conversion benchmark, run from repo root:
+python -m benchmarks.bench_time
+"""
+from benchmarks.common import measure, random_candles
+from bot.utiles import int_to_times, time_to_int, times_to_int, times_to_str
+
+
+def main(num_rows: int = 1000000) -> None:
+    times = random_candles(num_rows)['Open time']
+    columns = {
+        'datetime64': times,
+        'ISO strings': times.astype(str),
+        'ms': times_to_int(times),
+    }
+
+    for name, column in columns.items():
+        spent = None
+        if name != 'ms':
+            spent = measure(lambda: column.apply(time_to_int), repeat=1)
+        vectorized = measure(lambda: times_to_int(column))
+        print(
+            f"{name} to ms: "
+            + (f"{spent * 1000:.0f} ms by rows, " if spent else "")
+            + f"{vectorized * 1000:.1f} ms vectorized"
+        )
+
+    ms = columns['ms']
+    spent = measure(lambda: int_to_times(ms))
+    print(f"ms to datetime64: {spent * 1000:.1f} ms")
+    spent = measure(lambda: times_to_str(ms, 's'), repeat=1)
+    print(f"ms to ISO strings: {spent * 1000:.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
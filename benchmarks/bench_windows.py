@@ -0,0 +1,37 @@
+"""
+Multi window indicators benchmark, run from repo root:
+python -m benchmarks.bench_windows
+"""
+from benchmarks.common import measure, random_candles
+from bot.indicators import Indicators
+
+
+def separate_runs(table, windows: list) -> None:
+    """Old way with table copy and full calculation for every window"""
+    for window in windows:
+        Indicators(window).calc_indicators(table.copy())
+
+
+def main(num_rows: int = 1000000, windows: list = [12, 24, 48]) -> None:
+    table = random_candles(num_rows)
+    scale = 1000000 / num_rows
+
+    for num_windows in range(1, len(windows) + 1):
+        used = windows[:num_windows]
+        separate = measure(lambda: separate_runs(table, used), repeat=1)
+        one_pass = measure(
+            lambda: Indicators().calc_indicators(
+                table.copy(),
+                windows=used,
+            ),
+            repeat=1,
+        )
+        print(
+            f"windows {used}: "
+            f"separate runs {separate * scale * 1000:.1f} ms, "
+            f"one pass {one_pass * scale * 1000:.1f} ms per 1M candles"
+        )
+
+
+if __name__ == '__main__':
+    main()
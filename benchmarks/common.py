@@ -0,0 +1,48 @@
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+
+
+def random_candles(num_rows: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Generates table with random walk candles in Parser format
+    :param num_rows: number of candles
+    :param seed: random seed
+    """
+    rng = np.random.default_rng(seed)
+    close = 20000 * np.exp(np.cumsum(rng.normal(0, 1e-3, num_rows)))
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    spread = np.abs(rng.normal(0, 5, num_rows))
+    volume = rng.exponential(100, num_rows)
+    open_time = pd.date_range("2020-01-01", periods=num_rows, freq="min")
+
+    df = pd.DataFrame()
+    df['Open'] = open_
+    df['Close'] = close
+    df['Middle'] = (df['Open'] + df['Close']) / 2
+    df['Low'] = np.minimum(open_, close) - spread
+    df['High'] = np.maximum(open_, close) + spread
+    df['Volume coin'] = volume
+    df['Volume usd'] = volume * close
+    df['Open time'] = open_time
+    df['Close time'] = open_time + pd.Timedelta(milliseconds=59999)
+    df['Middle time'] = (df['Close time'] - df['Open time']) / 2 \
+        + df['Open time']
+    df['Next Close'] = df['Close'].shift(-1).fillna(df['Close'].iloc[-1])
+    df['Close Delta'] = (df['Next Close'] - df['Close']) / df['Close']
+    return df
+
+
+def measure(func, repeat: int = 3) -> float:
+    """
+    Returns best time of function calls in seconds
+    :param func: function without arguments
+    :param repeat: number of calls
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        start = perf_counter()
+        func()
+        best = min(best, perf_counter() - start)
+    return best
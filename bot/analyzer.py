@@ -1,5 +1,6 @@
 from bot.strategist import get_strategy
 
+import numpy as np
 import pandas as pd
 
 
@@ -12,13 +13,103 @@ class Analyzer:
         table: pd.DataFrame,
         strategy_name: str,
         commission: float,
+        vectorized: bool = True,
+        strategy_params: dict = None,
     ) -> dict:
         """
         :param table: dataframe with all required info
         :param strategy_name: trading strategy name
         :param commission: comission percentage in order (from 0 to 1)
+        :param vectorized: use batch predictions instead of row by row
+        :param strategy_params: params to replace ones from settings
+        """
+        strategy = get_strategy(strategy_name, strategy_params)
+        if not vectorized:
+            return self.__analyze_by_rows(table, strategy, commission)
+
+        predictions = np.asarray(
+            strategy.predict_series(table),
+            dtype=float,
+        )[self.window-1:]
+        prices = table['Close'].to_numpy(dtype=float)[self.window-1:]
+        return self.get_result(
+            *self.calc_orders(predictions, prices),
+            commission,
+        )
+
+    @staticmethod
+    def new_orders_state() -> dict:
+        """Position and profit accounting state before the first row"""
+        return {
+            'amount': 0.0,
+            'sum_profit': 0,
+            'orders_size': 0,
+            'avg_price': 0,
+            'num_orders': 0,
+        }
+
+    @staticmethod
+    def calc_orders(
+        predictions: np.ndarray,
+        prices: np.ndarray,
+        state: dict = None,
+    ) -> tuple:
+        """
+        Position and profit accounting in one pass over arrays
+        returns sum profit, orders size and number of orders
+        :param predictions: strategy predictions for every row
+        :param prices: close prices for every row
+        :param state: state after previous rows from new_orders_state,
+        it is updated to continue accounting on the next rows
+        """
+        if state is None:
+            state = Analyzer.new_orders_state()
+        amount = state['amount']
+        sum_profit = state['sum_profit']
+        orders_size = state['orders_size']
+        avg_price = state['avg_price']
+        num_orders = state['num_orders']
+        # rows without prediction do not change the position
+        active = np.flatnonzero(predictions)
+        for pred, price in zip(
+            predictions[active].tolist(),
+            prices[active].tolist(),
+        ):
+            if pred < 0 and amount < 1:
+                num_orders += 1
+                sz = -pred * (1 - amount)
+                orders_size += sz
+                avg_price += price * sz
+                amount += sz
+            elif pred > 0 and amount > 0:
+                num_orders += 1
+                sz = pred * amount
+                buy_price = avg_price / amount
+                orders_size += sz
+                sum_profit += sz * (price - buy_price) / buy_price
+                avg_price -= sz * buy_price
+                amount -= sz
+        state.update(
+            amount=amount,
+            sum_profit=sum_profit,
+            orders_size=orders_size,
+            avg_price=avg_price,
+            num_orders=num_orders,
+        )
+        return sum_profit, orders_size, num_orders
+
+    def __analyze_by_rows(
+        self,
+        table: pd.DataFrame,
+        strategy,
+        commission: float,
+    ) -> dict:
+        """
+        Reference row by row backtest
+        :param table: dataframe with all required info
+        :param strategy: trading strategy object
+        :param commission: comission percentage in order (from 0 to 1)
         """
-        strategy = get_strategy(strategy_name)
         amount = 0.0
         sum_profit = 0
         orders_size = 0
@@ -43,7 +134,26 @@ class Analyzer:
                 sum_profit += sz * (price - buy_price) / buy_price
                 avg_price -= sz * buy_price
                 amount -= sz
+        return self.get_result(
+            sum_profit,
+            orders_size,
+            num_orders,
+            commission,
+        )
 
+    @staticmethod
+    def get_result(
+        sum_profit: float,
+        orders_size: float,
+        num_orders: int,
+        commission: float,
+    ) -> dict:
+        """
+        :param sum_profit: sum of orders profits
+        :param orders_size: total size of orders
+        :param num_orders: number of orders
+        :param commission: comission percentage in order (from 0 to 1)
+        """
         avg_profit = sum_profit / orders_size if orders_size > 0 else 0
         avg_profit_on_order = (sum_profit - orders_size * commission) / \
             num_orders if num_orders > 0 else 0
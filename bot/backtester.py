@@ -0,0 +1,119 @@
+from bot.analyzer import Analyzer
+from bot.indicators import Indicators
+from bot.strategist import get_strategy
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import os
+import pandas as pd
+
+
+def _run_chunk(task: dict) -> tuple:
+    """
+    Calculates indicators and predictions of one history segment
+    returns predictions and close prices of segment rows
+    :param task: candles with warm-up rows, strategy name and params
+    """
+    table = task['table']
+    Indicators(task['window']).calc_indicators(
+        table,
+        task['indicators'],
+        drop_first=True,
+    )
+    table = table.drop(columns=['Next Close', 'Close Delta'], errors='ignore')
+    strategy = get_strategy(task['strategy_name'], task['strategy_params'])
+    predictions = np.asarray(strategy.predict_series(table), dtype=float)
+    prices = table['Close'].to_numpy(dtype=float)
+    # rows before segment are only history for predictions
+    return predictions[task['skip']:], prices[task['skip']:]
+
+
+class Backtester:
+    """
+    Runs Analyzer on long histories by segments on process pool
+    Every segment gets window * 4 rows before it to warm up indicators
+    (the same rows drop_first drops), position state is passed from
+    segment to segment in time order
+    """
+    def __init__(
+        self,
+        table: pd.DataFrame,
+        strategy_name: str,
+        indicators: list = ["ALL"],
+        indicator_window: int = None,
+        num_workers: int = None,
+        num_chunks: int = None,
+    ):
+        """
+        :param table: dataframe with candles in Parser format
+        :param strategy_name: trading strategy name
+        :param indicators: list of needed indicators
+        :param indicator_window: indicators window (default by Indicators)
+        :param num_workers: number of processes (number of cpus by default)
+        :param num_chunks: number of segments (number of workers by default)
+        """
+        self.table = table
+        self.strategy_name = strategy_name
+        self.indicators = indicators
+        self.indicator_window = indicator_window or Indicators().window
+        self.num_workers = num_workers or os.cpu_count()
+        self.num_chunks = num_chunks or self.num_workers
+
+    def analyze(
+        self,
+        commission: float,
+        strategy_params: dict = None,
+    ) -> dict:
+        """
+        Returns the same metrics as Analyzer on the whole table
+        with indicators calculated by calc_indicators(drop_first=True)
+        :param commission: comission percentage in order (from 0 to 1)
+        :param strategy_params: params to replace ones from settings
+        """
+        # models are fitted and cached once before workers load them
+        get_strategy(self.strategy_name, strategy_params)
+        state = Analyzer.new_orders_state()
+        with ProcessPoolExecutor(self.num_workers) as executor:
+            # results are taken in time order while next segments are run
+            for predictions, prices in executor.map(
+                _run_chunk,
+                self.__get_tasks(strategy_params),
+            ):
+                Analyzer.calc_orders(predictions, prices, state)
+        return Analyzer.get_result(
+            state['sum_profit'],
+            state['orders_size'],
+            state['num_orders'],
+            commission,
+        )
+
+    def __get_tasks(self, strategy_params: dict) -> list:
+        """
+        Splits table to segments with warm-up rows
+        :param strategy_params: params to replace ones from settings
+        """
+        warm_up = self.indicator_window * 4
+        # Analyzer skips predictions of the first rows
+        skip = Analyzer.window - 1
+        num_rows = self.table.shape[0] - warm_up
+        bounds = np.linspace(
+            min(skip, max(num_rows, 0)),
+            max(num_rows, 0),
+            self.num_chunks + 1,
+        ).astype(int)
+        tasks = []
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            if start == end:
+                continue
+            tasks.append({
+                # rows after drop_first start from warm_up row
+                'table': self.table.iloc[start - skip: end + warm_up]
+                .reset_index(drop=True),
+                'window': self.indicator_window,
+                'indicators': self.indicators,
+                'strategy_name': self.strategy_name,
+                'strategy_params': strategy_params,
+                'skip': skip,
+            })
+        return tasks
@@ -0,0 +1,257 @@
+from bot.dataset_parser import Parser
+from bot.utiles import int_to_times, tf_to_minutes, time_to_int
+from bot.utiles import times_to_int
+
+from datetime import datetime
+
+import json
+import numpy as np
+import os
+import pandas as pd
+
+
+def load_table(path: str) -> pd.DataFrame:
+    """
+    Loads candles from csv file or from candle store dataset directory
+    :param path: csv file path or dataset directory like data/store/BTCUSDT_1m
+    """
+    if path.endswith('.csv'):
+        return pd.read_csv(path)
+    root, name = os.path.split(os.path.normpath(path))
+    symb, tf = name.rsplit('_', 1)
+    return CandleStore(root).load(symb, tf)
+
+
+class CandleStore:
+    """
+    Local candle storage with typed columns in binary files
+    Every dataset is a directory {symb}_{tf} with one raw file per column
+    and index.json with number of rows, rows are sorted by open time
+    """
+    # stored columns and their types, times are in ms from epoch
+    columns = {
+        'Open': 'float64',
+        'Close': 'float64',
+        'Low': 'float64',
+        'High': 'float64',
+        'Volume coin': 'float64',
+        'Volume usd': 'float64',
+        'Open time': 'int64',
+        'Close time': 'int64',
+    }
+
+    def __init__(self, root: str = "data/store"):
+        """
+        :param root: directory with datasets
+        """
+        self.root = root
+
+    def num_rows(self, symb: str, tf: str) -> int:
+        """
+        :param symb: trading pair
+        :param tf: candle timeframe
+        """
+        index_path = os.path.join(self.__path(symb, tf), 'index.json')
+        if not os.path.exists(index_path):
+            return 0
+        with open(index_path, 'r') as f:
+            return json.load(f)['num_rows']
+
+    def time_range(self, symb: str, tf: str) -> tuple:
+        """
+        First and last open times in ms or (None, None) if no data
+        :param symb: trading pair
+        :param tf: candle timeframe
+        """
+        n = self.num_rows(symb, tf)
+        if n == 0:
+            return None, None
+        times = self.__column(symb, tf, 'Open time', n)
+        return int(times[0]), int(times[-1])
+
+    def load(
+        self,
+        symb: str,
+        tf: str,
+        start_t: str = None,
+        end_t: str = None,
+        num_rows: int = None,
+    ) -> pd.DataFrame:
+        """
+        Loads candles in Parser table format reading only needed rows
+        :param symb: trading pair
+        :param tf: candle timeframe
+        :param start_t: first open time (from the beginning if None)
+        :param end_t: open time to load before (till the end if None)
+        :param num_rows: number of last rows of time slice to load
+        """
+        n = self.num_rows(symb, tf)
+        times = self.__column(symb, tf, 'Open time', n)
+        left = 0 if start_t is None else int(np.searchsorted(
+            times, time_to_int(start_t), 'left'
+        ))
+        right = n if end_t is None else int(np.searchsorted(
+            times, time_to_int(end_t), 'left'
+        ))
+        if num_rows is not None:
+            left = max(left, right - num_rows)
+        right = max(left, right)
+
+        values = {
+            col: np.array(self.__column(symb, tf, col, n)[left: right])
+            for col in self.columns
+        }
+        # next close is taken from the next stored candle if it exists
+        next_close = np.array(
+            self.__column(symb, tf, 'Close', n)[left + 1: right + 1]
+        )
+        if right > left and next_close.shape[0] < right - left:
+            next_close = np.append(next_close, values['Close'][-1])
+
+        df = pd.DataFrame()
+        df['Open'] = values['Open']
+        df['Close'] = values['Close']
+        df['Middle'] = (df['Open'] + df['Close']) / 2
+        df['Low'] = values['Low']
+        df['High'] = values['High']
+        df['Volume coin'] = values['Volume coin']
+        df['Volume usd'] = values['Volume usd']
+        df['Open time'] = int_to_times(values['Open time'])
+        df['Close time'] = int_to_times(values['Close time'])
+        df['Middle time'] = (df['Close time'] - df['Open time']) / 2 \
+            + df['Open time']
+
+        # prediction
+        df['Next Close'] = next_close
+        df['Close Delta'] = (df['Next Close'] - df['Close']) / df['Close']
+        return df
+
+    def write(self, symb: str, tf: str, table: pd.DataFrame) -> int:
+        """
+        Adds candles to dataset, appends to files if candles are newer
+        than stored ones else rewrites dataset
+        returns number of new rows
+        :param symb: trading pair
+        :param tf: candle timeframe
+        :param table: dataframe with candles in Parser format
+        """
+        new = self.__to_arrays(table)
+        n = self.num_rows(symb, tf)
+        _, last = self.time_range(symb, tf)
+        if n and new['Open time'].shape[0] and \
+                new['Open time'][0] <= last:
+            old = {
+                col: np.array(self.__column(symb, tf, col, n))
+                for col in self.columns
+            }
+            times = np.concatenate([old['Open time'], new['Open time']])
+            _, order = np.unique(times[::-1], return_index=True)
+            # keeping new candles for the same open time
+            order = times.shape[0] - 1 - order
+            new = {
+                col: np.concatenate([old[col], new[col]])[order]
+                for col in self.columns
+            }
+            num_new_rows = order.shape[0] - n
+            n = 0
+        else:
+            num_new_rows = new['Open time'].shape[0]
+
+        path = self.__path(symb, tf)
+        os.makedirs(path, exist_ok=True)
+        for col, dtype in self.columns.items():
+            mode = 'r+b' if n else 'wb'
+            with open(self.__column_path(symb, tf, col), mode) as f:
+                # dropping rows which were not committed to index
+                f.truncate(n * np.dtype(dtype).itemsize)
+                f.seek(0, os.SEEK_END)
+                f.write(new[col].astype(dtype).tobytes())
+        with open(os.path.join(path, 'index.json'), 'w') as f:
+            json.dump(
+                {'num_rows': n + new['Open time'].shape[0]},
+                f,
+            )
+        return num_new_rows
+
+    def sync(
+        self,
+        symb: str,
+        tf: str,
+        start_t: str,
+        end_t: str = None,
+        parser: Parser = None,
+    ) -> int:
+        """
+        Downloads only missing candles from start till end time
+        returns number of new rows
+        :param symb: trading pair
+        :param tf: candle timeframe
+        :param start_t: start time
+        :param end_t: end time (the last closed candle by default)
+        :param parser: Parser to download candles
+        """
+        tf_ms = tf_to_minutes(tf) * 60000
+        start = time_to_int(start_t) // tf_ms * tf_ms
+        end = time_to_int(
+            datetime.utcnow() if end_t is None else end_t
+        ) // tf_ms * tf_ms
+        if parser is None:
+            parser = Parser(symb, tf, ignore_gaps=True)
+
+        first, last = self.time_range(symb, tf)
+        ranges = [(start, end)]
+        if first is not None:
+            ranges = [
+                (start, min(end, first)),
+                (max(start, last + tf_ms), end),
+            ]
+        num_new_rows = 0
+        for range_start, range_end in ranges:
+            if range_end <= range_start:
+                continue
+            table = parser.get_table(
+                str(pd.to_datetime(range_start, unit='ms')),
+                str(pd.to_datetime(range_end, unit='ms')),
+            )
+            num_new_rows += self.write(symb, tf, table)
+        return num_new_rows
+
+    def __to_arrays(self, table: pd.DataFrame) -> dict:
+        """
+        Converts table to stored typed arrays sorted by open time
+        :param table: dataframe with candles in Parser format
+        """
+        arrays = {}
+        for col, dtype in self.columns.items():
+            if col.endswith('time'):
+                arrays[col] = times_to_int(table[col])
+            else:
+                arrays[col] = table[col].to_numpy(dtype=dtype)
+        order = np.argsort(arrays['Open time'], kind='stable')
+        return {col: values[order] for col, values in arrays.items()}
+
+    def __column(self, symb: str, tf: str, col: str, n: int) -> np.ndarray:
+        """
+        Memory mapped stored column
+        :param symb: trading pair
+        :param tf: candle timeframe
+        :param col: column name
+        :param n: number of stored rows
+        """
+        if n == 0:
+            return np.zeros(0, dtype=self.columns[col])
+        return np.memmap(
+            self.__column_path(symb, tf, col),
+            dtype=self.columns[col],
+            mode='r',
+            shape=(n,),
+        )
+
+    def __path(self, symb: str, tf: str) -> str:
+        return os.path.join(self.root, f'{symb}_{tf}')
+
+    def __column_path(self, symb: str, tf: str, col: str) -> str:
+        return os.path.join(
+            self.__path(symb, tf),
+            col.replace(' ', '_') + '.bin',
+        )
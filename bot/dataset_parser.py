@@ -1,19 +1,87 @@
 from bot.exceptions import ResponseError, RequestError
-from bot.utiles import tf_to_minutes, time_to_int
+from bot.log_writer import LogWriter, get_log_writer
+from bot.settings import Settings
+from bot.utiles import TokenBucket, int_to_times, tf_to_minutes, time_to_int
 
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from multipledispatch import dispatch
-# from pandarallel import pandarallel
+from requests.adapters import HTTPAdapter
 from time import sleep
 
-import json
+import numpy as np
 import pandas as pd
 import requests
 
+# kline columns and their types
+kline_types = {
+    'Open time': np.int64,
+    'Open': np.float64,
+    'High': np.float64,
+    'Low': np.float64,
+    'Close': np.float64,
+    'Volume coin': np.float64,
+    'Close time': np.int64,
+    'Volume usd': np.float64,
+}
+# kline columns positions in market response
+kline_fields = {
+    'Open time': 0,
+    'Open': 1,
+    'High': 2,
+    'Low': 3,
+    'Close': 4,
+    'Volume coin': 5,
+    'Close time': 6,
+    'Volume usd': 7,
+}
+
+
+def decode_klines(rows: list, arrays: dict, offset: int = 0) -> int:
+    """
+    Writes klines from market json straight to typed arrays
+    returns number of rows
+    :param rows: klines lists from market response
+    :param arrays: preallocated arrays for kline_types columns
+    :param offset: position of the first row in arrays
+    """
+    if not rows:
+        return 0
+    fields = list(zip(*rows))
+    for col, index in kline_fields.items():
+        arrays[col][offset: offset + len(rows)] = fields[index]
+    return len(rows)
+
+
+def arrays_to_table(arrays: dict) -> pd.DataFrame:
+    """
+    Builds candles table in Parser format from kline arrays
+    :param arrays: arrays for kline_types columns
+    """
+    # arrays are wrapped without copying
+    df = pd.DataFrame({
+        'Open': arrays['Open'],
+        'Close': arrays['Close'],
+    }, copy=False)
+    df['Middle'] = (df['Open'] + df['Close']) / 2
+    for col in ['Low', 'High', 'Volume coin', 'Volume usd']:
+        df[col] = arrays[col]
+    df['Open time'] = int_to_times(arrays['Open time'])
+    df['Close time'] = int_to_times(arrays['Close time'])
+    df['Middle time'] = (df['Close time'] - df['Open time']) / 2 \
+        + df['Open time']
+
+    # prediction
+    df['Next Close'] = df['Close'].shift(-1).fillna(df['Close'].iloc[-1])
+    df['Close Delta'] = (df['Next Close'] - df['Close']) / df['Close']
+    return df
+
 
 class Parser:
 
     __settings_file = "settings.json"
+    # request weight limiters shared by parsers of one market
+    __buckets = {}
 
     def __init__(
         self,
@@ -21,20 +89,34 @@ class Parser:
         tf: str = "1m",
         timezone: int = 0,
         ignore_gaps: bool = False,
+        base_url: str = "https://api.binance.com",
     ):
         """
         :param symb: trading pair
         :param tf: candle timeframe
+        :param timezone: timezone of given times
+        :param ignore_gaps: flag to not raise on missed candles
+        :param base_url: market api url
         """
         self.symb = symb
         self.tf = tf
         self.__tf_minutes = tf_to_minutes(tf)
         self.timezone = timezone
         self.ignore_gaps = ignore_gaps
+        self.base_url = base_url
         self.__update_settings()
-        f = open(self.__settings['log_file'], 'w')
-        f.close()
-        # pandarallel.initialize()
+        self.__log.clear()
+
+        # pooled connections for concurrent batches
+        self.__session = requests.Session()
+        self.__session.mount(base_url, HTTPAdapter(
+            pool_maxsize=self.__settings['num_workers'],
+        ))
+        if base_url not in self.__buckets:
+            self.__buckets[base_url] = TokenBucket(
+                self.__settings['weight_per_minute'],
+            )
+        self.__bucket = self.__buckets[base_url]
 
     @dispatch(str, str)
     def get_table(self, start_t: str, end_t: str) -> pd.DataFrame:
@@ -69,76 +151,96 @@ class Parser:
         :param limit: num candles from start
         """
         self.__update_settings()
-        with open(self.__settings['log_file'], 'a') as f:
-            print("Start time:", start_t, "Limit: ", limit, file=f)
-        resp = self.__get_table(
+        self.__log.log(
+            'get_table',
+            symbol=self.symb,
+            start=start_t,
+            limit=limit,
+        )
+        arrays = self.__get_table(
             time_to_int(start_t) - self.timezone * 60 * 60000,
             limit,
         )
-        resp.sort_values(0, inplace=True, ignore_index=True)
-
-        df = pd.DataFrame()
-        df['Open'] = resp[1].apply(lambda x: float(x))
-        df['Close'] = resp[4].apply(lambda x: float(x))
-        df['Middle'] = (df['Open'] + df['Close']) / 2
-        df['Low'] = resp[3].apply(lambda x: float(x))
-        df['High'] = resp[2].apply(lambda x: float(x))
-        df['Volume coin'] = resp[5].apply(lambda x: float(x))
-        df['Volume usd'] = resp[7].apply(lambda x: float(x))
-        df['Open time'] = pd.to_datetime(resp[0], unit='ms')
-        df['Close time'] = pd.to_datetime(resp[6], unit='ms')
-        df['Middle time'] = (df['Close time'] - df['Open time']) / 2 \
-            + df['Open time']
-
-        # prediction
-        df['Next Close'] = df['Close'].shift(-1).fillna(df['Close'].iloc[-1])
-        df['Close Delta'] = (df['Next Close'] - df['Close']) / df['Close']
-        return df
-
-    def __get_table(self, start_t: int, limit: int) -> pd.DataFrame:
+
+        return arrays_to_table(arrays)
+
+    def __get_table(self, start_t: int, limit: int) -> dict:
         # rounding
         start_t //= (self.__tf_minutes * 60000)
         start_t *= (self.__tf_minutes * 60000)
-        with open(self.__settings['log_file'], 'a') as f:
-            print("Start from:", start_t, ", Num rows:", limit, file=f)
-        res = pd.DataFrame()
-        while limit > 0:
-            query_second = datetime.now()
-            limit_delta = min(self.__settings['batch_size'], limit)
-            resp = self.__get_response(start_t, limit_delta)
-            res = pd.concat(
-                [res, pd.DataFrame(resp.json())],
-                axis=0,
-                ignore_index=True
-            )
-            limit -= limit_delta
+        self.__log.log(
+            'download',
+            symbol=self.symb,
+            start=start_t,
+            limit=limit,
+        )
+        # splitting to non overlapping batches [start, start + limit)
+        batches = []
+        offset = 0
+        while offset < limit:
+            limit_delta = min(self.__settings['batch_size'], limit - offset)
+            batches.append((start_t, limit_delta, offset))
+            offset += limit_delta
             start_t += limit_delta * self.__tf_minutes * 60000
-            time_delta = datetime.now() - query_second
-            sleep(max(
-                0,
-                self.__settings['sleep_time'] -
-                time_delta.microseconds / 1000000
+
+        # every batch is decoded to its place in the arrays
+        arrays = {
+            col: np.empty(limit, dtype=dtype)
+            for col, dtype in kline_types.items()
+        }
+        with ThreadPoolExecutor(self.__settings['num_workers']) as executor:
+            sizes = list(executor.map(
+                lambda batch: self.__get_batch(*batch, arrays),
+                batches,
             ))
-            with open(self.__settings['log_file'], 'a') as f:
-                print(
-                    f"Loaded {limit_delta} rows,",
-                    f"{datetime.now() - query_second} time spent,",
-                    f"left {limit} rows",
-                    file=f,
-                )
-        return res
 
-    def __get_response(
+        if sum(sizes) < limit:
+            # removing places of missed candles
+            arrays = {
+                col: np.concatenate([
+                    values[offset: offset + size]
+                    for (_, _, offset), size in zip(batches, sizes)
+                ])
+                for col, values in arrays.items()
+            }
+        if np.any(np.diff(arrays['Open time']) < 0):
+            order = np.argsort(arrays['Open time'], kind='stable')
+            arrays = {col: values[order] for col, values in arrays.items()}
+        return arrays
+
+    def __get_batch(
         self,
         start_t: int,
-        limit: int
-    ) -> requests.models.Response:
+        limit: int,
+        offset: int,
+        arrays: dict,
+    ) -> int:
+        """
+        Downloads batch and decodes it to arrays
+        returns number of loaded rows
+        :param start_t: batch start time in ms
+        :param limit: num candles in batch
+        :param offset: batch position in arrays
+        :param arrays: arrays for all the columns
+        """
+        query_second = datetime.now()
+        rows = self.__get_response(start_t, limit)
+        size = decode_klines(rows[:limit], arrays, offset)
+        self.__log.log(
+            'batch',
+            symbol=self.symb,
+            start=start_t,
+            num_rows=size,
+            seconds=(datetime.now() - query_second).total_seconds(),
+        )
+        return size
+
+    def __get_response(self, start_t: int, limit: int) -> list:
         tries = self.__settings['num_fail_tries']
         secs = 1
         while tries > 0:
-            base = "https://api.binance.com"
             path = "/api/v3/klines"
-            url = base + path
+            url = self.base_url + path
             params = {
                 'symbol': self.symb,
                 'limit': str(limit),
@@ -146,29 +248,41 @@ class Parser:
                 'startTime': str(start_t),
                 'endTime': str(start_t + limit * self.__tf_minutes * 60000),
             }
-            r = requests.get(url, params=params)
+            self.__bucket.acquire(self.__settings['request_weight'])
+            r = self.__session.get(url, params=params)
             if r.status_code == 200:
-                sz = pd.DataFrame(r.json()).shape[0]
-                if not self.ignore_gaps and sz != limit:
+                rows = r.json()
+                if not self.ignore_gaps and len(rows) != limit:
                     raise RequestError(
-                        f"Get klines response size is {sz},",
+                        f"Get klines response size is {len(rows)},",
                         f"Limit is {limit}"
                     )
-                return r
-            elif r.status_code // 100 == 5 or r.status_code in [408, 417]:
+                return rows
+            elif r.status_code // 100 == 5 or \
+                    r.status_code in [408, 417, 429]:
                 error_code = str(r.status_code)
-                with open(self.__settings['log_file'], 'a') as f:
-                    print(
-                        f'\n\n\nERROR!!!!\n{error_code} \n{r.json()}\n\n',
-                        file=f
-                    )
-                sleep(secs)
+                self.__log.log(
+                    'error',
+                    symbol=self.symb,
+                    status=r.status_code,
+                    response=r.text,
+                )
+                # market asks to wait when weight limit is exceeded
+                sleep(max(secs, float(r.headers.get('Retry-After', 0))))
                 secs *= 1.5
                 tries -= 1
             else:
                 raise RequestError(f'{r.status_code}\n{r.json()}')
         raise ResponseError(f'{error_code}\nNo response from market')
 
+    @property
+    def __log(self) -> LogWriter:
+        """Parser log writer"""
+        return get_log_writer(
+            self.__settings['log_file'],
+            self.__settings_file,
+        )
+
     def __update_settings(self):
-        with open(self.__settings_file, 'r') as f:
-            self.__settings = json.load(f)["parser"]
+        # file is parsed only if it is changed
+        self.__settings = Settings.get(self.__settings_file).section("parser")
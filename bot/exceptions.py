@@ -11,3 +11,8 @@ class RequestError(Exception):
 class WrongIndicator(Exception):
     """Wrong indicator name"""
     pass
+
+
+class SettingsError(Exception):
+    """Wrong settings file"""
+    pass
@@ -0,0 +1,93 @@
+from bot.exceptions import RequestError
+
+from binance.spot import Spot
+from threading import Lock, Thread
+from time import monotonic
+
+
+class ExchangeInfo:
+    """
+    Cache of market symbol filters
+    Filters of all the symbols are loaded by one query,
+    expired filters are refreshed in background and used till then
+    """
+    def __init__(
+        self,
+        client: Spot,
+        symbols: list = None,
+        ttl: float = 3600,
+    ):
+        """
+        :param client: market client
+        :param symbols: symbols to load (all market symbols if None)
+        :param ttl: time in seconds to use filters without refresh
+        """
+        self.client = client
+        self.symbols = list(symbols) if symbols is not None else None
+        self.ttl = ttl
+        # filters by symbol and filter type
+        self.__filters = {}
+        self.__load_time = None
+        self.__lock = Lock()
+        # only one thread loads not cached symbols
+        self.__load_lock = Lock()
+        self.__refresh_thread = None
+
+    def get_filters(self, symb: str) -> dict:
+        """
+        Returns symbol filters by filter type,
+        queries market only if symbol is not loaded yet
+        :param symb: trading pair
+        """
+        with self.__lock:
+            is_loaded = symb in self.__filters
+            if not is_loaded and self.symbols is not None and \
+                    symb not in self.symbols:
+                self.symbols.append(symb)
+        if not is_loaded:
+            with self.__load_lock:
+                if symb not in self.__filters:
+                    self.refresh()
+        elif monotonic() - self.__load_time > self.ttl:
+            self.__refresh_background()
+        filters = self.__filters.get(symb)
+        if filters is None:
+            raise RequestError(f"No such symbol: {symb}")
+        return filters
+
+    def refresh(self) -> None:
+        """Loads filters of all the symbols"""
+        if self.symbols is None:
+            info = self.client.exchange_info()
+        else:
+            info = self.client.exchange_info(symbols=list(self.symbols))
+        filters = {
+            symbol_info['symbol']: {
+                symb_filter['filterType']: symb_filter
+                for symb_filter in symbol_info['filters']
+            }
+            for symbol_info in info['symbols']
+        }
+        with self.__lock:
+            # filters are replaced at once to not mix old and new ones
+            self.__filters = {**self.__filters, **filters}
+            self.__load_time = monotonic()
+
+    def __refresh_background(self) -> None:
+        """Starts refresh thread if it is not running"""
+        with self.__lock:
+            if self.__refresh_thread is not None and \
+                    self.__refresh_thread.is_alive():
+                return
+            self.__refresh_thread = Thread(
+                target=self.__refresh_safe,
+                daemon=True,
+            )
+            self.__refresh_thread.start()
+
+    def __refresh_safe(self) -> None:
+        """Refresh for background thread, old filters are kept on errors"""
+        try:
+            self.refresh()
+        except Exception:
+            pass
@@ -0,0 +1,169 @@
+from bot.indicators import Indicators
+from bot.settings import Settings
+from bot.shared_table import close_table, open_table, save_table
+
+import hashlib
+import json
+import numpy as np
+import os
+import pandas as pd
+import shutil
+import uuid
+
+
+class FeatureCache:
+    """
+    Disk cache of candles with calculated indicators
+    Entries are keyed by hash of candles, indicators list and window,
+    tables are stored as memory mapped arrays (shared_table.py) and
+    the least recently used entries are removed over max size
+    """
+    # cache format version, entries of other versions are stale
+    version = 1
+
+    def __init__(
+        self,
+        cache_dir: str = "data/features",
+        max_size_mb: float = 2048,
+        dtype: str = "float64",
+    ):
+        """
+        :param cache_dir: directory with cached tables
+        :param max_size_mb: max size of all the entries in megabytes
+        :param dtype: type of stored numeric columns (float64 or float32)
+        """
+        self.cache_dir = cache_dir
+        self.max_size_mb = max_size_mb
+        self.dtype = np.dtype(dtype)
+
+    @classmethod
+    def from_settings(cls, settings_file_path: str = "settings.json"):
+        """
+        Returns cache with params from features settings
+        :param settings_file_path: path for settings.json
+        """
+        return cls(**Settings.get(settings_file_path).section('features'))
+
+    def get_key(
+        self,
+        table: pd.DataFrame,
+        indicators: list,
+        window: int,
+    ) -> str:
+        """
+        Fingerprint of candles and indicators params
+        candles are identified by columns and hashes of all the values
+        :param table: dataframe with candles
+        :param indicators: list of needed indicators
+        :param window: indicators window
+        """
+        hasher = hashlib.sha256()
+        hasher.update(json.dumps({
+            'version': self.version,
+            'indicators': indicators,
+            'window': window,
+            'dtype': self.dtype.name,
+            'columns': list(map(str, table.columns)),
+        }, sort_keys=True).encode())
+        # rows hashes depend on order of rows
+        hasher.update(pd.util.hash_pandas_object(
+            table,
+            index=False,
+        ).to_numpy().tobytes())
+        return hasher.hexdigest()
+
+    def get(
+        self,
+        table: pd.DataFrame,
+        indicators: list = ["ALL"],
+        window: int = None,
+    ) -> pd.DataFrame:
+        """
+        Returns table with indicators calculated by
+        calc_indicators(drop_first=True), it is read only and is
+        calculated only if there is no cached entry
+        :param table: dataframe with candles in Parser format
+        :param indicators: list of needed indicators
+        :param window: indicators window (default by Indicators)
+        """
+        indicators_maker = Indicators() if window is None else \
+            Indicators(window)
+        key = self.get_key(table, indicators, indicators_maker.window)
+        path = os.path.join(self.cache_dir, key)
+        if os.path.isdir(path):
+            # marking entry as recently used
+            os.utime(path)
+        else:
+            features = table.copy()
+            indicators_maker.calc_indicators(
+                features,
+                indicators,
+                drop_first=True,
+            )
+            self.__save(path, features)
+        # columns added by caller are not added to shared table
+        return open_table(path).copy(deep=False)
+
+    def clear(self) -> None:
+        """Removes all the entries"""
+        for entry in self.__entries():
+            self.__remove(entry)
+
+    def __save(self, path: str, table: pd.DataFrame) -> None:
+        """
+        Saves entry and evicts the least recently used ones
+        :param path: entry directory
+        :param table: dataframe with indicators
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # entry appears at once for other processes
+        tmp_path = f'{path}.{uuid.uuid4().hex}.tmp'
+        save_table(tmp_path, table, self.dtype)
+        try:
+            os.rename(tmp_path, path)
+        except OSError:
+            # the same entry is saved by other process
+            shutil.rmtree(tmp_path, ignore_errors=True)
+        self.__evict(path)
+
+    def __entries(self) -> list:
+        """Cached entries paths from the last used"""
+        if not os.path.isdir(self.cache_dir):
+            return []
+        entries = {}
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.tmp'):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                entries[path] = os.path.getmtime(path)
+            except FileNotFoundError:
+                # entry is evicted by other process
+                pass
+        return sorted(entries, key=entries.get, reverse=True)
+
+    def __evict(self, keep_path: str) -> None:
+        """
+        Removes the least recently used entries over max size
+        :param keep_path: entry that is not removed
+        """
+        size = 0
+        for entry in self.__entries():
+            try:
+                size += sum(
+                    os.path.getsize(os.path.join(entry, name))
+                    for name in os.listdir(entry)
+                )
+            except FileNotFoundError:
+                # entry is evicted by other process
+                continue
+            if size > self.max_size_mb * 2**20 and entry != keep_path:
+                self.__remove(entry)
+
+    @staticmethod
+    def __remove(path: str) -> None:
+        """
+        :param path: entry directory
+        """
+        close_table(path)
+        shutil.rmtree(path, ignore_errors=True)
@@ -1,26 +1,170 @@
 import numpy as np
 import pandas as pd
 
+from scipy.signal import lfilter
+
 from bot.exceptions import WrongIndicator
+from bot.kernels import rolling_sum, shift
+
+# available exponential smoothing modes
+ema_modes = ["truncated", "infinite"]
+# available on-balance volume modes
+obv_modes = ["window", "cumulative"]
+# available calculation backends
+backends = ["pandas", "numpy"]
+
+
+def calc_ema(
+    values: np.ndarray,
+    window: int,
+    mode: str = "truncated",
+) -> np.ndarray:
+    """
+    Exponential smoothing in one recursive pass over the column.
+    Values before the first row and NaNs are treated as zeros.
+    truncated - weights (1 - alpha) ** shift only for the last window
+    rows normalized by their sum (compatible with old calculation)
+    infinite - classic recursive EMA with all the history
+    :param values: column to smooth
+    :param window: size of window to calculate alpha = 2 / (1 + window)
+    :param mode: smoothing mode from ema_modes
+    """
+    alpha = 2 / (1 + window)
+    decay = 1 - alpha
+    values = np.nan_to_num(np.asarray(values, dtype=np.float64))
+    if mode == "infinite":
+        return lfilter([alpha], [1, -decay], values)
+    if mode != "truncated":
+        raise ValueError(f"No such EMA mode: {mode}")
+    # E[t] = decay * E[t - 1] + x[t] - decay ** window * x[t - window]
+    numerator = np.zeros(window + 1)
+    numerator[0] = 1
+    numerator[-1] = -decay ** window
+    coef = (1 - decay ** window) / alpha
+    return lfilter(numerator, [1, -decay], values) / coef
 
 
 class Indicators:
-    # all available indicators
+    """
+    Batch indicators calculation
+    Every indicator is a registry step with input and output columns,
+    requested steps are calculated with their inputs in dependency order
+    """
+    # all built-in main indicators
     ind_list = ["ADI", "CCI", "MACD", "MFI", "OBV", "PVT", "RSI"]
 
     eps = 1e-4
 
-    def __init__(self, window: int = 12):
+    def __init__(
+        self,
+        window: int = 12,
+        ema_mode: str = "truncated",
+        obv_mode: str = "window",
+        backend: str = "pandas",
+    ):
         """
         :param window: size of window to indicators calculation
-        """
+        :param ema_mode: exponential smoothing mode from ema_modes
+        :param obv_mode: on-balance volume mode from obv_modes
+        :param backend: calculation backend from backends
+        pandas - column operations on dataframe
+        numpy - array kernels on float64 columns (compiled by numba
+        if it is installed), indicators without kernels use pandas
+        """
+        if ema_mode not in ema_modes:
+            raise ValueError(f"No such EMA mode: {ema_mode}")
+        if obv_mode not in obv_modes:
+            raise ValueError(f"No such OBV mode: {obv_mode}")
+        if backend not in backends:
+            raise ValueError(f"No such backend: {backend}")
         self.window = window
+        self.ema_mode = ema_mode
+        self.obv_mode = obv_mode
+        self.backend = backend
+        # values shared by windows while calculating indicators
+        self.__cache = None
+
+    @classmethod
+    def register(
+        cls,
+        name: str,
+        func,
+        inputs: list,
+        outputs: list,
+        scratch: list = [],
+        windowed: bool = True,
+        kernel=None,
+    ) -> None:
+        """
+        Adds indicator to registry to calculate it by name
+        :param name: indicator name
+        :param func: function(indicators, df) adding output columns to df
+        :param inputs: columns needed for calculation
+        :param outputs: columns added by calculation
+        :param scratch: outputs that can be dropped after calculation
+        :param windowed: flag that outputs depend on indicators window
+        :param kernel: function(indicators, arrays) adding output arrays
+        to dict of column arrays for numpy backend (optional)
+        """
+        producers = {
+            col: step for step, info in cls.registry.items()
+            if step != name for col in info['outputs']
+        }
+        conflicts = [col for col in outputs if col in producers]
+        if conflicts:
+            raise WrongIndicator(
+                f'Columns {conflicts} are calculated by other indicators'
+            )
+        cls.registry[name] = {
+            'func': func,
+            'inputs': list(inputs),
+            'outputs': list(outputs),
+            'scratch': list(scratch),
+            'windowed': windowed,
+            'kernel': kernel,
+        }
+
+    def plan(self, indicators: list = ["ALL"]) -> list:
+        """
+        Registry steps to calculate indicators in dependency order,
+        every step is used once
+        :param indicators: list of needed indicators
+        """
+        if "ALL" in indicators:
+            indicators = self.ind_list.copy()
+
+        diff = set(indicators).difference(set(self.registry))
+        if diff:
+            raise WrongIndicator(f'No such indicators: {list(diff)}')
+
+        producers = {
+            col: step for step, info in self.registry.items()
+            for col in info['outputs']
+        }
+        steps = []
+
+        def add_step(step: str, path: list) -> None:
+            if step in steps:
+                return
+            if step in path:
+                raise WrongIndicator(f'Cyclic dependency: {path + [step]}')
+            for col in self.registry[step]['inputs']:
+                # columns without producer are candle columns
+                if col in producers:
+                    add_step(producers[col], path + [step])
+            steps.append(step)
+
+        for indicator in indicators:
+            add_step(indicator, [])
+        return steps
 
     def calc_indicators(
         self,
         df: pd.DataFrame,
         indicators: list = ["ALL"],
-        drop_first: bool = False
+        drop_first: bool = False,
+        drop_scratch: bool = False,
+        windows: list = None,
     ) -> None:
         """
         Adds indicators from list and
@@ -28,40 +172,151 @@ class Indicators:
         :param df: dataframe to calculate indicators
         :param indicators: list of needed indicators
         :param drop_first: flag to drop first probably uncorrect columns
-        """
-        if "ALL" in indicators:
-            indicators = self.ind_list.copy()
-
-        diff = set(indicators).difference(set(self.ind_list))
-        if diff:
-            raise WrongIndicator(f'No such indicators: {list(diff)}')
+        :param drop_scratch: flag to drop auxiliary columns like EMAU
+        :param windows: list of windows to add columns like CCI_24 for
+        every window (one self.window without suffixes if None)
+        """
+        steps = self.plan(indicators)
+        self.__cache = {}
+        try:
+            if windows is None:
+                # existing columns are recalculated to not use stale values
+                self.__run_steps(self, df, steps)
+            else:
+                self.__calc_windows(df, steps, windows, drop_scratch)
+        finally:
+            self.__cache = None
 
-        for indicator in indicators:
-            func_name = f'calc_{indicator}'
-            if hasattr(self, func_name):
-                getattr(self, func_name)(df)
+        if drop_scratch:
+            df.drop(
+                columns=[
+                    col for step in steps
+                    for col in self.registry[step]['scratch']
+                ],
+                errors='ignore',
+                inplace=True,
+            )
 
         if drop_first:
-            df.drop(df.index[: self.window * 4], inplace=True)
+            max_window = self.window if windows is None else max(windows)
+            df.drop(df.index[: max_window * 4], inplace=True)
             df.reset_index(drop=True, inplace=True)
 
+    def __calc_windows(
+        self,
+        df: pd.DataFrame,
+        steps: list,
+        windows: list,
+        drop_scratch: bool,
+    ) -> None:
+        """
+        Calculates window independent steps once and other steps
+        for every window with shared intermediate values
+        :param df: dataframe to calculate indicators
+        :param steps: registry steps in dependency order
+        :param windows: list of windows
+        :param drop_scratch: flag to not add auxiliary columns
+        """
+        windowed = [
+            step for step in steps if self.registry[step]['windowed']
+        ]
+        self.__run_steps(
+            self,
+            df,
+            [step for step in steps if step not in windowed],
+        )
+
+        outputs = []
+        for step in windowed:
+            outputs += [
+                col for col in self.registry[step]['outputs']
+                if not drop_scratch or
+                col not in self.registry[step]['scratch']
+            ]
+        inputs = []
+        for step in windowed:
+            inputs += [
+                col for col in self.registry[step]['inputs']
+                if col not in inputs and col in df.columns
+            ]
+
+        for window in windows:
+            indicators = Indicators(
+                window,
+                self.ema_mode,
+                self.obv_mode,
+                self.backend,
+            )
+            indicators.__cache = self.__cache
+            # only needed columns are taken to not copy the whole table
+            table = df[inputs]
+            self.__run_steps(indicators, table, windowed)
+            for col in outputs:
+                df[f'{col}_{window}'] = table[col]
+
+    def __run_steps(
+        self,
+        indicators,
+        df: pd.DataFrame,
+        steps: list,
+    ) -> None:
+        """
+        Calculates steps by pandas functions or by array kernels
+        :param indicators: Indicators with window of steps
+        :param df: dataframe to calculate indicators
+        :param steps: registry steps in dependency order
+        """
+        if self.backend == "pandas":
+            for step in steps:
+                self.registry[step]['func'](indicators, df)
+            return
+
+        # columns are converted once and outputs are added at the end
+        arrays = {}
+        for step in steps:
+            info = self.registry[step]
+            for col in info['inputs']:
+                if col not in arrays:
+                    arrays[col] = self.__to_array(df[col])
+            if info['kernel'] is not None:
+                info['kernel'](indicators, arrays)
+                continue
+            table = pd.DataFrame(
+                {col: arrays[col] for col in info['inputs']},
+                index=df.index,
+            )
+            info['func'](indicators, table)
+            for col in info['outputs']:
+                arrays[col] = self.__to_array(table[col])
+        for step in steps:
+            for col in self.registry[step]['outputs']:
+                df[col] = arrays[col]
+
+    @staticmethod
+    def __to_array(column: pd.Series) -> np.ndarray:
+        """
+        Contiguous float64 array of numeric column
+        :param column: dataframe column
+        """
+        if not pd.api.types.is_numeric_dtype(column):
+            return column.to_numpy()
+        return np.ascontiguousarray(column.to_numpy(), dtype=np.float64)
+
     # ---------------------------------------------------- Main indicators
 
     def calc_ADI(self, df: pd.DataFrame) -> None:
         """
-        index ADI + ADIEMA + CLV
+        index ADI + ADIEMA
         :param df: dataframe to calculate indicator
         """
-        self.__calc_CLV(df)
         df['ADI'] = df['CLV'].rolling(window=self.window).sum()
         self.__calc_EMA(df, 'ADI')
 
     def calc_CCI(self, df: pd.DataFrame) -> None:
         """
-        index CCI + SMA + MAD + TP
+        index CCI
         :param df: dataframe to calculate indicator
         """
-        self.__calc_MAD(df)
         df['CCI'] = (df['TP'] - df['SMA']) / (df['MAD'] + self.eps) / 0.015
 
     def calc_MACD(self, df: pd.DataFrame) -> None:
@@ -69,34 +324,33 @@ class Indicators:
         index MACD + MACDEMA
         :param df: dataframe to calculate indicator
         """
-        self.__calc_EMA(df, 'Close')
-        EMA1 = df['CloseEMA'].copy()
-        df.drop(['CloseEMA'], axis=1, inplace=True)
-        self.__calc_EMA(df, 'Close', self.window * 2)
-        df.rename(columns={'CloseEMA': 'MACD'}, inplace=True)
-        df['MACD'] = EMA1 - df['MACD']
+        # close EMAs are shared by windows (slow EMA of one window
+        # is often fast EMA of another one)
+        df['MACD'] = self.__shared_EMA(df, 'Close', self.window) - \
+            self.__shared_EMA(df, 'Close', self.window * 2)
         self.__calc_EMA(df, 'MACD', self.window * 3 // 4)
 
     def calc_MFI(self, df: pd.DataFrame) -> None:
         """
-        index MFI + TP + MR
+        index MFI
         :param df: dataframe to calculate indicator
         """
-        self.__calc_MR(df)
         df['MFI'] = 100 - 100 / (1 + df['MR'])
 
     def calc_OBV(self, df: pd.DataFrame) -> None:
         """
         index OBV + OBVCA
+        window - signed volumes sum of the last window rows
+        cumulative - signed volumes sum of all the rows
         :param df: dataframe to calculate indicator
         """
-        df['OBV'] = 0
-        for i in range(self.window):
-            close_delta = np.sign(
-                df['Close'].shift(i).fillna(0) -
-                df['Close'].shift(i + 1).fillna(0)
-            )
-            df['OBV'] += close_delta * df['Volume coin'].shift(i).fillna(0)
+        obv = self.__shared('OBV', lambda: (np.sign(
+            df['Close'] - df['Close'].shift(1).fillna(0)
+        ) * df['Volume coin']).cumsum())
+        if self.obv_mode == "window":
+            # sum of the last window signed volumes
+            obv = obv - obv.shift(self.window).fillna(0)
+        df['OBV'] = obv
         self.__calc_CA(df, 'OBV')
 
     def calc_PVT(self, df: pd.DataFrame) -> None:
@@ -104,17 +358,19 @@ class Indicators:
         index PVT + PVTCA
         :param df: dataframe to calculate indicator
         """
-        close_priv = df['Close'].shift(1).fillna(0)
-        df_temp = df['Volume coin'] * (df['Close'] - close_priv) / close_priv
+        def calc_values():
+            close_priv = df['Close'].shift(1).fillna(0)
+            return df['Volume coin'] * (df['Close'] - close_priv) / close_priv
+
+        df_temp = self.__shared('PVT', calc_values)
         df['PVT'] = df_temp.rolling(window=self.window).sum().fillna(0)
         self.__calc_CA(df, 'PVT')
 
     def calc_RSI(self, df: pd.DataFrame) -> None:
         """
-        index RSI + RS + EMA + EMAU + EMAD
+        index RSI + RS
         :param df: dataframe to calculate indicator
         """
-        self.__calc_EMAUD(df)
         df['RS'] = df['EMAU'] / (df['EMAD'] + self.eps)
         df['RSI'] = 100 * df['EMAU'] / (df['EMAU'] + df['EMAD'] + self.eps)
 
@@ -140,20 +396,45 @@ class Indicators:
         """
         index *EMA
         :param df: dataframe to calculate indicator
-        :param param_name: param to calculate camulative avarage
+        :param param_name: param to calculate exponential avarage
+        :param window: smoothing window (self.window by default)
         """
         if window is None:
             window = self.window
-        alpha = 2 / (1 + window)
-        ema_name = param_name + 'EMA'
-        df_temp = df[param_name]
-        df[ema_name] = 0
-        coef = 0
-        for shift in range(window):
-            df[ema_name] += \
-                df_temp.shift(shift).fillna(0) * ((1 - alpha) ** shift)
-            coef += (1 - alpha) ** shift
-        df[ema_name] /= coef
+        df[param_name + 'EMA'] = calc_ema(
+            df[param_name].to_numpy(),
+            window,
+            self.ema_mode,
+        )
+
+    def __shared_EMA(
+        self,
+        df: pd.DataFrame,
+        param_name: str,
+        window: int,
+    ) -> np.ndarray:
+        """
+        EMA of window independent column shared by windows
+        :param df: dataframe to calculate indicator
+        :param param_name: candle column to calculate exponential avarage
+        :param window: smoothing window
+        """
+        return self.__shared(
+            f'{param_name}EMA_{window}',
+            lambda: calc_ema(df[param_name], window, self.ema_mode),
+        )
+
+    def __shared(self, name: str, func):
+        """
+        Window independent value calculated once in calc_indicators
+        :param name: value name
+        :param func: function without arguments to calculate value
+        """
+        if self.__cache is None:
+            return func()
+        if name not in self.__cache:
+            self.__cache[name] = func()
+        return self.__cache[name]
 
     # ---------------------------------------------------- Auxiliary indicators
 
@@ -162,8 +443,6 @@ class Indicators:
         index CLV
         :param df: dataframe to calculate indicator
         """
-        if 'CLV' in df.columns:
-            return
         df['CLV'] = df['Volume coin'] * \
             (2 * df['Close'] - df['Low'] - df['High']) / \
             (df['High'] - df['Low'] + self.eps)
@@ -173,27 +452,24 @@ class Indicators:
         index EMA + EMAU + EMAD
         :param df: dataframe to calculate indicator
         """
-        if 'EMA' in df.columns:
-            return
-        # calc coef
-        df['EMA'] = (df['Close'] - df['Close'].shift(1).fillna(0))
-        df['EMAU'] = df['EMA']
-        df.loc[df['EMAU'] < 0, ['EMAU']] = 0
-        df['EMAD'] = -df['EMA']
-        df.loc[df['EMAD'] < 0, ['EMAD']] = 0
-        for index in ['EMA', 'EMAU', 'EMAD']:
-            self.__calc_EMA(df, index)
-            df[index] = df[index + 'EMA']
-            df.drop([index + 'EMA'], axis=1, inplace=True)
+        def calc_deltas():
+            delta = (df['Close'] - df['Close'].shift(1).fillna(0)) \
+                .to_numpy()
+            return {
+                'EMA': delta,
+                'EMAU': np.where(delta < 0, 0, delta),
+                'EMAD': np.where(-delta < 0, 0, -delta),
+            }
+
+        # price deltas are the same for all windows
+        for index, values in self.__shared('EMAUD', calc_deltas).items():
+            df[index] = calc_ema(values, self.window, self.ema_mode)
 
     def __calc_MAD(self, df: pd.DataFrame) -> None:
         """
-        index MAD + SMA + TP
+        index MAD
         :param df: dataframe to calculate indicator
         """
-        if 'MAD' in df.columns:
-            return
-        self.__calc_SMA(df)
         df_temp = (df['TP'] - df['SMA'] + 0.1**10).abs()
         df['MAD'] = df_temp.rolling(window=self.window).sum().fillna(0)
         df['MAD'] /= self.window
@@ -203,26 +479,24 @@ class Indicators:
         index MR
         :param df: dataframe to calculate indicator
         """
-        if 'MR' in df.columns:
-            return
-        self.__calc_TP(df)
-        PMF = df['TP'] * df['Volume coin']
-        NMF = PMF.copy()
-        TP_delta = df['TP'] - df['TP'].shift(1).fillna(0)
-        PMF[TP_delta < 0] = 0
-        NMF[TP_delta >= 0] = 0
+        def calc_flows():
+            PMF = df['TP'] * df['Volume coin']
+            NMF = PMF.copy()
+            TP_delta = df['TP'] - df['TP'].shift(1).fillna(0)
+            PMF[TP_delta < 0] = 0
+            NMF[TP_delta >= 0] = 0
+            return PMF, NMF
+
+        PMF, NMF = self.__shared('MR', calc_flows)
         PMFS = PMF.rolling(window=self.window).sum().fillna(0)
         NMFS = NMF.rolling(window=self.window).sum().fillna(0)
         df['MR'] = PMFS / np.maximum(NMFS, self.eps)
 
     def __calc_SMA(self, df: pd.DataFrame) -> None:
         """
-        index SMA + TP
+        index SMA
         :param df: dataframe to calculate indicator
         """
-        if 'SMA' in df.columns:
-            return
-        self.__calc_TP(df)
         df['SMA'] = df['TP'].rolling(window=self.window).sum().fillna(0)
         df['SMA'] /= self.window
 
@@ -231,6 +505,218 @@ class Indicators:
         index TP
         :param df: dataframe to calculate indicator
         """
-        if 'TP' in df.columns:
-            return
         df['TP'] = (df['Low'] + df['Close'] + df['High']) / 3
+
+    # ---------------------------------------------------- Array kernels
+
+    def __array_ADI(self, arrays: dict) -> None:
+        arrays['ADI'] = rolling_sum(arrays['CLV'], self.window)
+        arrays['ADIEMA'] = calc_ema(arrays['ADI'], self.window, self.ema_mode)
+
+    def __array_CCI(self, arrays: dict) -> None:
+        arrays['CCI'] = (arrays['TP'] - arrays['SMA']) / \
+            (arrays['MAD'] + self.eps) / 0.015
+
+    def __array_MACD(self, arrays: dict) -> None:
+        arrays['MACD'] = self.__shared_EMA(arrays, 'Close', self.window) - \
+            self.__shared_EMA(arrays, 'Close', self.window * 2)
+        arrays['MACDEMA'] = calc_ema(
+            arrays['MACD'],
+            self.window * 3 // 4,
+            self.ema_mode,
+        )
+
+    def __array_MFI(self, arrays: dict) -> None:
+        arrays['MFI'] = 100 - 100 / (1 + arrays['MR'])
+
+    def __array_OBV(self, arrays: dict) -> None:
+        close = arrays['Close']
+        obv = self.__shared('OBV', lambda: np.cumsum(
+            np.sign(close - shift(close)) * arrays['Volume coin']
+        ))
+        if self.obv_mode == "window":
+            obv = obv - shift(obv, self.window)
+        arrays['OBV'] = obv
+        arrays['OBVCA'] = self.__array_CA(obv)
+
+    def __array_PVT(self, arrays: dict) -> None:
+        def calc_values():
+            close = arrays['Close']
+            close_priv = shift(close)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                return arrays['Volume coin'] * (close - close_priv) / \
+                    close_priv
+
+        values = self.__shared('PVT', calc_values)
+        arrays['PVT'] = self.__fill(rolling_sum(values, self.window))
+        arrays['PVTCA'] = self.__array_CA(arrays['PVT'])
+
+    def __array_RSI(self, arrays: dict) -> None:
+        emau = arrays['EMAU']
+        emad = arrays['EMAD']
+        arrays['RS'] = emau / (emad + self.eps)
+        arrays['RSI'] = 100 * emau / (emau + emad + self.eps)
+
+    def __array_CA(self, values: np.ndarray) -> np.ndarray:
+        return self.__fill(rolling_sum(values, self.window)) / self.window
+
+    def __array_CLV(self, arrays: dict) -> None:
+        arrays['CLV'] = arrays['Volume coin'] * \
+            (2 * arrays['Close'] - arrays['Low'] - arrays['High']) / \
+            (arrays['High'] - arrays['Low'] + self.eps)
+
+    def __array_EMAUD(self, arrays: dict) -> None:
+        def calc_deltas():
+            delta = arrays['Close'] - shift(arrays['Close'])
+            return {
+                'EMA': delta,
+                'EMAU': np.where(delta < 0, 0, delta),
+                'EMAD': np.where(-delta < 0, 0, -delta),
+            }
+
+        for index, values in self.__shared('EMAUD', calc_deltas).items():
+            arrays[index] = calc_ema(values, self.window, self.ema_mode)
+
+    def __array_MAD(self, arrays: dict) -> None:
+        values = np.abs(arrays['TP'] - arrays['SMA'] + 0.1**10)
+        arrays['MAD'] = self.__fill(rolling_sum(values, self.window)) / \
+            self.window
+
+    def __array_MR(self, arrays: dict) -> None:
+        def calc_flows():
+            tp = arrays['TP']
+            flow = tp * arrays['Volume coin']
+            tp_delta = tp - shift(tp)
+            return (
+                np.where(tp_delta < 0, 0, flow),
+                np.where(tp_delta >= 0, 0, flow),
+            )
+
+        positive, negative = self.__shared('MR', calc_flows)
+        positive = self.__fill(rolling_sum(positive, self.window))
+        negative = self.__fill(rolling_sum(negative, self.window))
+        arrays['MR'] = positive / np.maximum(negative, self.eps)
+
+    def __array_SMA(self, arrays: dict) -> None:
+        arrays['SMA'] = self.__fill(rolling_sum(arrays['TP'], self.window)) / \
+            self.window
+
+    def __array_TP(self, arrays: dict) -> None:
+        arrays['TP'] = (arrays['Low'] + arrays['Close'] + arrays['High']) / 3
+
+    @staticmethod
+    def __fill(values: np.ndarray) -> np.ndarray:
+        """NaNs are replaced by zeros like pandas fillna(0)"""
+        return np.where(np.isnan(values), 0, values)
+
+    # ---------------------------------------------------- Registry
+
+    # indicator name: calculation function, needed and added columns,
+    # added columns that can be dropped after calculation,
+    # flag that added columns depend on window and numpy backend kernel
+    registry = {
+        'ADI': {
+            'func': calc_ADI,
+            'inputs': ['CLV'],
+            'outputs': ['ADI', 'ADIEMA'],
+            'scratch': [],
+            'windowed': True,
+            'kernel': __array_ADI,
+        },
+        'CCI': {
+            'func': calc_CCI,
+            'inputs': ['TP', 'SMA', 'MAD'],
+            'outputs': ['CCI'],
+            'scratch': [],
+            'windowed': True,
+            'kernel': __array_CCI,
+        },
+        'MACD': {
+            'func': calc_MACD,
+            'inputs': ['Close'],
+            'outputs': ['MACD', 'MACDEMA'],
+            'scratch': [],
+            'windowed': True,
+            'kernel': __array_MACD,
+        },
+        'MFI': {
+            'func': calc_MFI,
+            'inputs': ['MR'],
+            'outputs': ['MFI'],
+            'scratch': [],
+            'windowed': True,
+            'kernel': __array_MFI,
+        },
+        'OBV': {
+            'func': calc_OBV,
+            'inputs': ['Close', 'Volume coin'],
+            'outputs': ['OBV', 'OBVCA'],
+            'scratch': [],
+            'windowed': True,
+            'kernel': __array_OBV,
+        },
+        'PVT': {
+            'func': calc_PVT,
+            'inputs': ['Close', 'Volume coin'],
+            'outputs': ['PVT', 'PVTCA'],
+            'scratch': [],
+            'windowed': True,
+            'kernel': __array_PVT,
+        },
+        'RSI': {
+            'func': calc_RSI,
+            'inputs': ['EMAU', 'EMAD'],
+            'outputs': ['RS', 'RSI'],
+            'scratch': ['RS'],
+            'windowed': True,
+            'kernel': __array_RSI,
+        },
+        'CLV': {
+            'func': __calc_CLV,
+            'inputs': ['Volume coin', 'Close', 'Low', 'High'],
+            'outputs': ['CLV'],
+            'scratch': ['CLV'],
+            'windowed': False,
+            'kernel': __array_CLV,
+        },
+        'EMAUD': {
+            'func': __calc_EMAUD,
+            'inputs': ['Close'],
+            'outputs': ['EMA', 'EMAU', 'EMAD'],
+            'scratch': ['EMAU', 'EMAD'],
+            'windowed': True,
+            'kernel': __array_EMAUD,
+        },
+        'MAD': {
+            'func': __calc_MAD,
+            'inputs': ['TP', 'SMA'],
+            'outputs': ['MAD'],
+            'scratch': [],
+            'windowed': True,
+            'kernel': __array_MAD,
+        },
+        'MR': {
+            'func': __calc_MR,
+            'inputs': ['TP', 'Volume coin'],
+            'outputs': ['MR'],
+            'scratch': ['MR'],
+            'windowed': True,
+            'kernel': __array_MR,
+        },
+        'SMA': {
+            'func': __calc_SMA,
+            'inputs': ['TP'],
+            'outputs': ['SMA'],
+            'scratch': [],
+            'windowed': True,
+            'kernel': __array_SMA,
+        },
+        'TP': {
+            'func': __calc_TP,
+            'inputs': ['Low', 'Close', 'High'],
+            'outputs': ['TP'],
+            'scratch': [],
+            'windowed': False,
+            'kernel': __array_TP,
+        },
+    }
@@ -0,0 +1,95 @@
+"""
+Array kernels for Indicators numpy backend
+Loops are compiled by numba if it is installed,
+else vectorized NumPy versions are used
+"""
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+# flag that kernels are compiled
+has_numba = njit is not None
+
+
+def shift(values: np.ndarray, periods: int = 1) -> np.ndarray:
+    """
+    Values shifted forward, first values are zeros
+    (the same as pandas shift(periods).fillna(0))
+    :param values: float64 array
+    :param periods: number of positions to shift
+    """
+    result = np.zeros_like(values)
+    if periods < values.shape[0]:
+        result[periods:] = values[:values.shape[0] - periods]
+    return result
+
+
+def _rolling_sum_numpy(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Sums of the last window values by cumulative sums difference
+    :param values: float64 array
+    :param window: number of values in sum
+    """
+    is_finite = np.isfinite(values)
+    # values are centered to keep cumulative sums small and precise
+    center = values[is_finite].mean() if is_finite.any() else 0.0
+    sums = np.cumsum(np.where(is_finite, values - center, 0.0))
+    counts = np.cumsum(is_finite)
+    sums[window:] = sums[window:] - sums[:-window]
+    counts[window:] = counts[window:] - counts[:-window]
+    sums += window * center
+    sums[counts < window] = np.nan
+    return sums
+
+
+def _rolling_sum_loop(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Sums of the last window values with compensated add and remove
+    (the same way as pandas rolling sum)
+    :param values: float64 array
+    :param window: number of values in sum
+    """
+    n = values.shape[0]
+    result = np.empty(n)
+    total = 0.0
+    comp_add = 0.0
+    comp_remove = 0.0
+    nobs = 0
+    for i in range(n):
+        value = values[i]
+        if np.isfinite(value):
+            nobs += 1
+            y = value - comp_add
+            t = total + y
+            comp_add = t - total - y
+            total = t
+        if i >= window:
+            old = values[i - window]
+            if np.isfinite(old):
+                nobs -= 1
+                y = -old - comp_remove
+                t = total + y
+                comp_remove = t - total - y
+                total = t
+        result[i] = total if nobs >= window else np.nan
+    return result
+
+
+if has_numba:
+    _rolling_sum_loop = njit(cache=True)(_rolling_sum_loop)
+
+
+def rolling_sum(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Sums of the last window values,
+    NaN if window has non finite values or is not full
+    (the same as pandas rolling(window).sum())
+    :param values: float64 array
+    :param window: number of values in sum
+    """
+    if has_numba:
+        return _rolling_sum_loop(values, window)
+    return _rolling_sum_numpy(values, window)
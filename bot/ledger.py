@@ -0,0 +1,97 @@
+from binance.spot import Spot
+from threading import Lock
+
+
+class Ledger:
+    """
+    Local free balances of market assets
+    Order fills are applied locally, balances are reconciled with market
+    every reconcile_friq updates or after drift is detected
+    """
+    def __init__(self, client: Spot, reconcile_friq: int = 60):
+        """
+        :param client: market client
+        :param reconcile_friq: number of updates between reconciliations
+        """
+        self.client = client
+        self.reconcile_friq = reconcile_friq
+        self.__balances = {}
+        self.__num_updates = 0
+        # the first update loads balances from market
+        self.__is_drifted = True
+        self.__lock = Lock()
+
+    @property
+    def is_drifted(self) -> bool:
+        """Flag that local balances can differ from market ones"""
+        return self.__is_drifted
+
+    def get(self, asset: str) -> float:
+        """
+        Returns free amount of asset
+        :param asset: asset name
+        """
+        return self.__balances.get(asset, 0.0)
+
+    def update(self) -> None:
+        """
+        Function is called before every trading decision,
+        reconciles balances if it is needed
+        """
+        with self.__lock:
+            self.__num_updates += 1
+            if not self.__is_drifted and \
+                    self.__num_updates < self.reconcile_friq:
+                return
+        self.reconcile()
+
+    def reconcile(self) -> None:
+        """Replaces local balances by market ones"""
+        assets = self.client.user_asset()
+        with self.__lock:
+            self.__balances = {
+                asset['asset']: float(asset['free']) for asset in assets
+            }
+            self.__num_updates = 0
+            self.__is_drifted = False
+
+    def apply_order(
+        self,
+        order: dict,
+        first_asset: str,
+        second_asset: str,
+    ) -> None:
+        """
+        Applies fills of market order to balances
+        :param order: new order response of FULL type
+        :param first_asset: first asset of order symbol
+        :param second_asset: second asset of order symbol
+        """
+        with self.__lock:
+            if not isinstance(order, dict) or 'executedQty' not in order \
+                    or 'fills' not in order:
+                # unknown result is checked by market
+                self.__is_drifted = True
+                return
+            sign = 1 if order['side'] == 'BUY' else -1
+            self.__add(first_asset, sign * float(order['executedQty']))
+            self.__add(
+                second_asset,
+                -sign * float(order['cummulativeQuoteQty']),
+            )
+            assets = [first_asset, second_asset]
+            for fill in order['fills']:
+                self.__add(fill['commissionAsset'], -float(fill['commission']))
+                assets.append(fill['commissionAsset'])
+            # not filled orders and negative balances mean missed changes
+            if order.get('status') != 'FILLED' or \
+                    any(self.get(asset) < 0 for asset in assets):
+                self.__is_drifted = True
+
+    def __add(self, asset: str, amount: float) -> None:
+        """
+        Changes free amount of asset
+        :param asset: asset name
+        :param amount: amount to add
+        """
+        self.__balances[asset] = self.get(asset) + amount
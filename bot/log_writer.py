@@ -0,0 +1,181 @@
+"""
+Buffered JSON lines logs
+Records are queued by callers and written to files by background threads
+"""
+from bot.settings import Settings
+
+from datetime import datetime
+from queue import Empty, Full, Queue
+from threading import Lock, Thread
+from time import monotonic
+
+import atexit
+import json
+import os
+
+# what to do with record if queue is full
+# block - wait for writer, drop - skip record
+overflow_policies = ["block", "drop"]
+# queue item to truncate log file
+_clear_marker = object()
+
+
+class LogWriter:
+    """
+    JSON lines log file written by background thread
+    Every record is a json object with time and event fields
+    """
+    def __init__(
+        self,
+        path: str,
+        queue_size: int = 10000,
+        batch_size: int = 256,
+        flush_interval: float = 1,
+        overflow_policy: str = "block",
+    ):
+        """
+        :param path: log file path
+        :param queue_size: max number of not written records
+        :param batch_size: max number of records written at once
+        :param flush_interval: max time in seconds to collect records
+        before writing
+        :param overflow_policy: full queue policy from overflow_policies
+        """
+        if overflow_policy not in overflow_policies:
+            raise ValueError(f"No such overflow policy: {overflow_policy}")
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow_policy = overflow_policy
+        # number of records skipped by drop policy
+        self.num_dropped = 0
+        self.__queue = Queue(queue_size)
+        self.__is_running = True
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.__file = open(path, 'a')
+        self.__thread = Thread(target=self.__write, daemon=True)
+        self.__thread.start()
+
+    def log(self, event: str, **fields) -> bool:
+        """
+        Queues record, returns False if it is dropped
+        :param event: record type
+        :param fields: record values (not json values are written as str)
+        """
+        record = {'time': datetime.now().isoformat(), 'event': event}
+        record.update(fields)
+        return self.__put(record)
+
+    def clear(self) -> bool:
+        """
+        Truncates log file after queued records,
+        returns False if it is dropped by overflow policy
+        """
+        return self.__put(_clear_marker)
+
+    def flush(self) -> None:
+        """Waits for all queued records to be written"""
+        self.__queue.join()
+
+    def close(self) -> None:
+        """Writes queued records and stops writer"""
+        if not self.__is_running:
+            return
+        self.flush()
+        self.__is_running = False
+        self.__thread.join()
+        self.__file.close()
+
+    def __put(self, item) -> bool:
+        """
+        Queues item by overflow policy
+        :param item: record or clear marker
+        """
+        if self.overflow_policy == "block":
+            self.__queue.put(item)
+            return True
+        try:
+            self.__queue.put_nowait(item)
+        except Full:
+            self.num_dropped += 1
+            return False
+        return True
+
+    def __write(self) -> None:
+        """Writes queued records by batches"""
+        while self.__is_running:
+            try:
+                items = [self.__queue.get(timeout=self.flush_interval)]
+            except Empty:
+                # writer is stopped only with empty queue
+                continue
+            # records are collected to write them at once
+            deadline = monotonic() + self.flush_interval
+            try:
+                while len(items) < self.batch_size:
+                    items.append(self.__queue.get(
+                        timeout=max(0, deadline - monotonic()),
+                    ))
+            except Empty:
+                pass
+            try:
+                lines = []
+                for item in items:
+                    if item is _clear_marker:
+                        self.__write_lines(lines)
+                        lines = []
+                        self.__file.close()
+                        self.__file = open(self.path, 'w')
+                    else:
+                        lines.append(json.dumps(item, default=str))
+                self.__write_lines(lines)
+            except OSError:
+                # logging errors do not stop trading
+                pass
+            finally:
+                # flush does not wait for records after errors
+                for _ in items:
+                    self.__queue.task_done()
+
+    def __write_lines(self, lines: list) -> None:
+        """
+        Writes lines to log file
+        :param lines: json records
+        """
+        if lines:
+            self.__file.write('\n'.join(lines) + '\n')
+            self.__file.flush()
+
+
+# writers shared by all the loggers of one file
+_writers = {}
+_writers_lock = Lock()
+
+
+def get_log_writer(
+    path: str,
+    settings_file_path: str = "settings.json",
+) -> LogWriter:
+    """
+    Returns log writer of file, it is created by the first call
+    with params from logging settings
+    :param path: log file path
+    :param settings_file_path: path for settings.json
+    """
+    key = os.path.abspath(path)
+    with _writers_lock:
+        writer = _writers.get(key)
+        if writer is None:
+            settings = Settings.get(settings_file_path).section('logging')
+            writer = LogWriter(path, **settings)
+            _writers[key] = writer
+    return writer
+
+
+@atexit.register
+def close_log_writers() -> None:
+    """Writes all the queued records before exit"""
+    with _writers_lock:
+        writers = list(_writers.values())
+    for writer in writers:
+        writer.close()
@@ -0,0 +1,306 @@
+from bot.dataset_parser import Parser, arrays_to_table, decode_klines
+from bot.dataset_parser import kline_types
+from bot.utiles import tf_to_minutes, time_to_int, times_to_int
+
+from datetime import datetime
+from queue import Empty, Queue
+from threading import Thread
+from time import sleep
+
+import json
+import numpy as np
+import pandas as pd
+import websocket
+
+# kline fields in stream messages in market response order
+stream_fields = ['t', 'o', 'h', 'l', 'c', 'v', 'T', 'q']
+
+
+class Feed:
+    """
+    Market data feed pattern
+    Delivers closed candles in Parser format without gaps
+    and keeps rolling window of the last num_rows candles
+    """
+    def __init__(self, symb: str, tf: str, num_rows: int):
+        """
+        :param symb: trading pair
+        :param tf: candle timeframe
+        :param num_rows: number of candles in rolling window
+        """
+        self.symb = symb
+        self.tf = tf
+        self.tf_ms = tf_to_minutes(tf) * 60000
+        self.num_rows = num_rows
+        self.is_running = False
+        # rolling window of the last candles
+        self.table = None
+
+    @property
+    def last_time(self) -> int:
+        """Open time of the last delivered candle in ms or None"""
+        if self.table is None or self.table.shape[0] == 0:
+            return None
+        return int(self.__times(self.table)[-1])
+
+    def start(self) -> pd.DataFrame:
+        """
+        Loads the first window and starts receiving candles
+        returns window table
+        """
+        pass
+
+    def receive(self, timeout: float = None) -> pd.DataFrame:
+        """
+        Waits for closed candles from the stream
+        returns them or empty table on timeout
+        :param timeout: max time to wait in seconds (forever if None)
+        """
+        pass
+
+    def load(self, start_t: int, limit: int) -> pd.DataFrame:
+        """
+        Loads history candles to fill gaps in the stream
+        :param start_t: open time of the first candle in ms
+        :param limit: number of candles
+        """
+        pass
+
+    def close(self) -> None:
+        """Stops receiving candles"""
+        self.is_running = False
+
+    def next(self, timeout: float = None) -> pd.DataFrame:
+        """
+        Waits for new closed candles, missed ones are loaded from history
+        returns new candles or empty table on timeout
+        :param timeout: max time to wait in seconds (forever if None)
+        """
+        candles = self.receive(timeout)
+        if candles.shape[0] == 0:
+            return candles
+        parts = []
+        prev_time = self.last_time
+        for i, open_time in enumerate(self.__times(candles).tolist()):
+            if prev_time is not None:
+                if open_time <= prev_time:
+                    # candle is already delivered
+                    continue
+                num_missed = (open_time - prev_time) // self.tf_ms - 1
+                if num_missed > 0:
+                    parts.append(
+                        self.load(prev_time + self.tf_ms, num_missed)
+                    )
+            parts.append(candles.iloc[i: i + 1])
+            prev_time = open_time
+        if not parts:
+            return candles.iloc[:0]
+        candles = pd.concat(parts, ignore_index=True)
+        return self.append(candles)
+
+    def append(self, candles: pd.DataFrame) -> pd.DataFrame:
+        """
+        Adds candles to the rolling window
+        returns the candles
+        :param candles: dataframe with candles in Parser format
+        """
+        candles = candles.reset_index(drop=True)
+        self.__set_table(candles if self.table is None else pd.concat(
+            [self.table, candles],
+            ignore_index=True,
+        ))
+        return candles
+
+    def resize(self, num_rows: int) -> None:
+        """
+        Changes size of the rolling window,
+        older candles are loaded from history if it grows
+        :param num_rows: number of candles in rolling window
+        """
+        self.num_rows = num_rows
+        if self.table is None or self.table.shape[0] == 0:
+            return
+        parts = [self.table]
+        num_missed = num_rows - self.table.shape[0]
+        if num_missed > 0:
+            first_time = int(self.__times(self.table)[0])
+            older = self.load(first_time - num_missed * self.tf_ms, num_missed)
+            parts.insert(0, older[self.__times(older) < first_time])
+        self.__set_table(pd.concat(parts, ignore_index=True))
+
+    def __set_table(self, table: pd.DataFrame) -> None:
+        """
+        Keeps the last num_rows candles as rolling window
+        :param table: dataframe with candles in Parser format
+        """
+        table = table.iloc[-self.num_rows:].reset_index(drop=True)
+        # next close of the previous last candle is known now
+        table['Next Close'] = table['Close'].shift(-1) \
+            .fillna(table['Close'].iloc[-1])
+        table['Close Delta'] = (table['Next Close'] - table['Close']) / \
+            table['Close']
+        self.table = table
+
+    @staticmethod
+    def __times(table: pd.DataFrame) -> np.ndarray:
+        """
+        Open times in ms
+        :param table: dataframe with candles in Parser format
+        """
+        return times_to_int(table['Open time'])
+
+
+class WebSocketFeed(Feed):
+    """
+    Market kline stream, candles are delivered on close
+    Missed candles (reconnects, lost messages) are loaded by REST
+    """
+    def __init__(
+        self,
+        symb: str,
+        tf: str,
+        num_rows: int,
+        url: str = "wss://stream.binance.com:9443",
+        timeout: float = 60,
+        reconnect_delay: float = 5,
+        parser: Parser = None,
+    ):
+        """
+        :param symb: trading pair
+        :param tf: candle timeframe
+        :param num_rows: number of candles in rolling window
+        :param url: market stream url
+        :param timeout: time in seconds without messages to reconnect
+        :param reconnect_delay: time in seconds to wait before reconnect
+        :param parser: Parser to load history candles
+        """
+        super().__init__(symb, tf, num_rows)
+        self.url = f"{url}/ws/{symb.lower()}@kline_{tf}"
+        self.timeout = timeout
+        self.reconnect_delay = reconnect_delay
+        self.__parser = parser if parser is not None else \
+            Parser(symb, tf, ignore_gaps=True)
+        self.__queue = Queue()
+        self.__connection = None
+        self.__thread = None
+
+    def start(self) -> pd.DataFrame:
+        self.is_running = True
+        # candles closed while history is loading are queued
+        self.__thread = Thread(target=self.__listen, daemon=True)
+        self.__thread.start()
+        end = time_to_int(datetime.utcnow()) // self.tf_ms * self.tf_ms
+        self.append(
+            self.load(end - self.num_rows * self.tf_ms, self.num_rows)
+        )
+        return self.table
+
+    def receive(self, timeout: float = None) -> pd.DataFrame:
+        rows = []
+        try:
+            rows.append(self.__queue.get(timeout=timeout))
+            while True:
+                rows.append(self.__queue.get_nowait())
+        except Empty:
+            pass
+        arrays = {
+            col: np.empty(len(rows), dtype=dtype)
+            for col, dtype in kline_types.items()
+        }
+        decode_klines(rows, arrays)
+        if not rows:
+            return pd.DataFrame(columns=['Open time'])
+        return arrays_to_table(arrays)
+
+    def load(self, start_t: int, limit: int) -> pd.DataFrame:
+        return self.__parser.get_table(
+            str(pd.to_datetime(start_t, unit='ms')),
+            limit,
+        )
+
+    def close(self) -> None:
+        super().close()
+        connection = self.__connection
+        if connection is not None:
+            connection.close()
+        if self.__thread is not None:
+            self.__thread.join()
+
+    def __listen(self) -> None:
+        """Receives stream messages and reconnects on errors"""
+        while self.is_running:
+            try:
+                self.__connection = websocket.create_connection(
+                    self.url,
+                    timeout=self.timeout,
+                )
+                while self.is_running:
+                    kline = json.loads(self.__connection.recv()).get('k')
+                    # candle updates are sent till it is closed
+                    if kline is not None and kline['x']:
+                        self.__queue.put([
+                            kline[field] for field in stream_fields
+                        ])
+            except (websocket.WebSocketException, OSError, ValueError):
+                # missed candles are loaded on the next closed one
+                pass
+            finally:
+                if self.__connection is not None:
+                    self.__connection.close()
+                    self.__connection = None
+            if self.is_running:
+                sleep(self.reconnect_delay)
+
+
+class ReplayFeed(Feed):
+    """
+    Local feed replaying candles from table one by one
+    to test trading offline
+    """
+    def __init__(
+        self,
+        table: pd.DataFrame,
+        num_rows: int,
+        symb: str = "BTCUSDT",
+        tf: str = "1m",
+        delay: float = 0,
+        missed_rows: list = [],
+    ):
+        """
+        :param table: dataframe with candles in Parser format
+        :param num_rows: number of candles in rolling window
+        :param symb: trading pair
+        :param tf: candle timeframe
+        :param delay: time in seconds between candles
+        :param missed_rows: rows not sent by stream to test gaps filling
+        """
+        super().__init__(symb, tf, num_rows)
+        self.__history = table.reset_index(drop=True).copy()
+        for col in ['Open time', 'Close time', 'Middle time']:
+            if col in self.__history.columns:
+                self.__history[col] = pd.to_datetime(self.__history[col])
+        self.delay = delay
+        self.missed_rows = set(missed_rows)
+        self.__pos = 0
+
+    def start(self) -> pd.DataFrame:
+        self.is_running = True
+        self.__pos = self.num_rows
+        self.append(self.__history.iloc[:self.num_rows])
+        return self.table
+
+    def receive(self, timeout: float = None) -> pd.DataFrame:
+        while self.__pos in self.missed_rows:
+            self.__pos += 1
+        if self.__pos >= self.__history.shape[0]:
+            # replay is finished
+            self.is_running = False
+            return self.__history.iloc[:0]
+        sleep(self.delay)
+        self.__pos += 1
+        return self.__history.iloc[self.__pos - 1: self.__pos]
+
+    def load(self, start_t: int, limit: int) -> pd.DataFrame:
+        times = times_to_int(self.__history['Open time'])
+        start = int(np.searchsorted(times, start_t, 'left'))
+        return self.__history.iloc[start: start + limit]
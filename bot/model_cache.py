@@ -0,0 +1,118 @@
+import hashlib
+import joblib
+import json
+import os
+import pandas as pd
+import uuid
+
+
+class ModelCache:
+    """
+    Disk cache of fitted models
+    Entries are keyed by hash of fit table and fitting params,
+    only max_entries last used entries of every strategy are stored
+    """
+    # cache format version, entries of other versions are stale
+    version = 1
+
+    def __init__(self, root: str = "data/models", max_entries: int = 3):
+        """
+        :param root: directory with cached models
+        :param max_entries: number of entries stored for every strategy
+        """
+        self.root = root
+        self.max_entries = max_entries
+
+    @classmethod
+    def get_key(cls, table: pd.DataFrame, params: dict) -> str:
+        """
+        Hash of fit table data and fitting params
+        :param table: dataframe used to fit models
+        :param params: json serializable params that change fitted models
+        """
+        hasher = hashlib.sha256()
+        hasher.update(str(cls.version).encode())
+        hasher.update(json.dumps(params, sort_keys=True, default=str).encode())
+        hasher.update(','.join(map(str, table.columns)).encode())
+        hasher.update(
+            pd.util.hash_pandas_object(table, index=False).to_numpy().tobytes()
+        )
+        return hasher.hexdigest()
+
+    def load(self, name: str, key: str):
+        """
+        Returns cached object or None if there is no entry
+        :param name: strategy name
+        :param key: entry key from get_key
+        """
+        path = self.__path(name, key)
+        if not os.path.exists(path):
+            return None
+        try:
+            models = joblib.load(path)
+        except Exception:
+            # broken entry is refitted
+            os.remove(path)
+            return None
+        # marking entry as recently used
+        os.utime(path)
+        return models
+
+    def save(self, name: str, key: str, models) -> None:
+        """
+        Saves object and evicts old entries of the strategy
+        :param name: strategy name
+        :param key: entry key from get_key
+        :param models: object to cache
+        """
+        os.makedirs(self.root, exist_ok=True)
+        path = self.__path(name, key)
+        # every process writes its own file, entry appears at once
+        tmp_path = f'{path}.{uuid.uuid4().hex}.tmp'
+        joblib.dump(models, tmp_path)
+        try:
+            os.replace(tmp_path, path)
+        except OSError:
+            # the same entry is saved by other process
+            os.remove(tmp_path)
+        self.__evict(name)
+
+    def clear(self, name: str = None) -> None:
+        """
+        Removes entries of the strategy (all entries if None)
+        :param name: strategy name
+        """
+        for entry in self.__entries(name):
+            os.remove(entry)
+
+    def __entries(self, name: str = None) -> list:
+        """
+        Cached entries paths from the last used
+        :param name: strategy name (all strategies if None)
+        """
+        if not os.path.isdir(self.root):
+            return []
+        prefix = '' if name is None else f'{name}_'
+        entries = {}
+        for file_name in os.listdir(self.root):
+            if file_name.startswith(prefix) and file_name.endswith('.joblib'):
+                path = os.path.join(self.root, file_name)
+                try:
+                    entries[path] = os.path.getmtime(path)
+                except FileNotFoundError:
+                    # entry is evicted by other process
+                    pass
+        return sorted(entries, key=entries.get, reverse=True)
+
+    def __evict(self, name: str) -> None:
+        """
+        :param name: strategy name
+        """
+        for entry in self.__entries(name)[self.max_entries:]:
+            try:
+                os.remove(entry)
+            except FileNotFoundError:
+                pass
+
+    def __path(self, name: str, key: str) -> str:
+        return os.path.join(self.root, f'{name}_{key}.joblib')
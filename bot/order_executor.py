@@ -0,0 +1,228 @@
+from binance.error import ClientError, ServerError
+from binance.spot import Spot
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import wait as wait_futures
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError, Timeout
+from threading import Lock
+from time import perf_counter, sleep
+
+import numpy as np
+import uuid
+
+# error code of rejected order (duplicate id, insufficient balance etc.)
+rejected_order_code = -2010
+# rejection message of order with already used client order id
+duplicate_order_message = "Duplicate order sent."
+# error code of order query by unknown id
+unknown_order_code = -2013
+
+
+class OrderExecutor:
+    """
+    Sends market orders by worker threads with pooled connections
+    Orders are retried with the same client order id, so they are sent
+    once even if response is lost
+    Latencies from trading signal to request and from request to answer
+    are kept for statistics
+    """
+    def __init__(
+        self,
+        client: Spot,
+        num_workers: int = 1,
+        num_retries: int = 3,
+        retry_delay: float = 0.5,
+        id_prefix: str = "bot",
+        num_latencies: int = 10000,
+    ):
+        """
+        :param client: market client
+        :param num_workers: number of orders sent at the same time
+        :param num_retries: max number of tries to send order
+        :param retry_delay: time in seconds between tries
+        :param id_prefix: prefix of client order ids
+        :param num_latencies: number of last orders in latency statistics
+        """
+        self.client = client
+        self.num_retries = num_retries
+        self.retry_delay = retry_delay
+        self.id_prefix = id_prefix
+        # connections are kept alive for every worker
+        session = getattr(client, 'session', None)
+        if session is not None:
+            adapter = HTTPAdapter(pool_maxsize=num_workers)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+        self.num_workers = num_workers
+        # workers are started by the first order
+        self.__pool = None
+        self.__pending = set()
+        self.__lock = Lock()
+        # latencies in seconds
+        self.__signal_to_submit = deque(maxlen=num_latencies)
+        self.__submit_to_ack = deque(maxlen=num_latencies)
+
+    def new_client_order_id(self) -> str:
+        """Unique client order id (36 symbols max)"""
+        return f"{self.id_prefix}_{uuid.uuid4().hex}"[:36]
+
+    def submit(
+        self,
+        symbol: str,
+        side: str,
+        signal_time: float = None,
+        callback=None,
+        **params,
+    ) -> Future:
+        """
+        Queues market order, returns future of order response
+        :param symbol: trading pair
+        :param side: BUY or SELL
+        :param signal_time: perf_counter time of trading decision
+        :param callback: function called by order response
+        (None if order is failed) before future is done
+        :param params: other new_order params
+        """
+        if signal_time is None:
+            signal_time = perf_counter()
+        params.setdefault('newClientOrderId', self.new_client_order_id())
+        with self.__lock:
+            if self.__pool is None:
+                self.__pool = ThreadPoolExecutor(self.num_workers)
+            pool = self.__pool
+        future = pool.submit(
+            self.__send,
+            symbol,
+            side,
+            signal_time,
+            callback,
+            params,
+        )
+        with self.__lock:
+            self.__pending.add(future)
+        return future
+
+    def wait(self, timeout: float = None) -> None:
+        """
+        Waits for all the sent orders,
+        raises the first error of failed orders
+        :param timeout: max time to wait in seconds (forever if None)
+        """
+        with self.__lock:
+            pending = list(self.__pending)
+        done, _ = wait_futures(pending, timeout)
+        with self.__lock:
+            self.__pending.difference_update(done)
+        for future in done:
+            if future.exception() is not None:
+                raise future.exception()
+
+    def close(self) -> None:
+        """
+        Waits for sent orders and stops workers,
+        new workers are started by the next order
+        """
+        with self.__lock:
+            pool = self.__pool
+            self.__pool = None
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+    def latency_percentiles(self, percentiles: list = [50, 90, 99]) -> dict:
+        """
+        Returns latency percentiles in ms by latency name
+        signal_to_submit - from trading decision to request
+        submit_to_ack - from request to market answer
+        :param percentiles: percentiles in range [0, 100]
+        """
+        result = {}
+        for name, latencies in [
+            ('signal_to_submit', self.__signal_to_submit),
+            ('submit_to_ack', self.__submit_to_ack),
+        ]:
+            values = np.array(latencies) * 1000
+            result[name] = {
+                percentile: float(np.percentile(values, percentile))
+                if values.shape[0] else None
+                for percentile in percentiles
+            }
+        return result
+
+    def __send(
+        self,
+        symbol: str,
+        side: str,
+        signal_time: float,
+        callback,
+        params: dict,
+    ) -> dict:
+        """
+        Sends order with retries, returns order response
+        :param symbol: trading pair
+        :param side: BUY or SELL
+        :param signal_time: perf_counter time of trading decision
+        :param callback: function called by order response
+        :param params: other new_order params with client order id
+        """
+        order = None
+        try:
+            submit_time = perf_counter()
+            order = self.__send_retrying(symbol, side, params)
+            ack_time = perf_counter()
+            self.__signal_to_submit.append(submit_time - signal_time)
+            self.__submit_to_ack.append(ack_time - submit_time)
+            return order
+        finally:
+            if callback is not None:
+                callback(order)
+
+    def __send_retrying(self, symbol: str, side: str, params: dict) -> dict:
+        """
+        Sends order until it is accepted or tries are over
+        :param symbol: trading pair
+        :param side: BUY or SELL
+        :param params: other new_order params with client order id
+        """
+        for i in range(self.num_retries):
+            try:
+                if i > 0:
+                    # order of the previous try can be accepted
+                    # with lost answer
+                    order = self.__get_sent_order(symbol, params)
+                    if order is not None:
+                        return order
+                return self.client.new_order(
+                    symbol=symbol,
+                    side=side,
+                    **params,
+                )
+            except ClientError as e:
+                if i == 0 or e.error_code != rejected_order_code or \
+                        e.error_message != duplicate_order_message:
+                    raise
+                # order is accepted after it was not found
+                return self.client.get_order(
+                    symbol,
+                    origClientOrderId=params['newClientOrderId'],
+                )
+            except (ServerError, ConnectionError, Timeout):
+                if i + 1 == self.num_retries:
+                    raise
+                sleep(self.retry_delay)
+
+    def __get_sent_order(self, symbol: str, params: dict) -> dict:
+        """
+        Returns order sent by the previous try or None if it is unknown
+        :param symbol: trading pair
+        :param params: new_order params with client order id
+        """
+        try:
+            return self.client.get_order(
+                symbol,
+                origClientOrderId=params['newClientOrderId'],
+            )
+        except ClientError as e:
+            if e.error_code != unknown_order_code:
+                raise
+            return None
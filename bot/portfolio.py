@@ -0,0 +1,143 @@
+from bot.exchange_info import ExchangeInfo
+from bot.ledger import Ledger
+from bot.market_feed import Feed
+from bot.order_executor import OrderExecutor
+from bot.settings import Settings
+from bot.trader import Trader
+
+from binance.spot import Spot
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+
+class Portfolio:
+    """
+    Trades several symbols from one process with one market client
+    and one symbol filters cache, balances ledger and orders sender
+    Candles of all symbols are awaited together on every candle close,
+    balances are queried once and split between symbols
+    """
+    def __init__(
+        self,
+        api_key: str,
+        sec_key: str,
+        settings_file_path: str = "settings.json",
+        feeds: dict = None,
+    ):
+        """
+        :param api_key: api key to market
+        :param sec_key: secure key to market
+        :param settings_file_path: path for settings.json
+        :param feeds: market data feeds by symbol
+        (market kline streams by default)
+        """
+        self.__settings = Settings.get(settings_file_path).section('trader')
+        self.client = Spot(
+            api_key,
+            sec_key,
+            base_url="https://api.binance.com",
+        )
+        # filters of all the symbols are loaded by one query
+        self.exchange_info = ExchangeInfo(
+            self.client,
+            [
+                config['first_asset'] + config['second_asset']
+                for config in self.__settings['portfolio']
+            ],
+            ttl=self.__settings['exchange_info_ttl'],
+        )
+        self.ledger = Ledger(
+            self.client,
+            self.__settings['balance_reconcile_friq'],
+        )
+        self.executor = OrderExecutor(
+            self.client,
+            max(
+                self.__settings['order_workers'],
+                len(self.__settings['portfolio']),
+            ),
+            self.__settings['order_retries'],
+            self.__settings['order_retry_delay'],
+        )
+        feeds = feeds or {}
+        self.traders = []
+        self.__weights = []
+        for config in self.__settings['portfolio']:
+            # symbol config replaces common trader settings
+            params = dict(config)
+            self.__weights.append(params.pop('weight', 1))
+            symb = params['first_asset'] + params['second_asset']
+            self.traders.append(Trader(
+                api_key,
+                sec_key,
+                params['first_asset'],
+                params['second_asset'],
+                settings_file_path=settings_file_path,
+                feed=feeds.get(symb),
+                client=self.client,
+                params=params,
+                exchange_info=self.exchange_info,
+                ledger=self.ledger,
+                executor=self.executor,
+            ))
+
+    def trade(self) -> None:
+        """
+        Function to start infinite loop to trade all the symbols
+        on every candle close, returns when all feeds are stopped
+        """
+        with ThreadPoolExecutor(len(self.traders)) as executor:
+            feeds = list(executor.map(Trader.start, self.traders))
+            self.update_balances()
+            for trader in self.traders:
+                trader.print_state()
+            try:
+                while any(feed.is_running for feed in feeds):
+                    # feeds wait for the same candle close concurrently
+                    candles = list(executor.map(self.__next, feeds))
+                    steps = [
+                        (trader, table)
+                        for trader, table in zip(self.traders, candles)
+                        if table.shape[0] > 0
+                    ]
+                    if not steps:
+                        continue
+                    # orders of all the symbols are sent concurrently
+                    # by executor workers
+                    list(executor.map(lambda step: step[0].step(step[1]),
+                                      steps))
+                    self.update_balances()
+            finally:
+                for feed in feeds:
+                    feed.close()
+                self.executor.close()
+
+    def update_balances(self) -> None:
+        """
+        Updating balances of all the traders by one ledger,
+        every asset is split between its symbols by symbol weights
+        """
+        self.executor.wait()
+        self.ledger.update()
+        total_weights = {}
+        for trader, weight in zip(self.traders, self.__weights):
+            for asset in [trader.first_asset, trader.second_asset]:
+                total_weights[asset] = total_weights.get(asset, 0) + weight
+        for trader, weight in zip(self.traders, self.__weights):
+            trader.set_balances(
+                self.ledger.get(trader.first_asset) * weight /
+                total_weights[trader.first_asset],
+                self.ledger.get(trader.second_asset) * weight /
+                total_weights[trader.second_asset],
+            )
+
+    def __next(self, feed: Feed) -> pd.DataFrame:
+        """
+        Waits for new closed candles of one symbol
+        late symbols get their candles on the next close
+        :param feed: symbol market data feed
+        """
+        if not feed.is_running:
+            return pd.DataFrame(columns=['Open time'])
+        return feed.next(self.__settings['stream_timeout'])
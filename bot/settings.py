@@ -0,0 +1,178 @@
+from bot.exceptions import SettingsError
+
+from threading import RLock
+
+import copy
+import json
+import os
+import weakref
+
+number = (int, float)
+# required params and their types by settings section
+schema = {
+    'main': {
+        'log_file': str,
+        'num_fail_tries': int,
+        'timezone': number,
+    },
+    'features': {
+        'cache_dir': str,
+        'dtype': str,
+        'max_size_mb': number,
+    },
+    'logging': {
+        'batch_size': int,
+        'flush_interval': number,
+        'overflow_policy': str,
+        'queue_size': int,
+    },
+    'parser': {
+        'log_file': str,
+        'batch_size': int,
+        'num_fail_tries': int,
+        'num_workers': int,
+        'request_weight': number,
+        'weight_per_minute': number,
+    },
+    'trader': {
+        'balance_reconcile_friq': int,
+        'exchange_info_ttl': number,
+        'first_asset': str,
+        'indicators': list,
+        'indicator_window': int,
+        'log_file': str,
+        'num_stored_rows': int,
+        'order_retries': int,
+        'order_retry_delay': number,
+        'order_workers': int,
+        'portfolio': list,
+        'reconnect_delay': number,
+        'refresh_friq': int,
+        'second_asset': str,
+        'slippage': number,
+        'stream_timeout': number,
+        'stream_url': str,
+        'strategy': str,
+        'timeframe': str,
+        'withdrawal_coef': number,
+    },
+    'strategist': {
+        'CCI': dict,
+        'SGD': dict,
+    },
+}
+
+
+class Settings:
+    """
+    Settings file parsed once and shared by all the modules
+    File is parsed again only if its stat (mtime, size, inode) changes,
+    subscribers are notified about changed sections
+    """
+    # shared settings by file path
+    __instances = {}
+    __instances_lock = RLock()
+
+    def __init__(self, path: str = "settings.json"):
+        """
+        :param path: path for settings.json
+        """
+        self.path = path
+        # error of the last reload, old settings are used after it
+        self.error = None
+        self.__sections = {}
+        self.__stat = None
+        self.__subscribers = {}
+        self.__lock = RLock()
+        self.check()
+        if self.error is not None:
+            raise self.error
+
+    @classmethod
+    def get(cls, path: str = "settings.json"):
+        """
+        Returns shared settings of file
+        :param path: path for settings.json
+        """
+        key = os.path.abspath(path)
+        with cls.__instances_lock:
+            if key not in cls.__instances:
+                cls.__instances[key] = Settings(path)
+            return cls.__instances[key]
+
+    def section(self, name: str) -> dict:
+        """
+        Returns copy of actual settings section
+        :param name: section name
+        """
+        self.check()
+        with self.__lock:
+            return copy.deepcopy(self.__sections[name])
+
+    def check(self) -> bool:
+        """
+        Reloads settings if file is changed, returns True if it is
+        """
+        stat = os.stat(self.path)
+        signature = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        with self.__lock:
+            if signature == self.__stat:
+                return False
+            # wrong file is not parsed again till the next change
+            self.__stat = signature
+            try:
+                with open(self.path, 'r') as f:
+                    sections = json.load(f)
+                self.validate(sections)
+            except (ValueError, SettingsError) as e:
+                self.error = SettingsError(f"{self.path}: {e}")
+                return False
+            self.error = None
+            changed = [
+                name for name, values in sections.items()
+                if self.__sections.get(name) != values
+            ]
+            self.__sections = sections
+            callbacks = [
+                (name, callback)
+                for name in changed
+                for callback in self.__subscribers.get(name, [])
+            ]
+        for name, callback in callbacks:
+            function = callback()
+            if function is not None:
+                function(name, copy.deepcopy(sections[name]))
+        return True
+
+    def subscribe(self, section: str, callback) -> None:
+        """
+        Adds function called by changed section after reload,
+        method of object is not kept when the object is deleted
+        :param section: section name
+        :param callback: function(section name, section values)
+        """
+        if hasattr(callback, '__self__'):
+            reference = weakref.WeakMethod(callback)
+        else:
+            def reference():
+                return callback
+        with self.__lock:
+            self.__subscribers.setdefault(section, []).append(reference)
+
+    @staticmethod
+    def validate(sections: dict) -> None:
+        """
+        Raises SettingsError if required params are missed or wrong
+        :param sections: parsed settings
+        """
+        for name, params in schema.items():
+            if name not in sections:
+                raise SettingsError(f"No section {name}")
+            for param, param_type in params.items():
+                if param not in sections[name]:
+                    raise SettingsError(f"No param {name}.{param}")
+                if not isinstance(sections[name][param], param_type):
+                    raise SettingsError(
+                        f"Wrong type of {name}.{param}: "
+                        f"{type(sections[name][param]).__name__}"
+                    )
@@ -0,0 +1,72 @@
+"""
+Tables shared with worker processes by memory mapped arrays
+Float columns are stored in one matrix and datetime columns in another,
+workers open them without copying
+"""
+import json
+import numpy as np
+import os
+import pandas as pd
+
+# tables opened by the current process
+_opened_tables = {}
+
+
+def save_table(path: str, table: pd.DataFrame, dtype=np.float64) -> None:
+    """
+    Saves table to memory mapped arrays
+    :param path: directory to save arrays (it should not exist)
+    :param table: dataframe with numeric and datetime columns
+    :param dtype: type of numeric columns (float64 or float32)
+    """
+    time_columns = [
+        col for col in table.columns
+        if not pd.api.types.is_numeric_dtype(table[col])
+    ]
+    os.makedirs(path)
+    np.save(
+        os.path.join(path, 'values.npy'),
+        table.drop(columns=time_columns).to_numpy(dtype=dtype),
+    )
+    if time_columns:
+        times = np.stack([
+            pd.to_datetime(table[col]).to_numpy('datetime64[ns]')
+            .view(np.int64)
+            for col in time_columns
+        ])
+        np.save(os.path.join(path, 'times.npy'), times)
+    with open(os.path.join(path, 'columns.json'), 'w') as f:
+        json.dump({
+            'columns': list(table.columns),
+            'time_columns': time_columns,
+        }, f)
+
+
+def open_table(path: str) -> pd.DataFrame:
+    """
+    Opens memory mapped table without copying float columns,
+    table is opened once by process
+    :param path: directory with table arrays
+    """
+    if path not in _opened_tables:
+        with open(os.path.join(path, 'columns.json'), 'r') as f:
+            info = json.load(f)
+        columns = info['columns']
+        time_columns = info['time_columns']
+        values = np.load(os.path.join(path, 'values.npy'), mmap_mode='r')
+        value_columns = [col for col in columns if col not in time_columns]
+        table = pd.DataFrame(values, columns=value_columns, copy=False)
+        if time_columns:
+            times = np.load(os.path.join(path, 'times.npy'), mmap_mode='r')
+            for i, col in enumerate(time_columns):
+                table[col] = times[i].view('datetime64[ns]')
+        _opened_tables[path] = table[columns]
+    return _opened_tables[path]
+
+
+def close_table(path: str) -> None:
+    """
+    Forgets opened table, its arrays are closed when table is not used
+    :param path: directory with table arrays
+    """
+    _opened_tables.pop(path, None)
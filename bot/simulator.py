@@ -1,80 +1,148 @@
-from time import sleep
+from bot.kernels import has_numba, njit
+from bot.strategist import Strategy, get_strategy
 
+import numpy as np
 import pandas as pd
 
 
-class Simulator:
-
-    __free_money = 1000
-    __active_money = 1000
-    __print_friq = 1000000
-    __withdrawal_coef = 0
-    __income = 0
-    __comission = 1e-3
-
-    def __init__(self, df_x: pd.DataFrame, df_y: pd.DataFrame):
-        """
-        :param df_x: dataframe with candles
-        :param df_y: dataframe with results
-        """
-        self.params = df_x
-        self.result = df_y["Close Delta"]
-
-    def simulate(self) -> None:
-        def print_state(buy: int = None):
-            print(
-                f"Days: {i//12//24}, "
-                f"First: {int(self.__active_money)}, "
-                f"Second: {int(self.__free_money)}, "
-                f"Price: {int(row['Close'])}, "
-                f"Income: {self.__income}, "
-                f"Volume: {row['Volume usd'] / 10000}, ",
-                "" if buy is None else f"Buy: {buy}"
-            )
-
-        priv_price = self.params['Close'].iloc[0]
+def _simulate_events(
+    rows,
+    prices,
+    predictions,
+    state,
+    commission: float,
+    withdrawal_coef: float,
+    free_out,
+    amount_out,
+    income_out,
+) -> int:
+    """
+    Account state machine over rows where something happens
+    returns number of simulated rows (less if money is over)
+    :param rows: sorted indices of rows with orders or price growth
+    :param prices: close prices of all the rows
+    :param predictions: strategy predictions of all the rows
+    :param state: free money, first asset amount and income at start
+    :param commission: comission part of order (from 0 to 1)
+    :param withdrawal_coef: part of price growth profit to withdraw
+    :param free_out: free money after every simulated row
+    :param amount_out: first asset amount after every simulated row
+    :param income_out: withdrawn income after every simulated row
+    """
+    free = state[0]
+    amount = state[1]
+    income = state[2]
+    for k in range(len(rows)):
+        i = rows[k]
+        price = prices[i]
+        if withdrawal_coef > 0 and i > 0 and price > prices[i - 1]:
+            # part of profit is sold and withdrawn
+            bonus = amount * (price - prices[i - 1]) * withdrawal_coef
+            amount -= bonus / price
+            income += bonus * (1 - commission)
+        if free + amount * price <= 0.001:
+            return k
+        pred = predictions[i]
+        if pred > 0 and amount > 0:
+            sold = pred * amount
+            amount -= sold
+            free += sold * price * (1 - commission)
+        elif pred < 0 and free > 0:
+            money = -pred * free
+            free -= money
+            amount += money * (1 - commission) / price
+        free_out[k] = free
+        amount_out[k] = amount
+        income_out[k] = income
+    return len(rows)
 
-        for i, row in self.params.iterrows():
-            if i % self.__print_friq == 0:
-                print_state()
-                sleep(0.05)
 
-            new_active_money = self.__active_money * row['Close'] / priv_price
-            if row['Close'] > priv_price:
-                inc_bonus = (new_active_money - self.__active_money) * \
-                    self.__withdrawal_coef
-                self.__buy(-1 * inc_bonus)
-                self.__income += inc_bonus
-                self.__free_money -= inc_bonus
-            self.__active_money = new_active_money
+if has_numba:
+    _simulate_events = njit(cache=True)(_simulate_events)
 
-            money = (self.__free_money + self.__active_money)
-            if money <= 0.001:
-                print("No money!!!", i, "staps gone.")
-                return
 
-            # operations = pd.DataFrame(
-            #     columns=['usd', 'cripto', 'buy', 'price']
-            # )
-            if (row['CCI'] > 100 and self.__active_money > 0):
-                print_state(-1 * self.__active_money)
-                self.__buy(-1 * self.__active_money)
-
-            elif (row['CCI'] < -100 and self.__free_money > 0):
-                print_state(self.__free_money)
-                self.__buy(self.__free_money)
-
-            priv_price = row['Close']
+class Simulator:
+    """
+    Trading account backtest by strategy predictions
+    Free money and first asset change by orders with commission,
+    part of price growth profit can be withdrawn as income
+    """
+    def __init__(
+        self,
+        table: pd.DataFrame,
+        strategy="CCI",
+        money: float = 1000,
+        commission: float = 1e-3,
+        withdrawal_coef: float = 0,
+        strategy_params: dict = None,
+    ):
+        """
+        :param table: dataframe with candles and strategy indicators
+        :param strategy: Strategy object or strategy name
+        :param money: free money (second asset) at start
+        :param commission: comission part of order (from 0 to 1)
+        :param withdrawal_coef: part of price growth profit to withdraw
+        :param strategy_params: params to replace ones from settings
+        (if strategy is given by name)
+        """
+        self.table = table
+        self.strategy = strategy if isinstance(strategy, Strategy) else \
+            get_strategy(strategy, strategy_params)
+        self.money = money
+        self.commission = commission
+        self.withdrawal_coef = withdrawal_coef
 
-    def __buy(self, money: float) -> None:
+    def simulate(self) -> np.ndarray:
         """
-        :param money: how much crypto to buy
+        Returns equity curve: free money, first asset value and
+        withdrawn income in second asset after every row
         """
-        if money > 0:
-            money = min(self.__free_money, money)
-            self.__free_money -= money
-            self.__active_money += money * (1 - self.__comission)
-        else:
-            money = max(-self.__active_money, money)
-            self.__free_money -= money * (1 - self.__comission)
-            self.__active_money += money
+        prices = self.table['Close'].to_numpy(dtype=np.float64)
+        predictions = np.array(
+            self.strategy.predict_series(self.table),
+            dtype=np.float64,
+        )
+        # first rows do not have enough history
+        predictions[:self.strategy.window - 1] = 0
+
+        # state is changed only by orders and withdrawals
+        is_event = predictions != 0
+        if self.withdrawal_coef > 0:
+            is_event[1:] |= prices[1:] > prices[:-1]
+        rows = np.flatnonzero(is_event)
+        free = np.empty(rows.shape[0] + 1)
+        amount = np.empty(rows.shape[0] + 1)
+        income = np.empty(rows.shape[0] + 1)
+        free[0], amount[0], income[0] = self.money, 0.0, 0.0
+        args = [
+            rows,
+            prices,
+            predictions,
+            np.array([self.money, 0.0, 0.0]),
+            self.commission,
+            self.withdrawal_coef,
+        ]
+        outputs = [free[1:], amount[1:], income[1:]]
+        if not has_numba:
+            # python loop is faster on lists
+            args = [
+                value.tolist() if isinstance(value, np.ndarray) else value
+                for value in args
+            ]
+            outputs = [[0.0] * rows.shape[0] for _ in range(3)]
+        num_rows = _simulate_events(*args, *outputs)
+        if not has_numba:
+            free[1:], amount[1:], income[1:] = outputs
+
+        # every row gets state of the last event before it
+        state_index = np.searchsorted(
+            rows[:num_rows],
+            np.arange(prices.shape[0]),
+            side='right',
+        )
+        equity = free[state_index] + amount[state_index] * prices + \
+            income[state_index]
+        if num_rows < rows.shape[0]:
+            # money is over
+            equity[rows[num_rows]:] = 0
+        return equity
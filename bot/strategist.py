@@ -1,20 +1,29 @@
-import json
+import joblib
+import numpy as np
+import os
 import pandas as pd
 
 from sklearn.linear_model import SGDRegressor
 # from sklearn.metrics import mean_absolute_error as mae
 from sklearn.preprocessing import StandardScaler
+from time import perf_counter
 
-from bot.utiles import time_to_int
-from bot.indicators import Indicators
+from bot.candle_store import load_table
+from bot.feature_cache import FeatureCache
+from bot.model_cache import ModelCache
+from bot.settings import Settings
+from bot.utiles import times_to_int
 
 
 class Strategy:
     """pattern strategy class"""
     window: int = 10
 
-    def __init__(self):
-        """load settings and fit models here"""
+    def __init__(self, params: dict = None):
+        """
+        load settings and fit models here
+        :param params: strategy params to replace ones from settings
+        """
         pass
 
     def predict(self, table: pd.DataFrame) -> float:
@@ -28,6 +37,28 @@ class Strategy:
         """
         pass
 
+    def update(self, table: pd.DataFrame) -> None:
+        """
+        function is called after every trading step
+        to learn on candles which results are known now
+        it should not take much time (use time budget)
+        :param table: dataframe with indicators used in the last predict
+        """
+        pass
+
+    def predict_series(self, table: pd.DataFrame) -> np.ndarray:
+        """
+        function makes predictions for every row of table
+        as if the row was the last one in predict table
+        first window - 1 rows are not used in backtests
+        override it with column operations for fast backtests
+        :param table: dataframe with indicators to make predictions
+        """
+        result = np.zeros(table.shape[0])
+        for i in range(self.window - 1, table.shape[0]):
+            result[i] = self.predict(table.iloc[i - self.window + 1: i + 1])
+        return result
+
 
 class ADI_Strategy(Strategy):
     """classic ADI stratagy"""
@@ -46,12 +77,28 @@ class ADI_Strategy(Strategy):
             return 1
         return 0
 
+    def predict_series(self, table: pd.DataFrame) -> np.ndarray:
+        """
+        :param table: dataframe with indicators to make predictions
+        """
+        adi = table['ADI'].to_numpy()
+        adiema = table['ADIEMA'].to_numpy()
+        lower = adi < adiema
+        higher = adi > adiema
+        result = np.zeros(table.shape[0])
+        result[1:][lower[1:] & lower[:-1]] = -1
+        result[1:][higher[1:] & higher[:-1]] = 1
+        return result
+
 
 class CCI_Strategy(Strategy):
     """classic cci stratagy"""
-    def __init__(self):
-        with open('settings.json', 'r') as f:
-            self.__settings = json.load(f)['strategist']['CCI']
+    def __init__(self, params: dict = None):
+        """
+        :param params: strategy params to replace ones from settings
+        """
+        self.__settings = Settings.get().section('strategist')['CCI']
+        self.__settings.update(params or {})
 
     def predict(self, table: pd.DataFrame) -> float:
         """
@@ -68,68 +115,286 @@ class CCI_Strategy(Strategy):
             return max(-1, cci / 100)
         return 0
 
+    def predict_series(self, table: pd.DataFrame) -> np.ndarray:
+        """
+        :param table: dataframe with indicators to make predictions
+        """
+        cci = table['CCI'].to_numpy(dtype=float)
+        return np.where(
+            cci > self.__settings['CCI_max'],
+            np.minimum(1, cci / 100),
+            np.where(
+                cci < self.__settings['CCI_min'],
+                np.maximum(-1, cci / 100),
+                0,
+            ),
+        )
+
 
 class SGD_Strategy(Strategy):
     """SGD stratagy"""
-    def __init__(self):
-        with open('settings.json', 'r') as f:
-            settings = json.load(f)
-            self.__settings = settings['strategist']['SGD']
-            self.__trading_settings = settings['trader']
-        table = pd.read_csv(self.__settings['fit_table'])[-20000: -10000]
+    def __init__(
+        self,
+        params: dict = None,
+        refit: bool = False,
+        fit_table: pd.DataFrame = None,
+    ):
+        """
+        :param params: strategy params to replace ones from settings
+        :param refit: flag to fit models even if they are cached
+        :param fit_table: dataframe with candles and calculated indicators
+        to fit models on (not cached, online state is not loaded),
+        fit_table from settings is used if None
+        """
+        settings = Settings.get()
+        self.__settings = settings.section('strategist')['SGD']
+        self.__trading_settings = settings.section('trader')
+        self.__settings.update(params or {})
 
-        for col in ['Open time', 'Close time', 'Middle time']:
-            table[col] = table[col].apply(time_to_int)
+        # online learning state, replay buffer is a ring of rows
+        # allocated by the first learned rows
+        self.__replay_x = None
+        self.__replay_y = None
+        self.__replay_pos = 0
+        self.__replay_len = 0
+        self.__last_time = None
+        self.__num_new_rows = 0
+        self.__num_updates = 0
+        # checkpoint deferred by spent time budget
+        self.__is_checkpoint_due = False
+        # models key to check that checkpoint is made for the same models
+        self.__key = None
+        if fit_table is not None:
+            self.scaler, self.scaler_Y, self.model = \
+                self.__fit_features(fit_table.copy())
+            return
 
-        Indicators(
-            self.__trading_settings['indicator_window'],
-        ).calc_indicators(
+        table = load_table(self.__settings['fit_table'])[-20000: -10000]
+
+        # models are loaded if nothing changed since the last fit
+        cache = ModelCache(self.__settings['cache_dir'])
+        key = ModelCache.get_key(table, {
+            'indicator_window': self.__trading_settings['indicator_window'],
+            'indicators': self.__trading_settings['indicators'],
+            'model_params': SGDRegressor(
+                **self.__settings['model_params']
+            ).get_params(),
+        })
+        models = None if refit else cache.load('SGD', key)
+        if models is None:
+            models = self.__fit(table)
+            cache.save('SGD', key, models)
+        self.scaler, self.scaler_Y, self.model = models
+        self.__key = key
+
+        checkpoint = self.__settings['checkpoint_file']
+        if not self.__settings['online_learning'] or \
+                not os.path.exists(checkpoint):
+            return
+        state = joblib.load(checkpoint)
+        if refit or state.get('key') != key:
+            # online state of other models is stale
+            os.remove(checkpoint)
+            return
+        # warm start from the last online state
+        self.scaler, self.scaler_Y, self.model = state['models']
+        self.__add_replay(*state['replay'])
+        self.__last_time = state['last_time']
+
+    def __fit(self, table: pd.DataFrame) -> tuple:
+        """
+        Fits scalers and model
+        :param table: dataframe with candles to fit
+        """
+        features = FeatureCache.from_settings().get(
             table,
-            indicators=self.__trading_settings['indicators'],
-            drop_first=True,
+            self.__trading_settings['indicators'],
+            self.__trading_settings['indicator_window'],
         )
+        return self.__fit_features(features.copy())
+
+    def __fit_features(self, table: pd.DataFrame) -> tuple:
+        """
+        Fits scalers and model on table with indicators
+        :param table: dataframe with candles and indicators to fit
+        """
+        for col in ['Open time', 'Close time', 'Middle time']:
+            table[col] = times_to_int(table[col])
 
         Y_table = table['Close Delta']
         table = table.drop(
             columns=['Next Close', 'Close Delta']
         ).reset_index(drop=True)
 
-        self.scaler = StandardScaler()
-        table = pd.DataFrame(self.scaler.fit_transform(table))
-        self.scaler_Y = StandardScaler()
-        Y_table = pd.DataFrame(
-            self.scaler_Y.fit_transform(pd.DataFrame(Y_table))
-        )
+        scaler = StandardScaler()
+        table = pd.DataFrame(scaler.fit_transform(table))
+        # labels are arrays in online learning too
+        scaler_Y = StandardScaler()
+        Y_table = scaler_Y.fit_transform(
+            Y_table.to_numpy().reshape(-1, 1)
+        ).ravel()
 
-        self.model = SGDRegressor().fit(
+        model = SGDRegressor(**self.__settings['model_params']).fit(
             table,
             Y_table,
         )
-        # print(table)
-        # print(table, self.model.coef_)
-        # print(pd.Series(self.model.predict(table)), Y_table)
+        # print(table, model.coef_)
+        # print(pd.Series(model.predict(table)), Y_table)
+        return scaler, scaler_Y, model
 
     def predict(self, table_orig: pd.DataFrame) -> float:
         """
         :param table: dataframe with indicators to make predictions
         """
-        table = table_orig.copy()
-        for col in ['Open time', 'Close time', 'Middle time']:
-            table[col] = table[col].apply(time_to_int)
-
-        table = pd.DataFrame(self.scaler.transform(table))
+        table = pd.DataFrame(
+            self.scaler.transform(self.__get_features(table_orig))
+        )
 
         prediction = self.model.predict(table.iloc[-2:-1])[-1]
         result = -prediction * self.__settings['order_size_coef']
 
         return max(min(result, 1), -1)
 
+    def predict_series(self, table_orig: pd.DataFrame) -> np.ndarray:
+        """
+        :param table: dataframe with indicators to make predictions
+        """
+        table = pd.DataFrame(
+            self.scaler.transform(self.__get_features(table_orig))
+        )
+
+        # prediction is made by previous row
+        result = np.zeros(table.shape[0])
+        result[1:] = -self.model.predict(table.iloc[:-1]) * \
+            self.__settings['order_size_coef']
+        return np.clip(result, -1, 1)
+
+    def update(self, table: pd.DataFrame) -> None:
+        """
+        Online learning with partial_fit on replay buffer
+        every row except the last one is labelled by the next close
+        :param table: dataframe with indicators used in the last predict
+        """
+        if not self.__settings['online_learning']:
+            return
+        deadline = perf_counter() + self.__settings['update_time_budget']
+        if self.__is_checkpoint_due:
+            # checkpoint deferred by the last update is saved first
+            self.save_checkpoint()
+
+        close = table['Close'].to_numpy(dtype=float)
+        labels = (close[1:] - close[:-1]) / close[:-1]
+        features = self.__get_features(table.iloc[:-1])
+        if self.__last_time is not None:
+            is_new = (table['Open time'].iloc[:-1] > self.__last_time)
+            features = features[is_new.to_numpy()]
+            labels = labels[is_new.to_numpy()]
+        if labels.shape[0] == 0:
+            return
+        self.__last_time = table['Open time'].iloc[-2]
+
+        # rows with not calculated indicators can not be learned
+        is_valid = features.notna().all(axis=1).to_numpy() & \
+            np.isfinite(labels)
+        features = features[is_valid]
+        labels = labels[is_valid]
+        if labels.shape[0] == 0:
+            return
+
+        # scalers learn only new rows to not count rows twice
+        self.scaler.partial_fit(features)
+        self.scaler_Y.partial_fit(labels.reshape(-1, 1))
+        self.__add_replay(features.to_numpy(dtype=float), labels)
+        self.__num_new_rows += labels.shape[0]
+        if self.__num_new_rows < self.__settings['update_friq'] or \
+                perf_counter() > deadline:
+            # learning is deferred to the next update without budget
+            return
+        self.__num_new_rows = 0
+
+        replay_x = self.scaler.transform(pd.DataFrame(
+            self.__replay_x[:self.__replay_len],
+            columns=features.columns,
+            copy=False,
+        ))
+        replay_y = self.scaler_Y.transform(
+            self.__replay_y[:self.__replay_len].reshape(-1, 1)
+        ).ravel()
+        order = np.random.permutation(replay_y.shape[0])
+        batch_size = self.__settings['update_batch_size']
+        for i in range(0, order.shape[0], batch_size):
+            if perf_counter() > deadline:
+                break
+            batch = order[i: i + batch_size]
+            self.model.partial_fit(replay_x[batch], replay_y[batch])
+
+        self.__num_updates += 1
+        if self.__num_updates % self.__settings['checkpoint_friq'] == 0:
+            self.__is_checkpoint_due = True
+        if self.__is_checkpoint_due and perf_counter() <= deadline:
+            self.save_checkpoint()
+
+    def save_checkpoint(self) -> None:
+        """Saves online learning state to checkpoint file"""
+        checkpoint = self.__settings['checkpoint_file']
+        os.makedirs(os.path.dirname(checkpoint) or '.', exist_ok=True)
+        # replay rows are saved from the oldest one
+        order = np.roll(np.arange(self.__replay_len), -self.__replay_pos)
+        replay = (None, None) if self.__replay_x is None else \
+            (self.__replay_x[order], self.__replay_y[order])
+        joblib.dump({
+            'models': (self.scaler, self.scaler_Y, self.model),
+            'replay': replay,
+            'last_time': self.__last_time,
+            'key': self.__key,
+        }, checkpoint + '.tmp')
+        os.replace(checkpoint + '.tmp', checkpoint)
+        self.__is_checkpoint_due = False
+
+    def __add_replay(self, features: np.ndarray, labels: np.ndarray) -> None:
+        """
+        Adds rows to replay ring buffer over the oldest ones
+        :param features: model features of rows
+        :param labels: labels of rows
+        """
+        if features is None:
+            return
+        size = self.__settings['replay_size']
+        if self.__replay_x is None:
+            self.__replay_x = np.empty((size, features.shape[1]))
+            self.__replay_y = np.empty(size)
+        features = features[-size:]
+        labels = labels[-size:]
+        index = (self.__replay_pos + np.arange(labels.shape[0])) % size
+        self.__replay_x[index] = features
+        self.__replay_y[index] = labels
+        self.__replay_pos = (self.__replay_pos + labels.shape[0]) % size
+        self.__replay_len = min(self.__replay_len + labels.shape[0], size)
+
+    @staticmethod
+    def __get_features(table_orig: pd.DataFrame) -> pd.DataFrame:
+        """
+        Model features without labels and with times as numbers
+        :param table_orig: dataframe with indicators
+        """
+        table = table_orig.drop(
+            columns=['Next Close', 'Close Delta'],
+            errors='ignore',
+        )
+        for col in ['Open time', 'Close time', 'Middle time']:
+            table[col] = times_to_int(table[col])
+        return table
+
 
-def get_strategy(strategy_name: str) -> Strategy:
-    """get strategy object by name"""
+def get_strategy(strategy_name: str, params: dict = None) -> Strategy:
+    """
+    get strategy object by name
+    :param strategy_name: strategy name
+    :param params: strategy params to replace ones from settings
+    """
     strategy_map = {
         "ADI": ADI_Strategy,
         "CCI": CCI_Strategy,
         "SGD": SGD_Strategy,
     }
-    return strategy_map[strategy_name]()
+    return strategy_map[strategy_name](params)
@@ -0,0 +1,356 @@
+import math
+import numpy as np
+import pandas as pd
+
+from collections import deque
+
+from bot.exceptions import WrongIndicator
+from bot.indicators import Indicators, ema_modes, obv_modes
+
+
+class RollingSum:
+    """
+    Running sum over the last window values
+    Repeats pandas rolling sum step by step (compensated add and remove,
+    non finite values are skipped) so results are the same as in batch
+    """
+    def __init__(self, window: int, min_periods: int = None):
+        """
+        :param window: number of values in sum
+        :param min_periods: min number of finite values to return sum
+        """
+        self.window = window
+        self.min_periods = window if min_periods is None else min_periods
+        self.__values = [math.nan] * window
+        self.__pos = 0
+        self.__num_pushed = 0
+        self.__nobs = 0
+        self.__sum = 0.0
+        self.__comp_add = 0.0
+        self.__comp_remove = 0.0
+        self.__num_same = 0
+        self.__prev = math.nan
+
+    def push(self, value: float) -> float:
+        """
+        Adds value and returns sum of window or NaN if not enough values
+        :param value: new value
+        """
+        value = float(value)
+        if not math.isfinite(value):
+            value = math.nan
+        if self.window <= 1:
+            # pandas recalculates one value window from scratch
+            self.__nobs = 0
+            self.__sum = self.__comp_add = 0.0
+            self.__num_same = 0
+            self.__prev = value
+        elif self.__num_pushed >= self.window:
+            old = self.__values[self.__pos]
+            if old == old:
+                self.__nobs -= 1
+                y = -old - self.__comp_remove
+                t = self.__sum + y
+                self.__comp_remove = t - self.__sum - y
+                self.__sum = t
+        if value == value:
+            self.__nobs += 1
+            y = value - self.__comp_add
+            t = self.__sum + y
+            self.__comp_add = t - self.__sum - y
+            self.__sum = t
+            if value == self.__prev:
+                self.__num_same += 1
+            else:
+                self.__num_same = 1
+            self.__prev = value
+        self.__values[self.__pos] = value
+        self.__pos = (self.__pos + 1) % self.window
+        self.__num_pushed += 1
+
+        if self.__nobs == 0 == self.min_periods:
+            return 0.0
+        if self.__nobs < self.min_periods:
+            return math.nan
+        if self.__num_same >= self.__nobs:
+            return self.__prev * self.__nobs
+        return self.__sum
+
+
+class RecursiveEMA:
+    """
+    Exponential smoothing of one value at a time
+    Repeats the filter state of indicators.calc_ema step by step
+    """
+    def __init__(self, window: int, mode: str = "truncated"):
+        """
+        :param window: size of window to calculate alpha = 2 / (1 + window)
+        :param mode: smoothing mode from ema_modes
+        """
+        if mode not in ema_modes:
+            raise ValueError(f"No such EMA mode: {mode}")
+        alpha = 2 / (1 + window)
+        decay = 1 - alpha
+        self.__a1 = -decay
+        if mode == "infinite":
+            self.__b0 = alpha
+            self.__b_last = 0.0
+            self.__coef = 1.0
+            num_delays = 1
+        else:
+            self.__b0 = 1.0
+            self.__b_last = -decay ** window
+            self.__coef = (1 - decay ** window) / alpha
+            num_delays = window
+        # delayed inputs for the last filter coefficient
+        self.__delayed = deque([0.0] * (num_delays - 1))
+        self.__state = 0.0
+
+    def push(self, value: float) -> float:
+        """
+        Adds value and returns smoothed one
+        :param value: new value (NaN counts as 0)
+        """
+        value = float(value)
+        if value != value:
+            value = 0.0
+        elif math.isinf(value):
+            value = math.copysign(np.finfo(np.float64).max, value)
+        result = self.__state + self.__b0 * value
+        if self.__delayed:
+            self.__state = self.__delayed.popleft() - result * self.__a1
+            self.__delayed.append(value * self.__b_last)
+        else:
+            self.__state = value * self.__b_last - result * self.__a1
+        return result / self.__coef
+
+
+class StreamIndicators:
+    """
+    Indicators calculation candle by candle with O(1) cost per candle
+    Gives the same values as Indicators on the same candles
+    """
+    def __init__(
+        self,
+        window: int = 12,
+        indicators: list = ["ALL"],
+        ema_mode: str = "truncated",
+        obv_mode: str = "window",
+        num_stored_rows: int = None,
+    ):
+        """
+        :param window: size of window to indicators calculation
+        :param indicators: list of needed indicators
+        :param ema_mode: exponential smoothing mode from ema_modes
+        :param obv_mode: on-balance volume mode from obv_modes
+        :param num_stored_rows: number of last rows to store in table
+        """
+        if "ALL" in indicators:
+            indicators = Indicators.ind_list.copy()
+        diff = set(indicators).difference(set(Indicators.ind_list))
+        if diff:
+            raise WrongIndicator(f'No such indicators: {list(diff)}')
+        if ema_mode not in ema_modes:
+            raise ValueError(f"No such EMA mode: {ema_mode}")
+        if obv_mode not in obv_modes:
+            raise ValueError(f"No such OBV mode: {obv_mode}")
+
+        self.window = window
+        self.indicators = indicators
+        self.ema_mode = ema_mode
+        self.obv_mode = obv_mode
+        self.num_stored_rows = num_stored_rows
+        self.reset()
+
+    def reset(self) -> None:
+        """Forgets all candles"""
+        self.num_rows = 0
+        self.last_time = None
+        self.__rows = deque(maxlen=self.num_stored_rows)
+        self.__sums = {}
+        self.__emas = {}
+        self.__prev_close = 0.0
+        # cumulative signed volume and its last window values
+        self.__obv = 0.0
+        self.__obv_history = deque(maxlen=self.window + 1)
+        self.__prev_tp = 0.0
+
+    @property
+    def is_ready(self) -> bool:
+        """True if first probably uncorrect rows are passed"""
+        return self.num_rows > self.window * 4
+
+    @property
+    def table(self) -> pd.DataFrame:
+        """Stored rows with indicators"""
+        return pd.DataFrame(list(self.__rows))
+
+    def update(self, candle: dict) -> dict:
+        """
+        Adds one closed candle and calculates indicators for it
+        :param candle: candle in Parser table format (dict or row)
+        """
+        row = dict(candle)
+        for indicator in self.indicators:
+            getattr(self, f'calc_{indicator}')(row)
+        self.__prev_close = float(row['Close'])
+        self.__prev_tp = row.get('TP', self.__calc_tp(row))
+        self.num_rows += 1
+        self.last_time = row.get('Open time')
+        self.__rows.append(row)
+        return row
+
+    def update_table(self, table: pd.DataFrame) -> int:
+        """
+        Adds candles newer than the last added one
+        returns number of added candles
+        :param table: dataframe with candles in Parser format
+        """
+        if self.last_time is not None and 'Open time' in table.columns:
+            table = table[table['Open time'] > self.last_time]
+        for row in table.to_dict('records'):
+            self.update(row)
+        return table.shape[0]
+
+    # ---------------------------------------------------- Main indicators
+
+    def calc_ADI(self, row: dict) -> None:
+        self.__calc_CLV(row)
+        row['ADI'] = self.__sum('ADI', row['CLV'])
+        row['ADIEMA'] = self.__ema('ADI', row['ADI'])
+
+    def calc_CCI(self, row: dict) -> None:
+        self.__calc_MAD(row)
+        row['CCI'] = (row['TP'] - row['SMA']) / \
+            (row['MAD'] + Indicators.eps) / 0.015
+
+    def calc_MACD(self, row: dict) -> None:
+        close = float(row['Close'])
+        row['MACD'] = self.__ema('Close', close) - \
+            self.__ema('Close slow', close, self.window * 2)
+        row['MACDEMA'] = self.__ema(
+            'MACD',
+            row['MACD'],
+            self.window * 3 // 4,
+        )
+
+    def calc_MFI(self, row: dict) -> None:
+        self.__calc_MR(row)
+        row['MFI'] = 100 - 100 / (1 + row['MR'])
+
+    def calc_OBV(self, row: dict) -> None:
+        close = float(row['Close'])
+        signed_volume = np.sign(close - self.__prev_close) * \
+            float(row['Volume coin'])
+        # the same cumulative sum difference as in batch
+        self.__obv += signed_volume
+        self.__obv_history.append(self.__obv)
+        row['OBV'] = self.__obv
+        if self.obv_mode == "window" and \
+                len(self.__obv_history) > self.window:
+            row['OBV'] -= self.__obv_history[0]
+        row['OBVCA'] = self.__fill(self.__sum('OBVCA', row['OBV'])) / \
+            self.window
+
+    def calc_PVT(self, row: dict) -> None:
+        close = float(row['Close'])
+        close_priv = self.__prev_close
+        value = float(row['Volume coin']) * (close - close_priv) / \
+            close_priv if close_priv else math.nan
+        row['PVT'] = self.__fill(self.__sum('PVT', value))
+        row['PVTCA'] = self.__fill(self.__sum('PVTCA', row['PVT'])) / \
+            self.window
+
+    def calc_RSI(self, row: dict) -> None:
+        self.__calc_EMAUD(row)
+        row['RS'] = row['EMAU'] / (row['EMAD'] + Indicators.eps)
+        row['RSI'] = 100 * row['EMAU'] / \
+            (row['EMAU'] + row['EMAD'] + Indicators.eps)
+
+    # ---------------------------------------------------- Auxiliary indicators
+
+    def __calc_CLV(self, row: dict) -> None:
+        if 'CLV' in row:
+            return
+        close, low, high = (
+            float(row['Close']), float(row['Low']), float(row['High'])
+        )
+        row['CLV'] = float(row['Volume coin']) * \
+            (2 * close - low - high) / (high - low + Indicators.eps)
+
+    def __calc_EMAUD(self, row: dict) -> None:
+        if 'EMA' in row:
+            return
+        delta = float(row['Close']) - self.__prev_close
+        up = 0.0 if delta < 0 else delta
+        down = 0.0 if -delta < 0 else -delta
+        row['EMA'] = self.__ema('EMA', delta)
+        row['EMAU'] = self.__ema('EMAU', up)
+        row['EMAD'] = self.__ema('EMAD', down)
+
+    def __calc_MAD(self, row: dict) -> None:
+        if 'MAD' in row:
+            return
+        self.__calc_SMA(row)
+        value = abs(row['TP'] - row['SMA'] + 0.1**10)
+        row['MAD'] = self.__fill(self.__sum('MAD', value)) / self.window
+
+    def __calc_MR(self, row: dict) -> None:
+        if 'MR' in row:
+            return
+        self.__calc_TP(row)
+        money_flow = row['TP'] * float(row['Volume coin'])
+        tp_delta = row['TP'] - self.__prev_tp
+        positive = 0.0 if tp_delta < 0 else money_flow
+        negative = 0.0 if tp_delta >= 0 else money_flow
+        positive = self.__fill(self.__sum('PMF', positive))
+        negative = self.__fill(self.__sum('NMF', negative))
+        row['MR'] = positive / max(negative, Indicators.eps)
+
+    def __calc_SMA(self, row: dict) -> None:
+        if 'SMA' in row:
+            return
+        self.__calc_TP(row)
+        row['SMA'] = self.__fill(self.__sum('SMA', row['TP'])) / self.window
+
+    def __calc_TP(self, row: dict) -> None:
+        if 'TP' in row:
+            return
+        row['TP'] = self.__calc_tp(row)
+
+    # ---------------------------------------------------- States
+
+    @staticmethod
+    def __calc_tp(row: dict) -> float:
+        return (float(row['Low']) + float(row['Close']) +
+                float(row['High'])) / 3
+
+    @staticmethod
+    def __fill(value: float) -> float:
+        """fillna(0) for one value"""
+        return 0.0 if value != value else value
+
+    def __sum(self, name: str, value: float, min_periods: int = None):
+        """
+        Pushes value to named rolling sum
+        :param name: rolling sum name
+        :param value: new value
+        :param min_periods: min number of values to return sum
+        """
+        if name not in self.__sums:
+            self.__sums[name] = RollingSum(self.window, min_periods)
+        return self.__sums[name].push(value)
+
+    def __ema(self, name: str, value: float, window: int = None) -> float:
+        """
+        Pushes value to named exponential smoothing
+        :param name: smoothing name
+        :param value: new value
+        :param window: smoothing window (self.window by default)
+        """
+        if name not in self.__emas:
+            self.__emas[name] = RecursiveEMA(
+                self.window if window is None else window,
+                self.ema_mode,
+            )
+        return self.__emas[name].push(value)
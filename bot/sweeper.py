@@ -0,0 +1,186 @@
+from bot.analyzer import Analyzer
+from bot.indicators import Indicators
+from bot.shared_table import open_table, save_table
+
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+from tempfile import TemporaryDirectory
+
+import numpy as np
+import os
+import pandas as pd
+
+
+def _run(task: dict) -> dict:
+    """
+    Runs Analyzer on one sweep configuration
+    :param task: table location, strategy name and params
+    """
+    table = open_table(task['path'])
+    result = Analyzer().analyze(
+        table,
+        task['strategy_name'],
+        task['commission'],
+        strategy_params=task['strategy_params'],
+    )
+    return {**task['params'], **result}
+
+
+class Sweeper:
+    """searches strategy params running Analyzer on process pool"""
+    # params which are not passed to strategy
+    common_params = ['indicator_window', 'commission']
+
+    def __init__(
+        self,
+        table: pd.DataFrame,
+        strategy_name: str,
+        indicators: list = ["ALL"],
+        num_workers: int = None,
+    ):
+        """
+        :param table: dataframe with candles in Parser format
+        :param strategy_name: trading strategy name
+        :param indicators: list of needed indicators
+        :param num_workers: number of processes (number of cpus by default)
+        """
+        self.table = table
+        self.strategy_name = strategy_name
+        self.indicators = indicators
+        self.num_workers = num_workers
+
+    def grid(self, space: dict, rank_by: str = 'total_profit') -> pd.DataFrame:
+        """
+        Runs all combinations of params
+        :param space: dict of param name and list of values
+        :param rank_by: Analyzer metric to sort results
+        """
+        names = list(space.keys())
+        configs = [
+            dict(zip(names, values))
+            for values in product(*(space[name] for name in names))
+        ]
+        return self.run(configs, rank_by)
+
+    def random(
+        self,
+        space: dict,
+        num_iter: int,
+        rank_by: str = 'total_profit',
+        seed: int = 0,
+    ) -> pd.DataFrame:
+        """
+        Runs random combinations of params
+        :param space: dict of param name and list of values to choose or
+        (low, high) tuple to sample uniform (integer if bounds are integer)
+        :param num_iter: number of combinations
+        :param rank_by: Analyzer metric to sort results
+        :param seed: random seed
+        """
+        rng = np.random.default_rng(seed)
+
+        def sample(values):
+            if isinstance(values, tuple):
+                low, high = values
+                if isinstance(low, int) and isinstance(high, int):
+                    return int(rng.integers(low, high + 1))
+                return float(rng.uniform(low, high))
+            return values[rng.integers(len(values))]
+
+        configs = [
+            {name: sample(values) for name, values in space.items()}
+            for _ in range(num_iter)
+        ]
+        return self.run(configs, rank_by)
+
+    def run(
+        self,
+        configs: list,
+        rank_by: str = 'total_profit',
+    ) -> pd.DataFrame:
+        """
+        Runs Analyzer for every configuration
+        returns table of params and metrics sorted by rank_by metric
+        :param configs: list of dicts with params
+        :param rank_by: Analyzer metric to sort results
+        """
+        default_window = Indicators().window
+        windows = sorted({
+            config.get('indicator_window', default_window)
+            for config in configs
+        })
+        # indicators of all windows are calculated in one pass
+        table = self.table.copy()
+        Indicators().calc_indicators(table, self.indicators, windows=windows)
+        with TemporaryDirectory() as tmp_dir:
+            tasks = []
+            for window in windows:
+                path = os.path.join(tmp_dir, f'window_{window}')
+                self.__dump_table(
+                    path,
+                    self.__get_window_table(table, window),
+                    windows[-1],
+                )
+                for config in configs:
+                    if config.get('indicator_window', default_window) \
+                            != window:
+                        continue
+                    tasks.append({
+                        'path': path,
+                        'strategy_name': self.strategy_name,
+                        'commission': config.get('commission', 1e-3),
+                        'strategy_params': {
+                            name: value for name, value in config.items()
+                            if name not in self.common_params
+                        },
+                        'params': config,
+                    })
+            with ProcessPoolExecutor(self.num_workers) as executor:
+                results = list(executor.map(_run, tasks))
+
+        return pd.DataFrame(results).sort_values(
+            rank_by,
+            ascending=False,
+            ignore_index=True,
+        )
+
+    def __get_window_table(
+        self,
+        table: pd.DataFrame,
+        window: int,
+    ) -> pd.DataFrame:
+        """
+        Table with indicators of one window named without suffixes
+        :param table: dataframe with indicators of all windows
+        :param window: indicators window
+        """
+        steps = Indicators().plan(self.indicators)
+        names = {}
+        for step in steps:
+            info = Indicators.registry[step]
+            for col in info['outputs']:
+                name = f'{col}_{window}' if info['windowed'] else col
+                names[name] = col
+        columns = {
+            col: col for col in self.table.columns
+            if col not in names.values()
+        }
+        columns.update(names)
+        return table[list(columns)].rename(columns=columns)
+
+    @staticmethod
+    def __dump_table(
+        path: str,
+        table: pd.DataFrame,
+        max_window: int,
+    ) -> None:
+        """
+        Saves table without labels and first rows to memory mapped arrays
+        :param path: directory to save arrays
+        :param table: dataframe with indicators
+        :param max_window: max window to drop the same first rows
+        """
+        save_table(path, table.drop(
+            columns=['Next Close', 'Close Delta'],
+            errors='ignore',
+        ).iloc[max_window * 4:].reset_index(drop=True))
@@ -1,14 +1,19 @@
-from bot.dataset_parser import Parser
-from bot.indicators import Indicators
+from bot.exchange_info import ExchangeInfo
+from bot.ledger import Ledger
+from bot.log_writer import LogWriter, get_log_writer
+from bot.market_feed import Feed, WebSocketFeed
+from bot.order_executor import OrderExecutor
+from bot.settings import Settings
+from bot.stream_indicators import StreamIndicators
 from bot.strategist import get_strategy
-from bot.utiles import wait_till, tf_to_minutes, time_to_int
+from bot.utiles import tf_to_minutes
 
 from binance.spot import Spot
-from datetime import datetime, timedelta
 from multipledispatch import dispatch
+from time import perf_counter
 
-import json
 import math
+import pandas as pd
 
 
 class Trader:
@@ -24,8 +29,13 @@ class Trader:
         first_asset: str = None,
         second_asset: str = None,
         tf: str = None,
-        timezone: int = 0,
         settings_file_path: str = "settings.json",
+        feed: Feed = None,
+        client: Spot = None,
+        params: dict = None,
+        exchange_info: ExchangeInfo = None,
+        ledger: Ledger = None,
+        executor: OrderExecutor = None,
     ):
         """
         :param api_key: api key to market
@@ -34,14 +44,22 @@ class Trader:
         :param second_asset: second asset of trading pair
         :param tf: candle timeframe
         :param settings_file_path: path for settings.json
+        :param feed: market data feed (market kline stream by default)
+        :param client: market client shared with other traders (optional)
+        :param params: trader settings to replace ones from settings file
+        :param exchange_info: symbol filters cache shared with other traders
+        (optional)
+        :param ledger: local balances shared with other traders (optional)
+        :param executor: orders sender shared with other traders (optional)
         """
-        self.client = Spot(
+        self.client = client if client is not None else Spot(
             api_key,
             sec_key,
             base_url="https://api.binance.com",
             # proxies={ 'https': creds.proxy }
         )
         self.__settings_file = settings_file_path
+        self.__params = params or {}
         self.first_asset = first_asset
         self.__is_first_asset_given = (first_asset is not None)
         self.second_asset = second_asset
@@ -50,83 +68,192 @@ class Trader:
         if self.__is_tf_given:
             self.tf = tf
             self.__tf_minutes = tf_to_minutes(tf)
+        # strategy and indicators are created on start
+        self.__strategy = None
+        self.__indicators = None
+        self.__changed_sections = set()
+        self.__settings = {}
         self.__update_settings()
+        settings = Settings.get(settings_file_path)
+        settings.subscribe('trader', self.__on_settings_change)
+        settings.subscribe('strategist', self.__on_settings_change)
         # cleaning logs
-        f = open(self.__settings["log_file"], 'w')
-        f.close()
-        self.__parser = Parser(self.symb, self.tf, timezone)
+        self.__log.clear()
+        self.__feed = feed
+        self.__exchange_info = exchange_info if exchange_info is not None \
+            else ExchangeInfo(
+                self.client,
+                [self.symb],
+                ttl=self.__settings['exchange_info_ttl'],
+            )
+        self.__ledger = ledger if ledger is not None else Ledger(
+            self.client,
+            self.__settings['balance_reconcile_friq'],
+        )
+        # own executor is closed when trading stops
+        self.__owns_executor = executor is None
+        self.__executor = executor if executor is not None else \
+            OrderExecutor(
+                self.client,
+                self.__settings['order_workers'],
+                self.__settings['order_retries'],
+                self.__settings['order_retry_delay'],
+            )
 
     def trade(self) -> None:
-        """Function to start infinite loop to trade every timeframe minutes"""
-        def print_state(msg: str = None):
-            with open(self.__settings["log_file"], 'a') as f:
-                print(
-                    msg if msg is not None else
-                    f"Time: {start_time}, "
-                    f"First: {self.__first_balance}, "
-                    f"Second: {self.__second_balance}, "
-                    f"Price: {table.iloc[-1]['Close']}, "
-                    f"Income: {self.__income}",
-                    file=f,
-                )
+        """
+        Function to start infinite loop to trade on every candle close
+        returns when feed is stopped
+        """
+        feed = self.start()
+        self.update_balances()
+        self.print_state()
+        try:
+            while feed.is_running:
+                # waiting for candle close, missed candles are included
+                candles = feed.next()
+                if candles.shape[0] == 0:
+                    continue
+                self.step(candles)
+                # balances for the next candle are ready before its close
+                self.update_balances()
+        finally:
+            feed.close()
+            if self.__owns_executor:
+                self.__executor.close()
 
+    def start(self) -> Feed:
+        """
+        Creates strategy and indicators and starts market feed
+        returns started feed
+        """
         self.__update_settings()
-        strategy = get_strategy(self.__settings['strategy'])
-        indicators = Indicators(self.__settings['indicator_window'])
-        table = self.__parser.get_table(1)
+        self.__strategy = self.__get_strategy()
+        if self.__feed is None:
+            self.__feed = WebSocketFeed(
+                self.symb,
+                self.tf,
+                self.__settings['num_stored_rows'],
+                url=self.__settings['stream_url'],
+                timeout=self.__settings['stream_timeout'],
+                reconnect_delay=self.__settings['reconnect_delay'],
+            )
+        table = self.__feed.start()
+        self.__indicators = self.__get_indicators()
         self.__update_symb_precision(
-            table.iloc[-1]['Close']
+            table.iloc[-1]['Close'],
+            log=True,
         )
+        self.__num_steps = 0
 
-        # updating start time
-        start_time = datetime.now() + timedelta(minutes=self.__tf_minutes)
-        start_time -= timedelta(
-            minutes=time_to_int(start_time) // 60000 % self.__tf_minutes,
+        self.__log.log(
+            'start',
+            symbol=self.symb,
+            timeframe_minutes=self.__tf_minutes,
+            strategy=self.__settings['strategy'],
         )
-        start_time -= timedelta(seconds=start_time.second)
+        return self.__feed
 
-        print_state(
-            f"Start time: {start_time}, "
-            f"Timeframe: {self.__tf_minutes} mins, "
-            f"Simbol: {self.symb}, "
-            f"Strategy: {self.__settings['strategy']}"
+    @property
+    def feed(self) -> Feed:
+        """Market data feed (None till start if it is not given)"""
+        return self.__feed
+
+    def step(self, candles: pd.DataFrame) -> None:
+        """
+        Trading step on candles close, balances should be updated before
+        :param candles: new closed candles from feed
+        """
+        self.__num_steps += 1
+        self.__indicators.update_table(candles)
+        table = self.__indicators.table
+        is_refresh_step = \
+            self.__num_steps % self.__settings['refresh_friq'] == 0
+        # minimal amounts follow price by cached filters
+        self.__update_symb_precision(
+            table.iloc[-1]['Close'],
+            log=is_refresh_step,
         )
 
-        step = 0
-        while True:
-            step += 1
-            self.__update_balances()
-            if step == 1:
-                print_state()
-            wait_till(start_time)
-            # getting rows to calculate indicators
-            table = self.__parser.get_table(
-                self.__settings['num_stored_rows']
-            )
-            indicators.calc_indicators(
-                table,
-                self.__settings['indicators'],
-                drop_first=True
+        prediction = self.__strategy.predict(table)
+        self.__signal_time = perf_counter()
+        if prediction > 0:
+            self.__buy(2, prediction * self.__first_balance)
+        elif prediction < 0:
+            self.__buy(1, -prediction * self.__second_balance)
+        # learning while orders are sent
+        self.__strategy.update(table)
+
+        if is_refresh_step:
+            self.print_state()
+            self.__log.log(
+                'latency',
+                symbol=self.symb,
+                **self.__executor.latency_percentiles(),
             )
 
-            prediction = strategy.predict(table)
-            if prediction > 0:
-                self.__buy(2, prediction * self.__first_balance)
-            elif prediction < 0:
-                self.__buy(1, -prediction * self.__second_balance)
+        self.__update_settings()
+
+    def print_state(self) -> None:
+        """Writes balances state to trading log"""
+        table = self.__indicators.table
+        self.__log.log(
+            'state',
+            symbol=self.symb,
+            close_time=table.iloc[-1]['Close time'],
+            first=self.__first_balance,
+            second=self.__second_balance,
+            price=table.iloc[-1]['Close'],
+            income=self.__income,
+        )
+
+    @property
+    def __log(self) -> LogWriter:
+        """Trading log writer"""
+        return get_log_writer(
+            self.__settings['log_file'],
+            self.__settings_file,
+        )
 
-            if step % self.__settings['refresh_friq'] == 0:
-                self.__update_symb_precision(table.iloc[-1]['Close'])
-                print_state()
+    def __get_strategy(self):
+        """Creates strategy by settings"""
+        return get_strategy(
+            self.__settings['strategy'],
+            self.__settings.get('strategy_params'),
+        )
 
-            self.__update_settings()
+    def __get_indicators(self) -> StreamIndicators:
+        """Creates indicators by settings for feed window"""
+        window = self.__settings['indicator_window']
+        indicators = StreamIndicators(
+            window,
+            self.__settings['indicators'],
+            # first probably uncorrect rows are not stored
+            num_stored_rows=max(
+                self.__settings['num_stored_rows'] - window * 4,
+                2,
+            ),
+        )
+        indicators.update_table(self.__feed.table)
+        return indicators
 
-            start_time += timedelta(minutes=self.__tf_minutes)
+    def __on_settings_change(self, section: str, values: dict) -> None:
+        """
+        Marks changed settings section to apply it on the next update
+        (the change can be found by other trader thread)
+        :param section: section name
+        :param values: section settings
+        """
+        self.__changed_sections.add(section)
 
     def __update_settings(self) -> None:
-        """Updating settings from .json file"""
-        with open(self.__settings_file, 'r') as f:
-            self.__settings = json.load(f)['trader']
+        """
+        Updating settings from .json file (it is parsed only if changed)
+        strategy and indicators are rebuilt if their settings are changed
+        """
+        old_settings = self.__settings
+        self.__settings = Settings.get(self.__settings_file).section('trader')
+        self.__settings.update(self.__params)
         if not self.__is_first_asset_given:
             self.first_asset = self.__settings['first_asset']
         if not self.__is_second_asset_given:
@@ -136,33 +263,77 @@ class Trader:
             self.__tf_minutes = tf_to_minutes(self.tf)
         self.symb = self.first_asset + self.second_asset
 
-    def __update_balances(self) -> None:
-        """Updating balance making query to market"""
-        assets = self.client.user_asset()
-        self.__first_balance = [
-            float(asset['free']) for asset in assets
-            if asset['asset'] == self.first_asset
-        ]
-        self.__first_balance = \
-            self.__first_balance[0] if len(self.__first_balance) else 0
-        self.__second_balance = [
-            float(asset['free']) for asset in assets
-            if asset['asset'] == self.second_asset
-        ]
-        self.__second_balance = \
-            self.__second_balance[0] if len(self.__second_balance) else 0
-        self.__second_balance = max(0, self.__second_balance - self.__income)
-
-    def __update_symb_precision(self, price: float) -> None:
+        changed = self.__changed_sections
+        if not changed or self.__strategy is None:
+            return
+        self.__changed_sections = set()
+
+        def is_changed(keys: list) -> bool:
+            return any(
+                old_settings.get(key) != self.__settings.get(key)
+                for key in keys
+            )
+
+        if 'strategist' in changed or \
+                is_changed(['strategy', 'strategy_params']):
+            self.__strategy = self.__get_strategy()
+            self.__log.log(
+                'strategy',
+                symbol=self.symb,
+                strategy=self.__settings['strategy'],
+            )
+        if is_changed(['num_stored_rows']) and self.__feed is not None:
+            self.__feed.resize(self.__settings['num_stored_rows'])
+        if is_changed(['indicators', 'indicator_window', 'num_stored_rows']):
+            self.__indicators = self.__get_indicators()
+            self.__log.log(
+                'indicators',
+                symbol=self.symb,
+                indicators=self.__settings['indicators'],
+                indicator_window=self.__settings['indicator_window'],
+            )
+
+    def update_balances(self) -> None:
+        """
+        Updating balances by local ledger after sent orders answers,
+        market is queried only to reconcile them
+        """
+        self.__executor.wait()
+        self.__ledger.update()
+        self.set_balances(
+            self.__ledger.get(self.first_asset),
+            self.__ledger.get(self.second_asset),
+        )
+
+    def set_balances(
+        self,
+        first_balance: float,
+        second_balance: float,
+    ) -> None:
+        """
+        Sets balances available to trader
+        :param first_balance: free amount of first asset
+        :param second_balance: free amount of second asset
+        """
+        self.__first_balance = first_balance
+        self.__second_balance = max(0, second_balance - self.__income)
+
+    def __update_symb_precision(
+        self,
+        price: float,
+        log: bool = False,
+    ) -> None:
         """
         Updating market assets precisions to use in queries
+        by cached symbol filters without market queries
         :param price: curent symbol price
+        :param log: flag to write precisions to trading log
         """
-        symbol_info = self.client.exchange_info(symbol=self.symb)
+        filters = self.__exchange_info.get_filters(self.symb)
         stepSize = 0.0
         self.__min_amount_first = -1
         self.__min_amount_second = -1
-        for filter in symbol_info['symbols'][0]['filters']:
+        for filter in filters.values():
             if filter['filterType'] == 'LOT_SIZE':
                 stepSize = float(filter['stepSize'])
                 minQty = float(filter['minQty'])
@@ -185,17 +356,16 @@ class Trader:
                     self.__min_amount_first
                 )
         self.__symbol_precision = int(round(-math.log(stepSize, 10), 0))
+        if not log:
+            return
 
-        with open(self.__settings['log_file'], 'a') as f:
-            print(
-                f"Symbol precision set to {self.__symbol_precision}",
-                f"Minimal {self.first_asset} set to "
-                f"{self.__min_amount_first}",
-                f"Minimal {self.second_asset} set to "
-                f"{self.__min_amount_second}",
-                file=f,
-                sep=',\n'
-            )
+        self.__log.log(
+            'precision',
+            symbol=self.symb,
+            precision=self.__symbol_precision,
+            min_first=self.__min_amount_first,
+            min_second=self.__min_amount_second,
+        )
 
     # buing to all money
     @dispatch(int)
@@ -233,20 +403,15 @@ class Trader:
             if money < self.__min_amount_second:
                 return
 
-            with open(self.__settings['log_file'], 'a') as f:
-                print(
-                    f"Time: {datetime.now()}, ",
-                    f"Sell {money} {self.second_asset}",
-                    file=f,
-                )
-
-            _ = self.client.new_order(
+            self.__log.log(
+                'order',
                 symbol=self.symb,
-                # newClientOrderId="Test_0",
                 side='BUY',
-                type='MARKET',
-                quoteOrderQty=money,
+                amount=money,
+                asset=self.second_asset,
             )
+
+            self.__send_order('BUY', quoteOrderQty=money)
             self.__second_balance -= money
         else:
             money = min(self.__first_balance, money)
@@ -254,18 +419,33 @@ class Trader:
             if money < self.__min_amount_first:
                 return
 
-            with open(self.__settings['log_file'], 'a') as f:
-                print(
-                    f"Time: {datetime.now()}, ",
-                    f"Sell {money} {self.first_asset}",
-                    file=f,
-                )
-
-            _ = self.client.new_order(
+            self.__log.log(
+                'order',
                 symbol=self.symb,
-                # newClientOrderId="Test_0",
                 side='SELL',
-                type='MARKET',
-                quantity=money,
+                amount=money,
+                asset=self.first_asset,
             )
+
+            self.__send_order('SELL', quantity=money)
             self.__first_balance -= money
+
+    def __send_order(self, side: str, **params) -> None:
+        """
+        Sends market order by executor, its fills are applied to ledger
+        :param side: BUY or SELL
+        :param params: order amount param
+        """
+        self.__executor.submit(
+            self.symb,
+            side,
+            signal_time=self.__signal_time,
+            callback=lambda order: self.__ledger.apply_order(
+                order,
+                self.first_asset,
+                self.second_asset,
+            ),
+            type='MARKET',
+            newOrderRespType='FULL',
+            **params,
+        )
@@ -1,21 +1,72 @@
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from dateutil.parser import parse as dt_parse
-from multipledispatch import dispatch
-from time import sleep
+from threading import Lock
+from time import monotonic, sleep
 
+import numpy as np
+import pandas as pd
 
-@dispatch(str)
-def time_to_int(time: str) -> int:
-    """Convert from time to microseconds from epoch"""
-    dt = dt_parse(time)
-    return time_to_int(dt)
+_epoch = datetime(1970, 1, 1)
+_ms = timedelta(milliseconds=1)
 
 
-@dispatch(datetime)
-def time_to_int(time: datetime) -> int:  # noqa: F811
-    """Convert from time to microseconds from epoch"""
-    epoch = datetime.utcfromtimestamp(0)
-    return int((time - epoch).total_seconds() * 1000)
+def time_to_int(time) -> int:
+    """
+    Convert from time to milliseconds from epoch
+    :param time: datetime (UTC if naive), datetime64, ISO string
+    (other formats are parsed slower) or milliseconds
+    """
+    if isinstance(time, str):
+        try:
+            time = datetime.fromisoformat(time)
+        except ValueError:
+            time = dt_parse(time)
+    elif isinstance(time, pd.Timestamp):
+        # nanoseconds from epoch in UTC
+        return time.value // 1000000
+    elif isinstance(time, np.datetime64):
+        return int(time.astype('datetime64[ms]').astype(np.int64))
+    elif isinstance(time, (int, np.integer)):
+        return int(time)
+    if time.tzinfo is not None:
+        time = time.astimezone(timezone.utc).replace(tzinfo=None)
+    return (time - _epoch) // _ms
+
+
+def times_to_int(times) -> np.ndarray:
+    """
+    Convert from times column to milliseconds from epoch
+    :param times: array or series of datetime64, datetime objects,
+    ISO strings (other formats are parsed slower) or milliseconds
+    """
+    values = np.asarray(times)
+    if np.issubdtype(values.dtype, np.integer):
+        return values.astype(np.int64, copy=False)
+    if not np.issubdtype(values.dtype, np.datetime64):
+        # naive times are UTC
+        try:
+            values = pd.to_datetime(values, format='ISO8601', utc=True)
+        except ValueError:
+            values = pd.to_datetime(values, format='mixed', utc=True)
+        values = values.tz_localize(None).to_numpy()
+    return values.astype('datetime64[ms]').view(np.int64)
+
+
+def int_to_times(times) -> np.ndarray:
+    """
+    Convert from milliseconds from epoch to datetime64 column
+    :param times: array or series of milliseconds
+    """
+    return np.asarray(times, dtype=np.int64).view('datetime64[ms]')
+
+
+def times_to_str(times, unit: str = 'ms') -> np.ndarray:
+    """
+    Convert from times column to ISO strings
+    :param times: array or series of any times_to_int type
+    :param unit: the last shown part of time (s, ms etc.)
+    """
+    return np.datetime_as_string(int_to_times(times_to_int(times)), unit)
 
 
 def tf_to_minutes(tf: str) -> int:
@@ -38,3 +89,37 @@ def wait_till(end_time: datetime) -> None:
     delta = end_time - datetime.now() + timedelta(milliseconds=1)
     if delta > timedelta(0):
         sleep(delta.total_seconds())
+
+
+class TokenBucket:
+    """Thread safe rate limiter, tokens are refilled continuously"""
+    def __init__(self, capacity: float, refill_time: float = 60):
+        """
+        :param capacity: max number of tokens (weight per refill time)
+        :param refill_time: time in seconds to refill all the tokens
+        """
+        self.capacity = capacity
+        self.rate = capacity / refill_time
+        self.__tokens = capacity
+        self.__last_time = monotonic()
+        self.__lock = Lock()
+
+    def acquire(self, tokens: float = 1) -> None:
+        """
+        Waits untill the tokens are available and takes them
+        :param tokens: number of tokens to take
+        """
+        tokens = min(tokens, self.capacity)
+        while True:
+            with self.__lock:
+                now = monotonic()
+                self.__tokens = min(
+                    self.capacity,
+                    self.__tokens + (now - self.__last_time) * self.rate,
+                )
+                self.__last_time = now
+                if self.__tokens >= tokens:
+                    self.__tokens -= tokens
+                    return
+                delay = (tokens - self.__tokens) / self.rate
+            sleep(delay)
@@ -0,0 +1,137 @@
+from bot.analyzer import Analyzer
+from bot.indicators import Indicators
+from bot.settings import Settings
+from bot.shared_table import open_table, save_table
+from bot.strategist import SGD_Strategy
+
+from concurrent.futures import ProcessPoolExecutor
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+import numpy as np
+import os
+import pandas as pd
+
+
+def _run_fold(task: dict) -> dict:
+    """
+    Fits SGD strategy on train rows and analyzes it on test rows
+    :param task: features table location, fold rows and params
+    """
+    table = open_table(task['path'])
+    start = perf_counter()
+    strategy = SGD_Strategy(
+        task['strategy_params'],
+        fit_table=table.iloc[task['train_start']: task['test_start']],
+    )
+    fit_time = perf_counter() - start
+
+    start = perf_counter()
+    # the last train row is history for the first test prediction
+    test_table = table.iloc[task['test_start'] - 1: task['test_end']].drop(
+        columns=['Next Close', 'Close Delta'],
+    ).reset_index(drop=True)
+    predictions = np.asarray(
+        strategy.predict_series(test_table),
+        dtype=float,
+    )[1:]
+    prices = test_table['Close'].to_numpy(dtype=float)[1:]
+    result = Analyzer.get_result(
+        *Analyzer.calc_orders(predictions, prices),
+        task['commission'],
+    )
+    test_time = perf_counter() - start
+
+    return {
+        'fold': task['fold'],
+        'train_start': table['Open time'].iloc[task['train_start']],
+        'test_start': table['Open time'].iloc[task['test_start']],
+        'test_end': table['Open time'].iloc[task['test_end'] - 1],
+        **result,
+        'fit_time': fit_time,
+        'test_time': test_time,
+    }
+
+
+class WalkForward:
+    """
+    Walk-forward evaluation of SGD strategy on process pool
+    Strategy is fitted on rolling train rows and analyzed on the next
+    test rows, indicators are calculated once for the whole history
+    """
+    def __init__(
+        self,
+        table: pd.DataFrame,
+        train_size: int = 10000,
+        test_size: int = 2000,
+        step: int = None,
+        num_workers: int = None,
+    ):
+        """
+        :param table: dataframe with candles in Parser format
+        :param train_size: number of rows to fit strategy
+        :param test_size: number of rows to analyze strategy
+        :param step: number of rows between folds (test_size by default)
+        :param num_workers: number of processes (number of cpus by default)
+        """
+        self.table = table
+        self.train_size = train_size
+        self.test_size = test_size
+        self.step = step or test_size
+        self.num_workers = num_workers
+        # time in seconds of the last run by stage
+        self.timing = {}
+
+    def run(
+        self,
+        commission: float = 1e-3,
+        strategy_params: dict = None,
+    ) -> pd.DataFrame:
+        """
+        Runs all the folds, returns table with fold rows, Analyzer metrics
+        and fit and test times sorted by fold
+        :param commission: comission percentage in order (from 0 to 1)
+        :param strategy_params: params to replace ones from settings
+        """
+        start = perf_counter()
+        # the same indicators as SGD strategy uses in trading
+        settings = Settings.get().section('trader')
+        table = self.table.copy()
+        Indicators(settings['indicator_window']).calc_indicators(
+            table,
+            settings['indicators'],
+            drop_first=True,
+        )
+        self.timing = {'features': perf_counter() - start}
+
+        folds = range(
+            0,
+            table.shape[0] - self.train_size - self.test_size + 1,
+            self.step,
+        )
+        start = perf_counter()
+        with TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'features')
+            save_table(path, table)
+            tasks = [
+                {
+                    'path': path,
+                    'fold': i,
+                    'train_start': train_start,
+                    'test_start': train_start + self.train_size,
+                    'test_end': train_start + self.train_size +
+                    self.test_size,
+                    'commission': commission,
+                    'strategy_params': strategy_params,
+                }
+                for i, train_start in enumerate(folds)
+            ]
+            with ProcessPoolExecutor(self.num_workers) as executor:
+                results = pd.DataFrame(
+                    list(executor.map(_run_fold, tasks)),
+                )
+        self.timing['folds'] = perf_counter() - start
+        if results.shape[0]:
+            self.timing['fit'] = results['fit_time'].sum()
+            self.timing['test'] = results['test_time'].sum()
+        return results
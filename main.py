@@ -1,17 +1,24 @@
 from bot.analyzer import Analyzer
+from bot.backtester import Backtester
+from bot.candle_store import CandleStore
 from bot.drawer import draw_dataset
 from bot.dataset_parser import Parser
 from bot.exceptions import ResponseError
-from bot.indicators import Indicators
+from bot.feature_cache import FeatureCache
+from bot.log_writer import get_log_writer
+from bot.portfolio import Portfolio
+from bot.settings import Settings
 from bot.simulator import Simulator
+from bot.strategist import SGD_Strategy
+from bot.sweeper import Sweeper
 from bot.trader import Trader
+from bot.walk_forward import WalkForward
 from bot.utiles import tf_to_minutes
 
 from binance.error import ClientError, ServerError
-from datetime import datetime, timedelta
+from datetime import timedelta
 from time import sleep
 
-import json
 import pandas as pd
 import unittest
 # import warnings
@@ -22,18 +29,16 @@ pd.set_option('display.max_rows', 500)
 pd.set_option('display.max_columns', 500)
 pd.set_option('display.width', 1000)
 
-with open("settings.json", 'r') as f:
-    settings = json.load(f)["main"]
+settings = Settings.get().section("main")
 
 
 def analyze():
     """Function to calculate effectiveness of strategy"""
-    symb = 'EOS'
+    symb = 'EOSUSDT'
     tf = '1m'
     num_rows = 10000
-    table = pd.read_csv(f'data/data_{symb}_{tf}.csv').iloc[-num_rows:]
-    Indicators().calc_indicators(table, drop_first=True)
-    table = table.drop(
+    table = CandleStore().load(symb, tf, num_rows=num_rows)
+    table = FeatureCache.from_settings().get(table).drop(
         columns=['Next Close', 'Close Delta']
     ).reset_index(drop=True)
     results = Analyzer().analyze(
@@ -52,37 +57,71 @@ def analyze():
     )
 
 
+def backtest():
+    """Function to analyze strategy on long history by all cpus"""
+    table = CandleStore().load('EOSUSDT', '1m')
+    results = Backtester(table, "CCI").analyze(commission=1e-3)
+    print(*(f"{name}: {value}" for name, value in results.items()), sep="\n")
+
+
 def download():
-    """Function to download data from market"""
+    """Function to download data from market to candle store"""
+    symb = 'ETHUSDT'
+    tf = '15m'
+    start_t, end_t = "2023-01-01T00:00:00", "2023-05-15T00:00:00"
     parser = Parser(
-        'ETHUSDT',
-        '15m',
+        symb,
+        tf,
         # timezone=settings["timezone"],
         ignore_gaps=True,
     )
-    table = parser.get_table("2023-01-01T00:00:00", "2023-05-15T00:00:00")
+    store = CandleStore()
+    # only missing candles are downloaded
+    store.sync(symb, tf, start_t, end_t, parser)
     # table = parser.get_table("2023-04-12T12:20:00", 1)
-    # table = pd.read_csv("data/data_EOS_1d.csv").iloc[:300]
+    # table = store.load('EOSUSDT', '1d').iloc[:300]
     # Indicators().calc_indicators(table, drop_first=True)
     # draw_dataset(table)
-    table.to_csv('data/data.csv', index=False)
-    return table
+    return store.load(symb, tf, start_t, end_t)
 
 
 def draw():
     """Function to draw dataset"""
-    table = pd.read_csv("data/data_EOS_1d.csv").iloc[:300]
-    Indicators().calc_indicators(table, drop_first=True)
-    draw_dataset(table)
+    table = CandleStore().load('EOSUSDT', '1d').iloc[:300]
+    draw_dataset(FeatureCache.from_settings().get(table))
+
+
+def refit():
+    """Function to fit SGD strategy models again ignoring cache"""
+    SGD_Strategy(refit=True)
 
 
 def simulate():
     """Function to load data and run simulator"""
-    df = pd.read_csv("data/data_EOS_1m.csv").iloc[-9900:]
-    Indicators().calc_indicators(df, drop_first=True)
-    df_y = df[["Next Close", "Close Delta"]]
-    df_x = df.drop(columns=["Next Close", "Close Delta"])
-    Simulator(df_x, df_y).simulate()
+    df = CandleStore().load('EOSUSDT', '1m', num_rows=9900)
+    df = FeatureCache.from_settings().get(df).drop(
+        columns=["Next Close", "Close Delta"],
+    )
+    equity = Simulator(df, "CCI").simulate()
+    print(
+        f"Start: {equity[0]:.2f}, End: {equity[-1]:.2f}, "
+        f"Min: {equity.min():.2f}, Max: {equity.max():.2f}"
+    )
+
+
+def sweep():
+    """Function to search the best strategy params"""
+    symb = 'EOSUSDT'
+    tf = '1m'
+    num_rows = 10000
+    table = CandleStore().load(symb, tf, num_rows=num_rows)
+    results = Sweeper(table, "CCI").grid({
+        'indicator_window': [6, 12, 24],
+        'CCI_min': [-150, -100, -50],
+        'CCI_max': [50, 100, 150],
+        'commission': [1e-3],
+    })
+    print(results.head(10))
 
 
 def test():
@@ -94,14 +133,27 @@ def test():
     runner.run(suite)
 
 
+def walk_forward():
+    """Function to evaluate SGD strategy on rolling train and test rows"""
+    table = CandleStore().load('EOSUSDT', '1m', num_rows=100000)
+    pipeline = WalkForward(table, train_size=10000, test_size=2000)
+    results = pipeline.run(commission=1e-3)
+    print(results)
+    print(
+        *(f"{stage} time: {spent:.2f} s"
+          for stage, spent in pipeline.timing.items()),
+        sep="\n",
+    )
+
+
 def trade():
     """Function to start trading"""
+    log = get_log_writer(settings['log_file'])
+
     def print_logs(msg: str) -> None:
-        with open(settings['log_file'], 'a') as f:
-            print(f"{msg}, {datetime.now()}", file=f)
+        log.log('main', msg=msg)
 
-    f = open(settings['log_file'], 'w')
-    f.close()
+    log.clear()
 
     try:
         with open('creds.txt', 'r') as f:
@@ -113,11 +165,10 @@ def trade():
         with open('creds.txt', 'w') as f:
             print(api_key, sec_key, file=f, sep='\n')
 
-    trader = Trader(
-        api_key,
-        sec_key,
-        timezone=settings['timezone'],
-    )
+    is_portfolio = len(Settings.get().section('trader')['portfolio']) > 0
+    # several symbols are traded together if portfolio is set
+    trader = Portfolio(api_key, sec_key) if is_portfolio else \
+        Trader(api_key, sec_key)
     tries = 1
     while True:
         try:
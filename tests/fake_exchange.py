@@ -0,0 +1,212 @@
+import json
+import threading
+import time
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from bot.utiles import tf_to_minutes
+
+
+class FakeExchange:
+    """Local market http server for tests"""
+    def __init__(self, latency: float = 0):
+        """
+        :param latency: time in seconds to answer every request
+        """
+        self.latency = latency
+        # params of all the requests
+        self.requests = []
+        self.max_active = 0
+        # orders by client order id
+        self.orders = {}
+        # number of next orders which answers are lost
+        self.lost_answers = 0
+        # number of next orders which requests are lost before filling
+        self.lost_requests = 0
+        # number of next orders rejected by insufficient balance
+        self.rejected_orders = 0
+        # number of next order queries which do not see existing orders
+        self.unseen_queries = 0
+        self.__active = 0
+        self.__lock = threading.Lock()
+
+        exchange = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                params = {
+                    key: values[0]
+                    for key, values in parse_qs(url.query).items()
+                }
+                status, body = exchange.handle(
+                    url.path,
+                    params,
+                    self.command,
+                )
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_POST = do_GET
+
+            def log_message(self, *args, **kwargs):
+                return
+
+        self.__server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.__server.server_address[1]}"
+        self.__thread = threading.Thread(
+            target=self.__server.serve_forever,
+            daemon=True,
+        )
+        self.__thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self) -> None:
+        self.__server.shutdown()
+        self.__server.server_close()
+
+    def handle(self, path: str, params: dict, method: str = 'GET') -> tuple:
+        """
+        Returns status code and json body for request
+        :param path: request path
+        :param params: request params
+        :param method: http method
+        """
+        with self.__lock:
+            self.requests.append(params)
+            self.__active += 1
+            self.max_active = max(self.max_active, self.__active)
+        try:
+            time.sleep(self.latency)
+            if path == '/api/v3/klines':
+                return self.klines(params)
+            if path == '/api/v3/order' and method == 'POST':
+                return self.new_order(params)
+            if path == '/api/v3/order':
+                return self.get_order(params)
+            return 404, {'code': -1, 'msg': 'Not found'}
+        finally:
+            with self.__lock:
+                self.__active -= 1
+
+    def new_order(self, params: dict) -> tuple:
+        """
+        Market order filled by price 100 with 0.1% commission,
+        answers of lost_answers orders are lost after filling
+        :param params: request params
+        """
+        client_id = params['newClientOrderId']
+        with self.__lock:
+            if self.lost_requests > 0:
+                self.lost_requests -= 1
+                return 503, {'code': -1001, 'msg': 'Internal error'}
+            if client_id in self.orders:
+                return 400, {'code': -2010, 'msg': 'Duplicate order sent.'}
+            if self.rejected_orders > 0:
+                self.rejected_orders -= 1
+                return 400, {
+                    'code': -2010,
+                    'msg': 'Account has insufficient balance for requested '
+                    'action.',
+                }
+            price = 100.0
+            if 'quoteOrderQty' in params:
+                quote_qty = float(params['quoteOrderQty'])
+                qty = quote_qty / price
+            else:
+                qty = float(params['quantity'])
+                quote_qty = qty * price
+            is_buy = params['side'] == 'BUY'
+            # commission is taken from received asset
+            commission = (qty if is_buy else quote_qty) / 1000
+            order = {
+                'symbol': params['symbol'],
+                'orderId': len(self.orders) + 1,
+                'clientOrderId': client_id,
+                'transactTime': int(time.time() * 1000),
+                'origQty': f"{qty:.8f}",
+                'executedQty': f"{qty:.8f}",
+                'cummulativeQuoteQty': f"{quote_qty:.8f}",
+                'status': 'FILLED',
+                'type': params['type'],
+                'side': params['side'],
+                'fills': [{
+                    'price': f"{price:.8f}",
+                    'qty': f"{qty:.8f}",
+                    'commission': f"{commission:.8f}",
+                    'commissionAsset': 'BTC' if is_buy else 'USDT',
+                }],
+            }
+            self.orders[client_id] = order
+            if self.lost_answers > 0:
+                self.lost_answers -= 1
+                return 503, {'code': -1001, 'msg': 'Internal error'}
+        return 200, order
+
+    def get_order(self, params: dict) -> tuple:
+        """
+        Order by client order id (without fills)
+        :param params: request params
+        """
+        with self.__lock:
+            order = self.orders.get(params['origClientOrderId'])
+            if self.unseen_queries > 0:
+                self.unseen_queries -= 1
+                order = None
+        if order is None:
+            return 400, {'code': -2013, 'msg': 'Order does not exist.'}
+        return 200, {
+            key: value for key, value in order.items() if key != 'fills'
+        }
+
+    @staticmethod
+    def klines(params: dict) -> tuple:
+        """
+        Klines with open time from start to end time (both included)
+        symbols fail_500 and fail_300 return errors
+        symbol gaps returns half of the candles
+        :param params: request params
+        """
+        symbol = params['symbol']
+        if symbol == 'fail_500':
+            return 500, {'code': -1000, 'msg': 'Server error'}
+        if symbol == 'fail_300':
+            return 300, {'code': -1100, 'msg': 'Wrong request'}
+
+        tf_ms = tf_to_minutes(params['interval']) * 60000
+        start_t = int(params['startTime'])
+        end_t = int(params.get('endTime', start_t + 1000 * tf_ms))
+        limit = int(params.get('limit', 500))
+        if symbol == 'gaps':
+            limit //= 2
+
+        rows = []
+        open_t = start_t
+        while open_t <= end_t and len(rows) < limit:
+            price = 100 + open_t // tf_ms % 10
+            rows.append([
+                open_t,                 # Kline open time
+                f"{price:.8f}",         # Open price
+                f"{price + 1:.8f}",     # High price
+                f"{price - 1:.8f}",     # Low price
+                f"{price + 0.5:.8f}",   # Close price
+                "10.00000000",          # Volume
+                open_t + tf_ms - 1,     # Kline Close time
+                f"{price * 10:.8f}",    # Quote asset volume
+                10,                     # Number of trades
+                "5.00000000",           # Taker buy base asset volume
+                f"{price * 5:.8f}",     # Taker buy quote asset volume
+                "0"                     # Unused field, ignore.
+            ])
+            open_t += tf_ms
+        return 200, rows
@@ -1,14 +1,20 @@
 import json
+import numpy as np
 import pandas as pd
 import unittest
 
+from tempfile import TemporaryDirectory
 from unittest.mock import patch
 
 from bot.analyzer import Analyzer
+from bot.feature_cache import FeatureCache
+from bot.indicators import Indicators
+from bot.strategist import get_strategy
 
 
 class Test(unittest.TestCase):
     settings_file = 'tests/settings_for_test.json'
+    table_path = "tests/data_1m_120_rows.csv"
 
     def __mocked_Strategy(*args, **kwargs):
         """Function to mock Strategy"""
@@ -24,18 +30,78 @@ class Test(unittest.TestCase):
                 else:
                     return 0.9
 
+            def predict_series(self, table: pd.DataFrame) -> np.ndarray:
+                return np.array([
+                    self.predict() if i >= Analyzer.window - 1 else 0
+                    for i in range(table.shape[0])
+                ])
+
         return Strategy()
 
     @patch('bot.analyzer.get_strategy', side_effect=__mocked_Strategy)
     def test_analyzer(self, *args):
         """test analyzer no profit"""
-        table = pd.read_csv("tests/data_1m_120_rows.csv")
+        table = pd.read_csv(self.table_path)
         with open(self.settings_file, 'r') as f:
             settings = json.load(f)['trader']
-        result = Analyzer().analyze(table, settings['strategy'], 1e-3)
+        for vectorized in [True, False]:
+            result = Analyzer().analyze(
+                table,
+                settings['strategy'],
+                1e-3,
+                vectorized=vectorized,
+            )
+
+            eps = 1e-5
+            self.assertTrue(abs(result['avg_profit']) < eps)
+            self.assertTrue(abs(result['orders_size'] - 1) < eps)
+            self.assertTrue(abs(result['com_profit'] - (-1e-3)) < eps)
+            self.assertTrue(abs(result['total_profit'] - (-1e-3)) < eps)
+
+    def test_parity(self):
+        """Checks vectorized analyzer with row by row one"""
+        table = pd.read_csv(self.table_path)
+        Indicators(5).calc_indicators(table)
+        table = table.drop(columns=['Next Close', 'Close Delta'])
+        for strategy_name in ["ADI", "CCI"]:
+            strategy = get_strategy(strategy_name)
+            result = strategy.predict_series(table)
+            for i in range(strategy.window - 1, table.shape[0]):
+                self.assertEqual(
+                    result[i],
+                    strategy.predict(
+                        table.iloc[i - strategy.window + 1: i + 1]
+                    ),
+                    f"{strategy_name}, row {i}",
+                )
+            self.assertEqual(
+                Analyzer().analyze(table, strategy_name, 1e-3),
+                Analyzer().analyze(
+                    table,
+                    strategy_name,
+                    1e-3,
+                    vectorized=False,
+                ),
+                strategy_name,
+            )
+
+    def test_SGD_parity(self):
+        """Checks SGD batch predictions with row by row ones"""
+        table = pd.read_csv(self.table_path)
+        fit_table = pd.concat([table] * 170, ignore_index=True)
+        with patch('bot.strategist.load_table', return_value=fit_table), \
+                TemporaryDirectory() as tmp_dir, \
+                patch(
+                    'bot.strategist.FeatureCache.from_settings',
+                    return_value=FeatureCache(tmp_dir + '/features'),
+                ):
+            strategy = get_strategy("SGD", {'cache_dir': tmp_dir})
 
-        eps = 1e-5
-        self.assertTrue(abs(result['avg_profit']) < eps)
-        self.assertTrue(abs(result['orders_size'] - 1) < eps)
-        self.assertTrue(abs(result['com_profit'] - (-1e-3)) < eps)
-        self.assertTrue(abs(result['total_profit'] - (-1e-3)) < eps)
+        Indicators(12).calc_indicators(table, drop_first=True)
+        table = table.drop(columns=['Next Close', 'Close Delta'])
+        result = strategy.predict_series(table)
+        for i in range(strategy.window - 1, table.shape[0]):
+            self.assertAlmostEqual(
+                result[i],
+                strategy.predict(table.iloc[i - strategy.window + 1: i + 1]),
+            )
@@ -0,0 +1,123 @@
+import pandas as pd
+import unittest
+
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+from bot.analyzer import Analyzer
+from bot.backtester import Backtester
+from bot.feature_cache import FeatureCache
+from bot.indicators import Indicators
+from bot.model_cache import ModelCache
+
+
+class Test(unittest.TestCase):
+    table_path = "tests/data_1m_120_rows.csv"
+
+    def test_chunks(self):
+        """Checks segment runs with single pass Analyzer"""
+        table = pd.read_csv(self.table_path)
+        for window in [3, 5]:
+            expected_table = table.copy()
+            Indicators(window).calc_indicators(
+                expected_table,
+                ['CCI'],
+                drop_first=True,
+            )
+            expected_table = expected_table.drop(
+                columns=['Next Close', 'Close Delta'],
+            )
+            strategy_params = {'CCI_min': -50, 'CCI_max': 50}
+            expected = Analyzer().analyze(
+                expected_table,
+                "CCI",
+                1e-3,
+                strategy_params=strategy_params,
+            )
+            self.assertGreater(expected['num_orders'], 0)
+
+            for num_chunks in [1, 3, 7]:
+                result = Backtester(
+                    table,
+                    "CCI",
+                    ['CCI'],
+                    indicator_window=window,
+                    num_workers=2,
+                    num_chunks=num_chunks,
+                ).analyze(1e-3, strategy_params)
+                for metric, value in expected.items():
+                    self.assertAlmostEqual(
+                        result[metric],
+                        value,
+                        msg=f"{metric}, {window}, {num_chunks}",
+                    )
+
+    def test_SGD(self):
+        """Checks segment runs of SGD fitted on cold model cache"""
+        table = pd.read_csv(self.table_path)
+        fit_table = pd.concat([table] * 170, ignore_index=True)
+        save = ModelCache.save
+
+        def logged_save(cache, *args):
+            # saves of all the processes are counted by log file
+            with open(cache.root + '.log', 'a') as f:
+                f.write('save\n')
+            save(cache, *args)
+
+        # patches are inherited by forked workers
+        with TemporaryDirectory() as tmp_dir, \
+                patch('bot.strategist.load_table', return_value=fit_table), \
+                patch(
+                    'bot.strategist.FeatureCache.from_settings',
+                    return_value=FeatureCache(tmp_dir + '/features'),
+                ), \
+                patch.object(
+                    ModelCache,
+                    'save',
+                    autospec=True,
+                    side_effect=logged_save,
+                ):
+            strategy_params = {'cache_dir': tmp_dir + '/models'}
+            result = Backtester(
+                table,
+                "SGD",
+                ["ALL"],
+                indicator_window=12,
+                num_workers=4,
+                num_chunks=4,
+            ).analyze(1e-3, strategy_params)
+            # models are fitted once for all the segments
+            with open(tmp_dir + '/models.log', 'r') as f:
+                self.assertEqual(len(f.readlines()), 1)
+
+            expected_table = table.copy()
+            Indicators(12).calc_indicators(expected_table, drop_first=True)
+            expected_table = expected_table.drop(
+                columns=['Next Close', 'Close Delta'],
+            )
+            expected = Analyzer().analyze(
+                expected_table,
+                "SGD",
+                1e-3,
+                strategy_params=strategy_params,
+            )
+        self.assertGreater(expected['num_orders'], 0)
+        for metric, value in expected.items():
+            self.assertAlmostEqual(result[metric], value, msg=metric)
+
+    def test_orders_state(self):
+        """Checks accounting by parts with accounting in one pass"""
+        table = pd.read_csv(self.table_path)
+        Indicators(5).calc_indicators(table, ['CCI'])
+        predictions = (table['CCI'] / -100).clip(-1, 1).to_numpy()
+        prices = table['Close'].to_numpy()
+
+        expected = Analyzer.calc_orders(predictions, prices)
+        state = Analyzer.new_orders_state()
+        for start in range(0, table.shape[0], 17):
+            result = Analyzer.calc_orders(
+                predictions[start: start + 17],
+                prices[start: start + 17],
+                state,
+            )
+        self.assertEqual(result, expected)
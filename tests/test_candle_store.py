@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+import unittest
+
+from tempfile import TemporaryDirectory
+from unittest.mock import MagicMock
+
+from bot.candle_store import CandleStore, load_table
+from bot.utiles import int_to_times, time_to_int, times_to_int
+
+
+class Test(unittest.TestCase):
+    table_path = "tests/data_1m_120_rows.csv"
+
+    def __check_table(self, result: pd.DataFrame, expected: pd.DataFrame):
+        """Checks store table with csv one"""
+        self.assertEqual(list(result.columns), list(expected.columns))
+        for col in ['Open', 'Close', 'Low', 'High', 'Volume coin']:
+            assert np.array_equal(result[col], expected[col]), col
+        for col in ['Open time', 'Close time']:
+            assert np.array_equal(
+                times_to_int(result[col]),
+                times_to_int(expected[col]),
+            ), col
+
+    def test_write_load(self):
+        """Checks appending and time slices"""
+        table = pd.read_csv(self.table_path)
+        with TemporaryDirectory() as tmp_dir:
+            store = CandleStore(tmp_dir)
+            self.assertEqual(store.write('BTCUSDT', '1m', table[:50]), 50)
+            self.assertEqual(store.write('BTCUSDT', '1m', table[50:]), 70)
+            self.assertEqual(store.num_rows('BTCUSDT', '1m'), 120)
+
+            result = store.load('BTCUSDT', '1m')
+            self.__check_table(result, table)
+            assert np.allclose(result['Close Delta'], table['Close Delta'])
+
+            result = store.load(
+                'BTCUSDT',
+                '1m',
+                table['Open time'][10],
+                table['Open time'][20],
+            )
+            self.__check_table(result, table[10:20].reset_index(drop=True))
+            # next close is taken from the next stored candle
+            self.assertEqual(
+                result['Next Close'].iloc[-1],
+                table['Close'][20],
+            )
+
+            result = store.load('BTCUSDT', '1m', num_rows=5)
+            self.__check_table(result, table[-5:].reset_index(drop=True))
+            self.__check_table(
+                load_table(tmp_dir + '/BTCUSDT_1m'),
+                table,
+            )
+
+            # rewriting with overlapping and older candles
+            self.assertEqual(store.write('BTCUSDT', '1m', table[:60]), 0)
+            self.__check_table(store.load('BTCUSDT', '1m'), table)
+
+    def test_sync(self):
+        """Checks downloading only missing candles"""
+        table = pd.read_csv(self.table_path)
+        table['Open time'] = int_to_times(times_to_int(table['Open time']))
+        table['Close time'] = int_to_times(times_to_int(table['Close time']))
+
+        def get_table(start_t: str, end_t: str) -> pd.DataFrame:
+            times = times_to_int(table['Open time'])
+            return table[
+                (times >= time_to_int(start_t)) &
+                (times < time_to_int(end_t))
+            ]
+
+        parser = MagicMock()
+        parser.get_table.side_effect = get_table
+        with TemporaryDirectory() as tmp_dir:
+            store = CandleStore(tmp_dir)
+            times = table['Open time'].astype(str)
+            self.assertEqual(
+                store.sync('BTCUSDT', '1m', times[50], times[100], parser),
+                50,
+            )
+            self.assertEqual(
+                store.sync('BTCUSDT', '1m', times[0], times[119], parser),
+                69,
+            )
+            self.assertEqual(
+                parser.get_table.call_args_list[-2].args,
+                (times[0], times[50]),
+            )
+            self.assertEqual(
+                parser.get_table.call_args_list[-1].args,
+                (times[100], times[119]),
+            )
+            self.__check_table(
+                store.load('BTCUSDT', '1m'),
+                table[:119].reset_index(drop=True),
+            )
@@ -7,118 +7,111 @@ from bot.dataset_parser import Parser
 from bot.exceptions import RequestError, ResponseError
 from bot.utiles import tf_to_minutes
 
+from fake_exchange import FakeExchange
 
-class Test(unittest.TestCase):
-    def __mocked_response(*args, **kwargs):
-        """Function to mock requests"""
-        class MockResponse:
-            def __init__(self, json_data, status_code):
-                self.json_data = json_data
-                self.status_code = status_code
-
-            def json(self):
-                return self.json_data
-
-        if 'https://api.binance.com' in args[0]:
-            # fail of server
-            if kwargs["params"]["symbol"] == "fail_500":
-                return MockResponse([], 500)
-            # fail of request
-            if kwargs["params"]["symbol"] == "fail_300":
-                return MockResponse([], 300)
-            return MockResponse(
-                # filling with random values
-                [
-                    [
-                        1499040000000,      # Kline open time
-                        "0.01634790",       # Open price
-                        "0.80000000",       # High price
-                        "0.01575800",       # Low price
-                        "0.01577100",       # Close price
-                        "148976.11427815",  # Volume
-                        1499644799999,      # Kline Close time
-                        "2434.19055334",    # Quote asset volume
-                        308,                # Number of trades
-                        "1756.87402397",    # Taker buy base asset volume
-                        "28.46694368",      # Taker buy quote asset volume
-                        "0"                 # Unused field, ignore.
-                    ]
-                ],
-                200
-            )
-
-        return MockResponse(None, 404)
 
-    @patch('bot.dataset_parser.sleep')
+class Test(unittest.TestCase):
     @patch('bot.dataset_parser.datetime')
-    @patch('bot.dataset_parser.requests.get', side_effect=__mocked_response)
-    def test_get_table(self, send_request_mock, now_mock, _):
+    def test_get_table(self, now_mock):
         """Checks correct get_table request"""
         now_mock.now.return_value = parse_dt("2023-01-20T00:00:00")
 
-        for tf in ['1m', '5m', '1h']:
-            parser = Parser('SOLUSDT', tf, ignore_gaps=True)
-            for args in [
-                ["2023-01-15T00:00:00", "2023-01-20T00:00:00"],
-                [5 * 24 * 60 // tf_to_minutes(tf)]
-            ]:
-                table = parser.get_table(*args)
-                self.assertEqual(
-                    table.shape[0],
-                    len(send_request_mock.call_args_list),
-                    f"{tf}, {args}"
-                )
+        with FakeExchange() as exchange:
+            for tf in ['1m', '5m', '1h']:
+                parser = Parser('SOLUSDT', tf, base_url=exchange.url)
+                num_rows = 5 * 24 * 60 // tf_to_minutes(tf)
+                for args in [
+                    ["2023-01-15T00:00:00", "2023-01-20T00:00:00"],
+                    [num_rows]
+                ]:
+                    table = parser.get_table(*args)
+                    self.assertEqual(table.shape[0], num_rows, f"{tf}, {args}")
+                    self.assertTrue(
+                        table['Open time'].is_monotonic_increasing,
+                        f"{tf}, {args}",
+                    )
 
-                sum_limit = sum(
-                    int(call[1]['params']['limit'])
-                    for call in send_request_mock.call_args_list
-                )
-                self.assertEqual(
-                    sum_limit,
-                    5 * 24 * 60 // tf_to_minutes(tf),
-                    f"{tf}, {args}"
-                )
+                    sum_limit = sum(
+                        int(params['limit']) for params in exchange.requests
+                    )
+                    self.assertEqual(sum_limit, num_rows, f"{tf}, {args}")
 
-                priv_time = "1673740800000"
-                for call in send_request_mock.call_args_list:
+                    # batches are not overlapping and have no gaps
+                    priv_time = "1673740800000"
+                    for params in sorted(
+                        exchange.requests,
+                        key=lambda params: int(params['startTime']),
+                    ):
+                        self.assertEqual(
+                            priv_time,
+                            params['startTime'],
+                            f"{tf}, {args}"
+                        )
+                        priv_time = params['endTime']
                     self.assertEqual(
                         priv_time,
-                        call[1]['params']['startTime'],
-                        f"{tf}, {args}"
+                        "1674172800000",
+                        f"{tf}, {args}",
                     )
-                    priv_time = call[1]['params']['endTime']
-                self.assertEqual(priv_time, "1674172800000", f"{tf}, {args}")
 
-                send_request_mock.call_args_list = []
+                    exchange.requests = []
+
+    def test_concurrent(self):
+        """Checks that batches are downloaded at the same time"""
+        with FakeExchange(latency=0.05) as exchange:
+            parser = Parser('SOLUSDT', '1m', base_url=exchange.url)
+            table = parser.get_table("2023-01-15T00:00:00", 8000)
+            self.assertEqual(len(exchange.requests), 8)
+            self.assertGreater(exchange.max_active, 1)
+            self.assertEqual(table.shape[0], 8000)
+            self.assertEqual(
+                (table['Open time'].diff().iloc[1:] ==
+                 table['Open time'].iloc[1] - table['Open time'].iloc[0]
+                 ).all(),
+                True,
+            )
 
     @patch('bot.dataset_parser.sleep')
-    @patch('bot.dataset_parser.requests.get', side_effect=__mocked_response)
-    def test_exc(self, send_request_mock, _):
+    def test_exc(self, _):
         """checks fail get_table request"""
-        # no response
-        parser = Parser('fail_500', '1m', ignore_gaps=True)
-        try:
-            _ = parser.get_table("2023-01-15T00:00:00", "2023-01-15T00:01:00")
-        except ResponseError:
-            pass
-        else:
-            raise "No crush"
-        self.assertEqual(len(send_request_mock.call_args_list), 5)
+        with FakeExchange() as exchange:
+            # no response
+            parser = Parser('fail_500', '1m', base_url=exchange.url)
+            try:
+                _ = parser.get_table(
+                    "2023-01-15T00:00:00",
+                    "2023-01-15T00:01:00",
+                )
+            except ResponseError:
+                pass
+            else:
+                raise AssertionError("No crush")
+            self.assertEqual(len(exchange.requests), 5)
 
-        # dont ignore gaps
-        parser = Parser('SOLUSDT', '1m', ignore_gaps=False)
-        try:
-            _ = parser.get_table("2023-01-15T00:00:00", 123)
-        except RequestError:
-            pass
-        else:
-            raise "Gaps ignored"
+            # dont ignore gaps
+            parser = Parser('gaps', '1m', base_url=exchange.url)
+            try:
+                _ = parser.get_table("2023-01-15T00:00:00", 123)
+            except RequestError:
+                pass
+            else:
+                raise AssertionError("Gaps ignored")
+            parser = Parser(
+                'gaps',
+                '1m',
+                ignore_gaps=True,
+                base_url=exchange.url,
+            )
+            self.assertEqual(
+                parser.get_table("2023-01-15T00:00:00", 124).shape[0],
+                62,
+            )
 
-        # wrong request
-        parser = Parser('fail_300', '1m', ignore_gaps=True)
-        try:
-            _ = parser.get_table(10)
-        except RequestError:
-            pass
-        else:
-            raise "No crush"
+            # wrong request
+            parser = Parser('fail_300', '1m', base_url=exchange.url)
+            try:
+                _ = parser.get_table(10)
+            except RequestError:
+                pass
+            else:
+                raise AssertionError("No crush")
@@ -0,0 +1,77 @@
+import time
+import unittest
+
+from bot.exceptions import RequestError
+from bot.exchange_info import ExchangeInfo
+
+
+class Test(unittest.TestCase):
+    class __Mocked_Spot:
+        """Spot mock with step size changed by every query"""
+        def __init__(self):
+            self.queries = []
+            # time in seconds to answer
+            self.latency = 0
+
+        def exchange_info(
+            self,
+            symbol: str = None,
+            symbols: list = None,
+        ) -> dict:
+            time.sleep(self.latency)
+            self.queries.append(symbols)
+            step_size = 0.1 ** len(self.queries)
+            return {
+                'symbols': [
+                    {
+                        'symbol': symb,
+                        'filters': [
+                            {
+                                'filterType': 'LOT_SIZE',
+                                'stepSize': str(step_size),
+                                'minQty': '0.1',
+                            },
+                        ]
+                    }
+                    for symb in symbols or ['BTCUSDT', 'ETHUSDT']
+                ]
+            }
+
+    def test_cache(self):
+        """Checks bulk loading, background refresh and new symbols"""
+        client = self.__Mocked_Spot()
+        info = ExchangeInfo(client, ['BTCUSDT', 'ETHUSDT'], ttl=0.2)
+        filters = info.get_filters('BTCUSDT')
+        self.assertEqual(filters['LOT_SIZE']['minQty'], '0.1')
+        info.get_filters('ETHUSDT')
+        self.assertEqual(client.queries, [['BTCUSDT', 'ETHUSDT']])
+
+        # expired filters are used till background refresh
+        time.sleep(0.3)
+        client.latency = 0.1
+        filters = info.get_filters('ETHUSDT')
+        self.assertEqual(filters['LOT_SIZE']['stepSize'], str(0.1))
+        for _ in range(100):
+            if len(client.queries) == 2:
+                break
+            time.sleep(0.01)
+        self.assertEqual(len(client.queries), 2)
+        client.latency = 0
+        filters = info.get_filters('ETHUSDT')
+        self.assertEqual(filters['LOT_SIZE']['stepSize'], str(0.1 ** 2))
+
+        # not cached symbol is loaded together with others
+        info.get_filters('EOSUSDT')
+        self.assertEqual(
+            client.queries[-1],
+            ['BTCUSDT', 'ETHUSDT', 'EOSUSDT'],
+        )
+
+    def test_all_symbols(self):
+        """Checks loading of all market symbols"""
+        client = self.__Mocked_Spot()
+        info = ExchangeInfo(client)
+        info.get_filters('BTCUSDT')
+        info.get_filters('ETHUSDT')
+        self.assertEqual(client.queries, [None])
+        self.assertRaises(RequestError, info.get_filters, 'EOSUSDT')
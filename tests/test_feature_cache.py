@@ -0,0 +1,153 @@
+import numpy as np
+import os
+import pandas as pd
+import shutil
+import unittest
+
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+from bot.feature_cache import FeatureCache
+from bot.indicators import Indicators
+from bot.utiles import times_to_int
+
+
+class Test(unittest.TestCase):
+    table_path = "tests/data_1m_120_rows.csv"
+
+    def test_get(self):
+        """Checks cached features with calculated ones"""
+        table = pd.read_csv(self.table_path)
+        expected = table.copy()
+        Indicators(5).calc_indicators(
+            expected,
+            ['CCI', 'RSI'],
+            drop_first=True,
+        )
+
+        with TemporaryDirectory() as tmp_dir, patch.object(
+            Indicators,
+            'calc_indicators',
+            autospec=True,
+            side_effect=Indicators.calc_indicators,
+        ) as calc:
+            cache = FeatureCache(tmp_dir)
+            for _ in range(2):
+                result = cache.get(table, ['CCI', 'RSI'], 5)
+                self.assertEqual(list(result.columns), list(expected.columns))
+                for col in expected.columns:
+                    if col.endswith('time'):
+                        np.testing.assert_array_equal(
+                            times_to_int(result[col]),
+                            times_to_int(expected[col]),
+                            col,
+                        )
+                    else:
+                        np.testing.assert_array_equal(
+                            result[col],
+                            expected[col],
+                            col,
+                        )
+            self.assertEqual(calc.call_count, 1)
+
+            # other params and candles are other entries
+            cache.get(table, ['CCI'], 5)
+            cache.get(table, ['CCI', 'RSI'], 6)
+            changed = table.copy()
+            changed.loc[60, 'Close'] += 1
+            cache.get(changed, ['CCI', 'RSI'], 5)
+            self.assertEqual(calc.call_count, 4)
+            self.assertEqual(len(os.listdir(tmp_dir)), 4)
+
+            # added columns are not shared
+            result['New'] = 1
+            self.assertNotIn('New', cache.get(table, ['CCI', 'RSI'], 5))
+
+            cache.clear()
+            self.assertEqual(os.listdir(tmp_dir), [])
+
+        with TemporaryDirectory() as tmp_dir:
+            result = FeatureCache(tmp_dir, dtype="float32").get(table)
+            self.assertEqual(result['CCI'].dtype, np.float32)
+
+    def test_removed_entries(self):
+        """Checks entries evicted by other process while saving"""
+        table = pd.read_csv(self.table_path)
+        getmtime = os.path.getmtime
+        listdir = os.listdir
+
+        with TemporaryDirectory() as tmp_dir:
+            cache = FeatureCache(tmp_dir)
+            cache.get(table, ['CCI'], 3)
+            removed = os.path.join(tmp_dir, cache.get_key(table, ['CCI'], 3))
+
+            def removing_getmtime(path):
+                if path == removed:
+                    shutil.rmtree(path)
+                return getmtime(path)
+
+            with patch(
+                'bot.feature_cache.os.path.getmtime',
+                side_effect=removing_getmtime,
+            ):
+                cache.get(table, ['CCI'], 4)
+            self.assertEqual(len(os.listdir(tmp_dir)), 1)
+
+            cache.get(table, ['CCI'], 3)
+            removed = os.path.join(tmp_dir, cache.get_key(table, ['CCI'], 3))
+
+            def removing_listdir(path):
+                if path == removed:
+                    shutil.rmtree(path)
+                return listdir(path)
+
+            with patch(
+                'bot.feature_cache.os.listdir',
+                side_effect=removing_listdir,
+            ):
+                cache.get(table, ['CCI'], 5)
+            self.assertEqual(len(os.listdir(tmp_dir)), 2)
+
+    def test_get_key(self):
+        """Checks that candles with the same sums have other keys"""
+        table = pd.read_csv(self.table_path)
+        cache = FeatureCache()
+        key = cache.get_key(table, ['CCI'], 5)
+        self.assertEqual(key, cache.get_key(table.copy(), ['CCI'], 5))
+        swapped = table.copy()
+        swapped.loc[[50, 70], 'Close'] = table.loc[[70, 50], 'Close'].values
+        self.assertNotEqual(
+            table.loc[50, 'Close'],
+            table.loc[70, 'Close'],
+        )
+        self.assertNotEqual(key, cache.get_key(swapped, ['CCI'], 5))
+
+    def test_eviction(self):
+        """Checks that the least recently used entries are removed"""
+        table = pd.read_csv(self.table_path)
+        with TemporaryDirectory() as tmp_dir:
+            cache = FeatureCache(tmp_dir)
+            cache.get(table, ['CCI'], 3)
+            entry_size = sum(
+                os.path.getsize(os.path.join(tmp_dir, entry, name))
+                for entry in os.listdir(tmp_dir)
+                for name in os.listdir(os.path.join(tmp_dir, entry))
+            )
+            # three entries fit to the cache
+            cache.max_size_mb = entry_size * 3.5 / 2**20
+            keys = {}
+            for window in [3, 4, 5]:
+                cache.get(table, ['CCI'], window)
+                keys[window] = cache.get_key(table, ['CCI'], window)
+                os.utime(
+                    os.path.join(tmp_dir, keys[window]),
+                    (window * 100, window * 100),
+                )
+            # the first entry is used before the new one is saved
+            cache.get(table, ['CCI'], 3)
+            cache.get(table, ['CCI'], 6)
+            keys[6] = cache.get_key(table, ['CCI'], 6)
+            self.assertEqual(
+                sorted(os.listdir(tmp_dir)),
+                sorted([keys[3], keys[5], keys[6]]),
+            )
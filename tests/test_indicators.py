@@ -1,7 +1,9 @@
-import unittest
+import numpy as np
 import pandas as pd
+import unittest
 
-from bot.indicators import Indicators
+from bot.exceptions import WrongIndicator
+from bot.indicators import Indicators, calc_ema, ema_modes, obv_modes
 
 
 class Test(unittest.TestCase):
@@ -26,6 +28,148 @@ class Test(unittest.TestCase):
             assert all(val is not None for val in table[ind].values), \
                 f"Found None value in {ind} column"
 
+    def test_plan(self):
+        """Checks dependency order, stale columns and scratch dropping"""
+        indicators = Indicators()
+        self.assertEqual(
+            indicators.plan(['MFI', 'CCI']),
+            ['TP', 'MR', 'MFI', 'SMA', 'MAD', 'CCI'],
+        )
+        plan = indicators.plan()
+        self.assertEqual(len(plan), len(set(plan)))
+        self.assertRaises(WrongIndicator, indicators.plan, ['ABC'])
+
+        expected = pd.read_csv(self.table_path)
+        indicators.calc_indicators(expected, ['CCI'])
+        # stale auxiliary column is recalculated
+        table = pd.read_csv(self.table_path)
+        table['TP'] = 0.0
+        indicators.calc_indicators(table, ['CCI'])
+        assert np.array_equal(table['CCI'], expected['CCI'])
+
+        table = pd.read_csv(self.table_path)
+        indicators.calc_indicators(table, drop_scratch=True)
+        for col in ['EMAU', 'EMAD', 'RS', 'MR', 'CLV']:
+            self.assertNotIn(col, table.columns)
+        for col in Indicators.ind_list + ['TP', 'SMA', 'MAD']:
+            self.assertIn(col, table.columns)
+
+    def test_windows(self):
+        """Checks multi window columns with separate calculations"""
+        table = pd.read_csv(self.table_path)
+        columns_orig = list(table.columns)
+        windows = [5, 12, 24]
+        result = table.copy()
+        Indicators().calc_indicators(result, windows=windows)
+        for window in windows:
+            expected = table.copy()
+            Indicators(window).calc_indicators(expected)
+            for col in set(expected.columns).difference(columns_orig):
+                # window independent columns are not suffixed
+                name = col if col in ['TP', 'CLV'] else f'{col}_{window}'
+                assert np.array_equal(
+                    result[name].to_numpy(float),
+                    expected[col].to_numpy(float),
+                    equal_nan=True,
+                ), f"{col} differs with window {window}"
+        self.assertNotIn('CCI', result.columns)
+
+        result = table.copy()
+        Indicators().calc_indicators(
+            result,
+            ['MACD', 'RSI'],
+            drop_first=True,
+            drop_scratch=True,
+            windows=[3, 6],
+        )
+        self.assertEqual(result.shape[0], table.shape[0] - 6 * 4)
+        self.assertEqual(
+            list(result.columns),
+            columns_orig + [
+                'MACD_3', 'MACDEMA_3', 'EMA_3', 'RSI_3',
+                'MACD_6', 'MACDEMA_6', 'EMA_6', 'RSI_6',
+            ],
+        )
+
+    def test_backends(self):
+        """Checks numpy backend kernels with pandas calculation"""
+        table = pd.read_csv(self.table_path)
+        for ema_mode in ema_modes:
+            for obv_mode in obv_modes:
+                for windows in [None, [3, 5, 24]]:
+                    expected = table.copy()
+                    Indicators(5, ema_mode, obv_mode).calc_indicators(
+                        expected,
+                        windows=windows,
+                    )
+                    result = table.copy()
+                    Indicators(
+                        5,
+                        ema_mode,
+                        obv_mode,
+                        backend="numpy",
+                    ).calc_indicators(result, windows=windows)
+                    self.assertEqual(
+                        list(result.columns),
+                        list(expected.columns),
+                    )
+                    for col in expected.columns:
+                        if expected[col].dtype.kind != 'f':
+                            continue
+                        assert np.allclose(
+                            result[col],
+                            expected[col],
+                            rtol=1e-6,
+                            equal_nan=True,
+                        ), f"{col} differs with {ema_mode} {obv_mode} EMA"
+
+        # steps without kernel are calculated by pandas
+        def calc_TPD(indicators, df):
+            df['TPD'] = df['TP'] - df['TP'].shift(indicators.window)
+
+        Indicators.register('TPD', calc_TPD, ['TP'], ['TPD'])
+        try:
+            result = table.copy()
+            Indicators(3, backend="numpy").calc_indicators(
+                result,
+                ['TPD', 'CCI'],
+            )
+            assert np.allclose(
+                result['TPD'].iloc[3:],
+                (result['TP'] - result['TP'].shift(3)).iloc[3:],
+            )
+        finally:
+            del Indicators.registry['TPD']
+        self.assertRaises(ValueError, Indicators, backend="cuda")
+
+    def test_register(self):
+        """Checks user indicator registration"""
+        def calc_TPD(indicators, df):
+            df['TPD'] = df['TP'] - df['TP'].shift(indicators.window)
+
+        Indicators.register('TPD', calc_TPD, ['TP'], ['TPD'])
+        try:
+            table = pd.read_csv(self.table_path)
+            Indicators(3).calc_indicators(table, ['TPD', 'CCI'])
+            self.assertEqual(Indicators().plan(['TPD']), ['TP', 'TPD'])
+            assert np.allclose(
+                table['TPD'].iloc[3:],
+                (table['TP'] - table['TP'].shift(3)).iloc[3:],
+            )
+            # the same column can not be calculated twice
+            self.assertRaises(
+                WrongIndicator,
+                Indicators.register,
+                'TP2',
+                calc_TPD,
+                ['Close'],
+                ['TP'],
+            )
+            # indicators registered by user are not in ALL
+            self.assertNotIn('TPD', Indicators().plan())
+        finally:
+            del Indicators.registry['TPD']
+
     def __check_indicator(self, ind_name: str, columns_list: list = []):
         """Checks indicators that should be"""
         table = pd.read_csv(self.table_path)
@@ -62,6 +206,32 @@ class Test(unittest.TestCase):
         """Checks OBV"""
         _ = self.__check_indicator('OBV', ['OBV', 'OBVCA'])
 
+    def test_OBV_modes(self):
+        """Checks OBV modes with direct calculation"""
+        table = pd.read_csv(self.table_path)
+        # large volumes to check sums precision
+        table['Volume coin'] *= 1e6
+        for window in [1, 3, 12, 24, table.shape[0]]:
+            # old window loop calculation
+            expected = pd.Series(0.0, index=table.index)
+            for i in range(window):
+                close_delta = np.sign(
+                    table['Close'].shift(i).fillna(0) -
+                    table['Close'].shift(i + 1).fillna(0)
+                )
+                expected += close_delta * \
+                    table['Volume coin'].shift(i).fillna(0)
+            result = table.copy()
+            Indicators(window).calc_indicators(result, ['OBV'])
+            assert np.allclose(result['OBV'], expected, rtol=1e-12), \
+                f"Window OBV differs with window {window}"
+
+        # cumulative OBV is the window one with window of all rows
+        result = table.copy()
+        Indicators(obv_mode="cumulative").calc_indicators(result, ['OBV'])
+        assert np.allclose(result['OBV'], expected, rtol=1e-12)
+        self.assertRaises(ValueError, Indicators, obv_mode="sum")
+
     # checks PVT
     def test_PVT(self):
         _ = self.__check_indicator('PVT', ['PVT', 'PVTCA'])
@@ -73,3 +243,36 @@ class Test(unittest.TestCase):
             ['RSI', 'RS', 'EMA', 'EMAU', 'EMAD']
         )
         assert all(table['RSI'] >= 0) and all(table['RSI'] <= 100)
+
+    def test_EMA(self):
+        """Checks EMA modes with direct calculation"""
+        table = pd.read_csv(self.table_path)
+        column = table['Close']
+        for window in [1, 3, 12, 24]:
+            # old truncated window calculation
+            alpha = 2 / (1 + window)
+            expected = pd.Series(0.0, index=column.index)
+            coef = 0
+            for shift in range(window):
+                expected += column.shift(shift).fillna(0) * \
+                    ((1 - alpha) ** shift)
+                coef += (1 - alpha) ** shift
+            expected /= coef
+            result = calc_ema(column.to_numpy(), window)
+            assert np.allclose(result, expected.to_numpy()), \
+                f"Truncated EMA differs with window {window}"
+
+            expected = pd.concat([pd.Series([0.0]), column]).ewm(
+                alpha=alpha,
+                adjust=False,
+            ).mean().iloc[1:]
+            result = calc_ema(column.to_numpy(), window, "infinite")
+            assert np.allclose(result, expected.to_numpy()), \
+                f"Infinite EMA differs with window {window}"
+
+        try:
+            Indicators(ema_mode="wrong")
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("Wrong EMA mode accepted")
@@ -0,0 +1,107 @@
+import unittest
+
+from bot.ledger import Ledger
+
+
+class Test(unittest.TestCase):
+    class __Mocked_Spot:
+        """Spot mock with constant balances"""
+        def __init__(self):
+            self.num_queries = 0
+
+        def user_asset(self, *args, **kwargs) -> list:
+            self.num_queries += 1
+            return [
+                {'asset': 'BTC', 'free': '1'},
+                {'asset': 'BNB', 'free': '0.5'},
+                {'asset': 'USDT', 'free': '1000'},
+            ]
+
+    @staticmethod
+    def __get_order(side: str, qty: str, quote_qty: str, **kwargs) -> dict:
+        """Filled market order response with one fill"""
+        fill = {
+            'price': '20000',
+            'qty': qty,
+            'commission': '0.001',
+            'commissionAsset': 'BNB',
+        }
+        fill.update(kwargs)
+        return {
+            'symbol': 'BTCUSDT',
+            'side': side,
+            'status': 'FILLED',
+            'executedQty': qty,
+            'cummulativeQuoteQty': quote_qty,
+            'fills': [fill],
+        }
+
+    def test_fills(self):
+        """Checks balances changes by fills and reconcile interval"""
+        client = self.__Mocked_Spot()
+        ledger = Ledger(client, reconcile_friq=3)
+        ledger.update()
+        self.assertEqual(client.num_queries, 1)
+        self.assertEqual(ledger.get('USDT'), 1000)
+
+        ledger.apply_order(
+            self.__get_order('BUY', '0.01', '200'),
+            'BTC',
+            'USDT',
+        )
+        ledger.update()
+        self.assertAlmostEqual(ledger.get('BTC'), 1.01)
+        self.assertAlmostEqual(ledger.get('USDT'), 800)
+        self.assertAlmostEqual(ledger.get('BNB'), 0.499)
+
+        ledger.apply_order(
+            self.__get_order(
+                'SELL',
+                '0.5',
+                '10000',
+                commission='10',
+                commissionAsset='USDT',
+            ),
+            'BTC',
+            'USDT',
+        )
+        ledger.update()
+        self.assertAlmostEqual(ledger.get('BTC'), 0.51)
+        self.assertAlmostEqual(ledger.get('USDT'), 10790)
+        self.assertEqual(client.num_queries, 1)
+        self.assertFalse(ledger.is_drifted)
+
+        # market balances are loaded every reconcile_friq updates
+        ledger.update()
+        self.assertEqual(client.num_queries, 2)
+        self.assertEqual(ledger.get('USDT'), 1000)
+
+    def test_drift(self):
+        """Checks reconciliation after unknown or wrong fills"""
+        client = self.__Mocked_Spot()
+        ledger = Ledger(client, reconcile_friq=100)
+        ledger.update()
+
+        # response without fills
+        ledger.apply_order({'orderId': 1}, 'BTC', 'USDT')
+        self.assertTrue(ledger.is_drifted)
+        ledger.update()
+        self.assertEqual(client.num_queries, 2)
+
+        # more money is spent than it is known
+        ledger.apply_order(
+            self.__get_order('BUY', '0.1', '2000'),
+            'BTC',
+            'USDT',
+        )
+        self.assertTrue(ledger.is_drifted)
+        ledger.update()
+        self.assertEqual(client.num_queries, 3)
+
+        order = self.__get_order('BUY', '0.001', '20')
+        order['status'] = 'PARTIALLY_FILLED'
+        ledger.apply_order(order, 'BTC', 'USDT')
+        self.assertTrue(ledger.is_drifted)
+        ledger.update()
+        self.assertEqual(client.num_queries, 4)
+        self.assertFalse(ledger.is_drifted)
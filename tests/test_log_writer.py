@@ -0,0 +1,91 @@
+import json
+import os
+import threading
+import time
+import unittest
+
+from unittest.mock import patch
+
+from bot.log_writer import LogWriter, get_log_writer
+
+
+class Test(unittest.TestCase):
+    log_path = "tests/logs/log_test.txt"
+
+    def tearDown(self):
+        if os.path.exists(self.log_path):
+            os.remove(self.log_path)
+
+    def test_records(self):
+        """Checks json lines records, batches and clearing"""
+        writer = LogWriter(
+            self.log_path,
+            batch_size=10,
+            flush_interval=0.01,
+        )
+        writer.log('first', value=1)
+        writer.clear()
+        for i in range(25):
+            writer.log('record', value=i, time_spent=time.monotonic)
+        writer.flush()
+        with open(self.log_path, 'r') as f:
+            records = [json.loads(line) for line in f]
+        writer.close()
+
+        # records before clear are removed
+        self.assertEqual(
+            [record['value'] for record in records],
+            list(range(25)),
+        )
+        self.assertEqual(records[0]['event'], 'record')
+        self.assertIn('time', records[0])
+        # not json values are written as strings
+        self.assertIsInstance(records[0]['time_spent'], str)
+        self.assertRaises(
+            ValueError,
+            LogWriter,
+            self.log_path,
+            overflow_policy="wait",
+        )
+
+    def test_drop(self):
+        """Checks records dropping by full queue"""
+        is_released = threading.Event()
+        dumps = json.dumps
+
+        def slow_dumps(*args, **kwargs):
+            is_released.wait()
+            return dumps(*args, **kwargs)
+
+        with patch('bot.log_writer.json.dumps', side_effect=slow_dumps):
+            writer = LogWriter(
+                self.log_path,
+                queue_size=2,
+                flush_interval=0.01,
+                overflow_policy="drop",
+            )
+            self.assertTrue(writer.log('record', value=0))
+            # the first record is taken by writer
+            time.sleep(0.1)
+            self.assertTrue(writer.log('record', value=1))
+            self.assertTrue(writer.log('record', value=2))
+            self.assertFalse(writer.log('record', value=3))
+            # clearing does not wait for writer too
+            self.assertFalse(writer.clear())
+            self.assertEqual(writer.num_dropped, 2)
+            is_released.set()
+            writer.close()
+        with open(self.log_path, 'r') as f:
+            self.assertEqual(len(f.readlines()), 3)
+
+    def test_shared(self):
+        """Checks that one file has one writer"""
+        writer = get_log_writer(
+            self.log_path,
+            'tests/settings_for_test.json',
+        )
+        self.assertIs(
+            get_log_writer("tests/../" + self.log_path),
+            writer,
+        )
+        writer.flush()
@@ -0,0 +1,191 @@
+import json
+import pandas as pd
+import time
+import unittest
+import websocket
+
+from dateutil.parser import parse as parse_dt
+from pandas.testing import assert_frame_equal
+from unittest.mock import patch
+
+from bot.dataset_parser import Parser
+from bot.market_feed import ReplayFeed, WebSocketFeed
+
+from fake_exchange import FakeExchange
+
+
+class FakeConnection:
+    """Market stream connection mock sending scripted messages"""
+    # messages of every next connection, None closes connection
+    scripts = []
+    num_connections = 0
+
+    def __init__(self, *args, **kwargs):
+        FakeConnection.num_connections += 1
+        self.messages = self.scripts.pop(0) if self.scripts else []
+
+    def recv(self) -> str:
+        if not self.messages:
+            time.sleep(0.01)
+            raise websocket.WebSocketTimeoutException("timeout")
+        message = self.messages.pop(0)
+        if message is None:
+            raise websocket.WebSocketConnectionClosedException("closed")
+        return json.dumps(message)
+
+    def close(self) -> None:
+        return
+
+
+class Test(unittest.TestCase):
+    table_path = "tests/data_1m_120_rows.csv"
+
+    @staticmethod
+    def __get_message(open_t: int, is_closed: bool = True) -> dict:
+        """
+        Stream kline event with the same values as in fake exchange
+        :param open_t: candle open time in ms
+        :param is_closed: candle close flag
+        """
+        _, rows = FakeExchange.klines({
+            'symbol': 'BTCUSDT',
+            'interval': '1m',
+            'startTime': str(open_t),
+            'limit': '1',
+        })
+        row = rows[0]
+        return {
+            'e': 'kline',
+            's': 'BTCUSDT',
+            'k': {
+                't': row[0],
+                'T': row[6],
+                'o': row[1],
+                'c': row[4],
+                'h': row[2],
+                'l': row[3],
+                'v': row[5],
+                'q': row[7],
+                'x': is_closed,
+            },
+        }
+
+    def test_replay(self):
+        """Checks candles order, gaps filling and rolling window"""
+        table = pd.read_csv(self.table_path)
+        feed = ReplayFeed(table, 20, missed_rows=[25, 26, 119])
+        window = feed.start()
+        self.assertTrue(feed.is_running)
+        self.assertEqual(window.shape[0], 20)
+        self.assertEqual(window['Next Close'].iloc[-1], table['Close'][19])
+
+        num_rows = 20
+        while True:
+            candles = feed.next()
+            if candles.shape[0] == 0:
+                break
+            self.assertEqual(
+                candles['Close'].iloc[0],
+                table['Close'][num_rows],
+            )
+            num_rows += candles.shape[0]
+            # window is moved and previous last candle gets its next close
+            self.assertEqual(feed.table.shape[0], 20)
+            self.assertEqual(
+                list(feed.table['Close']),
+                list(table['Close'][num_rows - 20: num_rows]),
+            )
+            self.assertEqual(
+                feed.table['Next Close'].iloc[-2],
+                table['Close'][num_rows - 1],
+            )
+            if num_rows == 28:
+                self.assertEqual(candles.shape[0], 3)
+        # the last missed candle can not be found by the next one
+        self.assertEqual(num_rows, 119)
+        self.assertFalse(feed.is_running)
+
+    def test_resize(self):
+        """Checks rolling window growing by history and shrinking"""
+        table = pd.read_csv(self.table_path)
+        feed = ReplayFeed(table, 20)
+        feed.start()
+        for _ in range(30):
+            feed.next()
+        feed.resize(40)
+        self.assertEqual(
+            list(feed.table['Close']),
+            list(table['Close'][10:50]),
+        )
+        self.assertEqual(feed.table['Next Close'].iloc[0], table['Close'][11])
+        feed.next()
+        self.assertEqual(feed.table.shape[0], 40)
+        feed.resize(10)
+        self.assertEqual(
+            list(feed.table['Close']),
+            list(table['Close'][41:51]),
+        )
+
+    @patch('bot.market_feed.datetime')
+    @patch('bot.market_feed.websocket.create_connection',
+           side_effect=FakeConnection)
+    def test_websocket(self, connection_mock, now_mock):
+        """Checks stream candles, reconnects and REST gaps filling"""
+        now_mock.utcnow.return_value = parse_dt("2023-01-20T00:00:10")
+        start_t = 1674172800000
+        minute = 60000
+        FakeConnection.num_connections = 0
+        FakeConnection.scripts = [
+            [
+                self.__get_message(start_t, is_closed=False),
+                self.__get_message(start_t),
+                None,
+            ],
+            [
+                self.__get_message(start_t + minute),
+                self.__get_message(start_t + 3 * minute, is_closed=False),
+                self.__get_message(start_t + 3 * minute),
+            ],
+        ]
+
+        with FakeExchange() as exchange:
+            parser = Parser(
+                'BTCUSDT',
+                '1m',
+                ignore_gaps=True,
+                base_url=exchange.url,
+            )
+            feed = WebSocketFeed(
+                'BTCUSDT',
+                '1m',
+                10,
+                reconnect_delay=0,
+                parser=parser,
+            )
+            self.assertEqual(
+                feed.url,
+                "wss://stream.binance.com:9443/ws/btcusdt@kline_1m",
+            )
+            window = feed.start()
+            self.assertEqual(window.shape[0], 10)
+            self.assertEqual(
+                window['Open time'].iloc[-1],
+                pd.Timestamp(start_t - minute, unit='ms'),
+            )
+
+            num_rows = 0
+            while num_rows < 4:
+                candles = feed.next(timeout=5)
+                self.assertGreater(candles.shape[0], 0)
+                num_rows += candles.shape[0]
+            self.assertEqual(num_rows, 4)
+            # only not closed candles are left
+            self.assertEqual(feed.next(timeout=0.1).shape[0], 0)
+            feed.close()
+            self.assertGreaterEqual(FakeConnection.num_connections, 2)
+
+            # stream and history candles are the same
+            assert_frame_equal(
+                feed.table,
+                parser.get_table("2023-01-19T23:54:00", 10),
+            )
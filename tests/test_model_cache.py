@@ -0,0 +1,222 @@
+import joblib
+import json
+import numpy as np
+import os
+import pandas as pd
+import unittest
+
+from concurrent.futures import ThreadPoolExecutor
+from sklearn.linear_model import SGDRegressor
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+from bot.feature_cache import FeatureCache
+from bot.indicators import Indicators
+from bot.model_cache import ModelCache
+from bot.settings import Settings
+from bot.strategist import SGD_Strategy
+
+
+class Test(unittest.TestCase):
+    table_path = "tests/data_1m_120_rows.csv"
+
+    def test_cache(self):
+        """Checks keys, loading and eviction"""
+        table = pd.read_csv(self.table_path)
+        key = ModelCache.get_key(table, {'window': 12})
+        self.assertEqual(key, ModelCache.get_key(table.copy(), {'window': 12}))
+        self.assertNotEqual(key, ModelCache.get_key(table, {'window': 10}))
+        changed = table.copy()
+        changed.loc[5, 'Close'] += 1
+        self.assertNotEqual(key, ModelCache.get_key(changed, {'window': 12}))
+
+        with TemporaryDirectory() as tmp_dir:
+            cache = ModelCache(tmp_dir, max_entries=2)
+            self.assertIsNone(cache.load('SGD', key))
+            cache.save('SGD', key, {'model': 1})
+            self.assertEqual(cache.load('SGD', key), {'model': 1})
+
+            cache.save('SGD', 'second', 2)
+            cache.save('ADI', 'other', 3)
+            # first entry is used and second one is evicted
+            self.assertEqual(cache.load('SGD', key), {'model': 1})
+            cache.save('SGD', 'third', 3)
+            self.assertIsNone(cache.load('SGD', 'second'))
+            self.assertEqual(cache.load('SGD', key), {'model': 1})
+            self.assertEqual(cache.load('ADI', 'other'), 3)
+
+            cache.clear('SGD')
+            self.assertIsNone(cache.load('SGD', key))
+            self.assertEqual(os.listdir(tmp_dir), ['ADI_other.joblib'])
+
+            # the same entry is saved by several workers at once
+            with ThreadPoolExecutor(8) as executor:
+                list(executor.map(
+                    lambda i: cache.save('SGD', key, {'model': i % 2}),
+                    range(32),
+                ))
+            self.assertIn(cache.load('SGD', key), [{'model': 0}, {'model': 1}])
+            self.assertEqual(
+                sorted(os.listdir(tmp_dir)),
+                ['ADI_other.joblib', f'SGD_{key}.joblib'],
+            )
+
+    def test_SGD_cache(self):
+        """Checks that SGD is fitted once"""
+        table = pd.read_csv(self.table_path)
+        fit_table = pd.concat([table] * 170, ignore_index=True)
+        with TemporaryDirectory() as tmp_dir, \
+                TemporaryDirectory() as features_dir, \
+                patch('bot.strategist.load_table', return_value=fit_table), \
+                patch(
+                    'bot.strategist.FeatureCache.from_settings',
+                    return_value=FeatureCache(features_dir),
+                ), \
+                patch.object(
+                    Indicators,
+                    'calc_indicators',
+                    autospec=True,
+                    side_effect=Indicators.calc_indicators,
+                ) as ind, \
+                patch('bot.strategist.SGDRegressor', wraps=SGDRegressor) \
+                as model:
+            params = {'cache_dir': tmp_dir}
+            first = SGD_Strategy(params)
+            second = SGD_Strategy(params)
+            # model is created for cache key and for every fit
+            self.assertEqual(model.call_count, 3)
+            assert np.array_equal(first.model.coef_, second.model.coef_)
+
+            SGD_Strategy(params, refit=True)
+            self.assertEqual(model.call_count, 5)
+            SGD_Strategy({**params, 'model_params': {'alpha': 0.01}})
+            self.assertEqual(model.call_count, 7)
+            self.assertEqual(len(os.listdir(tmp_dir)), 2)
+            # indicators are calculated once for all the fits
+            self.assertEqual(ind.call_count, 1)
+            self.assertEqual(len(os.listdir(features_dir)), 1)
+
+    def test_SGD_online(self):
+        """Checks online learning and warm start"""
+        table = pd.read_csv(self.table_path)
+        fit_table = pd.concat([table] * 170, ignore_index=True)
+        Indicators(12).calc_indicators(table)
+        # first rows without indicators are not learned
+        table = table.iloc[12 * 4:].reset_index(drop=True)
+        with TemporaryDirectory() as tmp_dir, \
+                patch('bot.strategist.load_table', return_value=fit_table), \
+                patch(
+                    'bot.strategist.FeatureCache.from_settings',
+                    return_value=FeatureCache(tmp_dir + '/features'),
+                ):
+            params = {
+                'cache_dir': tmp_dir,
+                'checkpoint_file': tmp_dir + '/checkpoints/SGD.joblib',
+                'checkpoint_friq': 2,
+                'online_learning': True,
+                'update_friq': 1,
+                'update_time_budget': 10,
+            }
+            strategy = SGD_Strategy(params)
+            coef = strategy.model.coef_.copy()
+            num_samples = strategy.scaler.n_samples_seen_
+
+            strategy.update(table.iloc[:40])
+            # the last row is not labelled yet
+            self.assertEqual(strategy.scaler.n_samples_seen_, num_samples + 39)
+            self.assertFalse(np.array_equal(coef, strategy.model.coef_))
+            self.assertFalse(os.path.exists(params['checkpoint_file']))
+
+            # only new labelled rows are learned
+            strategy.update(table.iloc[30:50])
+            self.assertEqual(strategy.scaler.n_samples_seen_, num_samples + 49)
+            self.assertTrue(os.path.exists(params['checkpoint_file']))
+
+            # warm start from checkpoint
+            restored = SGD_Strategy(params)
+            assert np.array_equal(restored.model.coef_, strategy.model.coef_)
+            restored.update(table.iloc[40:60])
+            self.assertEqual(restored.scaler.n_samples_seen_, num_samples + 59)
+
+            # no model learning and checkpoints without time budget
+            strategy = SGD_Strategy(
+                {**params, 'update_time_budget': 0, 'checkpoint_friq': 1},
+                refit=True,
+            )
+            coef = strategy.model.coef_.copy()
+            strategy.update(table.iloc[:40])
+            assert np.array_equal(coef, strategy.model.coef_)
+            self.assertFalse(os.path.exists(params['checkpoint_file']))
+
+            # checkpoint after spent budget is saved by the next update
+            strategy = SGD_Strategy({**params, 'checkpoint_friq': 1})
+            with patch(
+                'bot.strategist.perf_counter',
+                side_effect=[0, 0, 0, 100],
+            ):
+                strategy.update(table.iloc[:40])
+            self.assertFalse(os.path.exists(params['checkpoint_file']))
+            strategy.update(table.iloc[40:41])
+            self.assertTrue(os.path.exists(params['checkpoint_file']))
+            os.remove(params['checkpoint_file'])
+
+            # replay buffer keeps the last rows from the oldest one
+            strategy = SGD_Strategy(
+                {**params, 'checkpoint_friq': 1, 'replay_size': 16},
+            )
+            strategy.update(table.iloc[:30])
+            strategy.update(table.iloc[20:50])
+            replay_x, replay_y = joblib.load(
+                params['checkpoint_file'],
+            )['replay']
+            close = table['Close'].to_numpy()
+            np.testing.assert_allclose(
+                replay_y,
+                (close[34:50] - close[33:49]) / close[33:49],
+            )
+            np.testing.assert_array_equal(
+                replay_x[:, list(table.columns).index('Close')],
+                close[33:49],
+            )
+
+    def test_SGD_checkpoint_key(self):
+        """Checks that checkpoint of other models is not loaded"""
+        table = pd.read_csv(self.table_path)
+        fit_table = pd.concat([table] * 170, ignore_index=True)
+        Indicators(12).calc_indicators(table)
+        table = table.iloc[12 * 4:].reset_index(drop=True)
+        with TemporaryDirectory() as tmp_dir, \
+                patch('bot.strategist.load_table', return_value=fit_table), \
+                patch(
+                    'bot.strategist.FeatureCache.from_settings',
+                    return_value=FeatureCache(tmp_dir + '/features'),
+                ):
+            params = {
+                'cache_dir': tmp_dir,
+                'checkpoint_file': tmp_dir + '/checkpoints/SGD.joblib',
+                'checkpoint_friq': 1,
+                'online_learning': True,
+                'update_friq': 1,
+                'update_time_budget': 10,
+            }
+            strategy = SGD_Strategy(params)
+            strategy.update(table.iloc[:40])
+            self.assertTrue(os.path.exists(params['checkpoint_file']))
+
+            # indicators are changed in settings
+            with open('settings.json', 'r') as f:
+                settings = json.load(f)
+            settings['trader']['indicators'] = ['CCI', 'RSI']
+            settings_path = tmp_dir + '/settings.json'
+            with open(settings_path, 'w') as f:
+                json.dump(settings, f)
+            with patch(
+                'bot.strategist.Settings.get',
+                return_value=Settings(settings_path),
+            ):
+                changed = SGD_Strategy(params)
+            self.assertNotEqual(
+                changed.scaler.n_features_in_,
+                strategy.scaler.n_features_in_,
+            )
+            self.assertFalse(os.path.exists(params['checkpoint_file']))
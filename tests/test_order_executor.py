@@ -0,0 +1,141 @@
+import unittest
+
+from binance.error import ClientError
+from binance.spot import Spot
+
+from bot.ledger import Ledger
+from bot.order_executor import OrderExecutor
+
+from fake_exchange import FakeExchange
+
+
+class Test(unittest.TestCase):
+    def test_latency(self):
+        """Checks latencies and fills of orders sent to local exchange"""
+        with FakeExchange(latency=0.02) as exchange:
+            client = Spot('key', 'secret', base_url=exchange.url)
+            executor = OrderExecutor(client, num_workers=2)
+            orders = []
+            futures = [
+                executor.submit(
+                    'BTCUSDT',
+                    'BUY',
+                    callback=orders.append,
+                    type='MARKET',
+                    quoteOrderQty=100,
+                    newOrderRespType='FULL',
+                )
+                for _ in range(10)
+            ]
+            executor.wait()
+            executor.close()
+            # closed executor starts new workers
+            executor.submit(
+                'BTCUSDT',
+                'BUY',
+                type='MARKET',
+                quoteOrderQty=100,
+            ).result()
+            executor.close()
+
+        self.assertEqual(len(exchange.orders), 11)
+        self.assertEqual(len(orders), 10)
+        # client order ids are unique
+        self.assertEqual(
+            len(set(order['clientOrderId'] for order in orders)),
+            10,
+        )
+        for future in futures:
+            self.assertEqual(future.result()['executedQty'], '1.00000000')
+        # two orders are sent at the same time
+        self.assertEqual(exchange.max_active, 2)
+
+        latencies = executor.latency_percentiles([0, 50, 100])
+        self.assertGreaterEqual(latencies['submit_to_ack'][0], 20)
+        # the last orders wait for workers
+        self.assertGreater(
+            latencies['signal_to_submit'][100],
+            latencies['signal_to_submit'][0],
+        )
+
+    def test_retry(self):
+        """Checks that order with lost answer is sent once"""
+        with FakeExchange() as exchange:
+            client = Spot('key', 'secret', base_url=exchange.url)
+            ledger = Ledger(client)
+            executor = OrderExecutor(client, retry_delay=0)
+            exchange.lost_answers = 1
+            future = executor.submit(
+                'BTCUSDT',
+                'SELL',
+                callback=lambda order: ledger.apply_order(
+                    order,
+                    'BTC',
+                    'USDT',
+                ),
+                type='MARKET',
+                quantity=0.5,
+                newOrderRespType='FULL',
+                newClientOrderId='test_retry',
+            )
+            executor.wait()
+
+            self.assertEqual(list(exchange.orders), ['test_retry'])
+            self.assertEqual(future.result()['clientOrderId'], 'test_retry')
+            self.assertEqual(future.result()['status'], 'FILLED')
+            # fills of found order are unknown
+            self.assertTrue(ledger.is_drifted)
+
+            # the same id is not accepted again
+            executor.submit(
+                'BTCUSDT',
+                'SELL',
+                type='MARKET',
+                quantity=0.5,
+                newClientOrderId='test_retry',
+            )
+            self.assertRaises(ClientError, executor.wait)
+            executor.close()
+
+    def test_retry_rejections(self):
+        """Checks duplicate and other rejections of retried orders"""
+        with FakeExchange() as exchange:
+            client = Spot('key', 'secret', base_url=exchange.url)
+            executor = OrderExecutor(client, retry_delay=0)
+
+            # order is not seen by query, but it is accepted
+            exchange.lost_answers = 1
+            exchange.unseen_queries = 1
+            future = executor.submit(
+                'BTCUSDT',
+                'BUY',
+                type='MARKET',
+                quoteOrderQty=100,
+                newClientOrderId='test_duplicate',
+            )
+            executor.wait()
+            self.assertEqual(list(exchange.orders), ['test_duplicate'])
+            self.assertEqual(
+                future.result()['clientOrderId'],
+                'test_duplicate',
+            )
+
+            # order is lost and then rejected by balance
+            exchange.lost_requests = 1
+            exchange.rejected_orders = 1
+            executor.submit(
+                'BTCUSDT',
+                'BUY',
+                type='MARKET',
+                quoteOrderQty=100,
+                newClientOrderId='test_balance',
+            )
+            with self.assertRaises(ClientError) as context:
+                executor.wait()
+            self.assertEqual(context.exception.error_code, -2010)
+            self.assertIn(
+                'insufficient balance',
+                context.exception.error_message,
+            )
+            self.assertEqual(list(exchange.orders), ['test_duplicate'])
+            executor.close()
@@ -0,0 +1,165 @@
+import json
+import numpy as np
+import os
+import pandas as pd
+import unittest
+
+from unittest.mock import patch
+
+from bot.log_writer import get_log_writer
+from bot.market_feed import ReplayFeed
+from bot.order_executor import OrderExecutor
+from bot.portfolio import Portfolio
+
+
+class Test(unittest.TestCase):
+    settings_file = 'tests/settings_for_test.json'
+
+    class __Mocked_Spot:
+        """Spot mock counting balance and symbol filters queries"""
+        num_balance_queries = 0
+        num_info_queries = 0
+
+        def __init__(self, *args, **kwargs):
+            return
+
+        def exchange_info(
+            self,
+            symbol: str = None,
+            symbols: list = None,
+        ) -> dict:
+            type(self).num_info_queries += 1
+            return {
+                'symbols': [
+                    {
+                        'symbol': symb,
+                        'filters': [
+                            {
+                                'filterType': 'LOT_SIZE',
+                                'stepSize': 0.000001,
+                                'minQty': 0,
+                            },
+                            {
+                                'filterType': 'NOTIONAL',
+                                'minNotional': 0,
+                            }
+                        ]
+                    }
+                    for symb in (symbols or [symbol])
+                ]
+            }
+
+        def user_asset(self, *args, **kwargs) -> dict:
+            type(self).num_balance_queries += 1
+            return [
+                {
+                    'asset': 'BTC',
+                    'free': 1,
+                },
+                {
+                    'asset': 'ETH',
+                    'free': 10,
+                },
+                {
+                    'asset': 'USDT',
+                    'free': 1000,
+                }
+            ]
+
+        def new_order(self, *args, **kwargs) -> None:
+            return
+
+    def __mocked_Strategy(*args, **kwargs):
+        """Function to mock Strategy buying first asset on every candle"""
+        class Strategy:
+            def predict(self, *args, **kwargs) -> float:
+                return -0.9
+
+            def update(self, *args, **kwargs) -> None:
+                return
+
+        return Strategy()
+
+    @staticmethod
+    def __get_replay_table(num_rows: int) -> pd.DataFrame:
+        """Test candles repeated with consecutive times"""
+        table = pd.read_csv("tests/data_1m_120_rows.csv")
+        table = pd.concat(
+            [table] * (num_rows // table.shape[0] + 1),
+            ignore_index=True,
+        ).iloc[:num_rows]
+        open_time = pd.Timestamp("2023-05-23T08:56:00") + \
+            pd.to_timedelta(np.arange(num_rows), unit='min')
+        table['Open time'] = open_time
+        table['Close time'] = open_time + pd.Timedelta(59999, unit='ms')
+        table['Middle time'] = open_time + pd.Timedelta(29999, unit='ms')
+        return table
+
+    @patch('bot.portfolio.Spot', new=__Mocked_Spot)
+    def test_trade(self):
+        """Checks trading of several symbols with shared balances"""
+        with open(self.settings_file, 'r') as f:
+            settings = json.load(f)['trader']
+        num_stored_rows = settings['num_stored_rows']
+        table = self.__get_replay_table(num_stored_rows + 100)
+        feeds = {
+            'BTCUSDT': ReplayFeed(table, num_stored_rows, 'BTCUSDT'),
+            # the shorter feed stops earlier
+            'ETHUSDT': ReplayFeed(
+                table.iloc[:-50],
+                num_stored_rows,
+                'ETHUSDT',
+            ),
+        }
+        self.__Mocked_Spot.num_balance_queries = 0
+        self.__Mocked_Spot.num_info_queries = 0
+
+        with patch.object(self.__Mocked_Spot, 'new_order') as new_order, \
+                patch.object(
+                    OrderExecutor,
+                    'close',
+                    autospec=True,
+                    side_effect=OrderExecutor.close,
+                ) as close, \
+                patch(
+                    'bot.trader.get_strategy',
+                    side_effect=self.__mocked_Strategy,
+                ) as get_strategy:
+            portfolio = Portfolio(
+                '',
+                '',
+                settings_file_path=self.settings_file,
+                feeds=feeds,
+            )
+            portfolio.trade()
+            # shared executor is closed once when trading stops
+            close.assert_called_once()
+            for feed in feeds.values():
+                self.assertFalse(feed.is_running)
+
+            # balances are queried once for all the symbols
+            self.assertEqual(self.__Mocked_Spot.num_balance_queries, 101)
+            # filters of all the symbols are loaded by one query
+            self.assertEqual(self.__Mocked_Spot.num_info_queries, 1)
+            calls = {'BTCUSDT': [], 'ETHUSDT': []}
+            for call in new_order.call_args_list:
+                calls[call.kwargs['symbol']].append(call.kwargs)
+            self.assertEqual(len(calls['BTCUSDT']), 100)
+            self.assertEqual(len(calls['ETHUSDT']), 50)
+            # USDT is split between symbols by weights 1 and 3
+            for call_kwargs in calls['BTCUSDT']:
+                self.assertEqual(call_kwargs['side'], 'BUY')
+                self.assertEqual(call_kwargs['quoteOrderQty'], 222.75)
+            for call_kwargs in calls['ETHUSDT']:
+                self.assertEqual(call_kwargs['side'], 'BUY')
+                self.assertEqual(call_kwargs['quoteOrderQty'], 668.25)
+
+        # every symbol has its own strategy
+        self.assertEqual(
+            sorted(call.args[0] for call in get_strategy.call_args_list),
+            ['CCI', 'SGD'],
+        )
+
+        # queued records are written before removing
+        get_log_writer(settings["log_file"]).flush()
+        os.remove(settings["log_file"])
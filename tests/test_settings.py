@@ -0,0 +1,94 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from bot.exceptions import SettingsError
+from bot.settings import Settings
+
+
+class Test(unittest.TestCase):
+    settings_file = 'tests/settings_for_test.json'
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'settings.json')
+        shutil.copy(self.settings_file, self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def __edit(self, section: str, **params) -> None:
+        """
+        Changes settings file params
+        :param section: section name
+        :param params: new params values
+        """
+        with open(self.path, 'r') as f:
+            settings = json.load(f)
+        settings[section].update(params)
+        # new file has new inode
+        with open(self.path + '.tmp', 'w') as f:
+            json.dump(settings, f)
+        os.replace(self.path + '.tmp', self.path)
+
+    def test_reload(self):
+        """Checks reloading by file changes and subscribers"""
+        settings = Settings(self.path)
+        changes = []
+        settings.subscribe(
+            'trader',
+            lambda name, values: changes.append((name, values)),
+        )
+        self.assertFalse(settings.check())
+        self.assertEqual(settings.section('trader')['indicator_window'], 12)
+
+        # only changed sections are notified
+        self.__edit('trader', indicator_window=24)
+        self.__edit('parser', batch_size=500)
+        self.assertEqual(settings.section('trader')['indicator_window'], 24)
+        self.assertEqual(len(changes), 1)
+        self.assertEqual(changes[0][0], 'trader')
+        self.assertEqual(changes[0][1]['indicator_window'], 24)
+        self.assertEqual(settings.section('parser')['batch_size'], 500)
+
+        # sections are copies
+        settings.section('trader')['indicator_window'] = 0
+        self.assertEqual(settings.section('trader')['indicator_window'], 24)
+
+    def test_validation(self):
+        """Checks that wrong files are not applied"""
+        settings = Settings(self.path)
+        self.__edit('trader', indicator_window="12")
+        self.assertEqual(settings.section('trader')['indicator_window'], 12)
+        self.assertIsInstance(settings.error, SettingsError)
+
+        with open(self.path, 'a') as f:
+            f.write('{')
+        self.assertFalse(settings.check())
+        self.assertRaises(SettingsError, Settings, self.path)
+
+        shutil.copy(self.settings_file, self.path)
+        self.__edit('trader', indicator_window=6)
+        self.assertTrue(settings.check())
+        self.assertIsNone(settings.error)
+        self.assertEqual(settings.section('trader')['indicator_window'], 6)
+
+    def test_weak_subscriber(self):
+        """Checks that methods of deleted objects are not called"""
+        class Subscriber:
+            num_calls = 0
+
+            def on_change(self, name: str, values: dict) -> None:
+                Subscriber.num_calls += 1
+
+        settings = Settings(self.path)
+        subscriber = Subscriber()
+        settings.subscribe('trader', subscriber.on_change)
+        self.__edit('trader', indicator_window=24)
+        settings.check()
+        del subscriber
+        self.__edit('trader', indicator_window=6)
+        settings.check()
+        self.assertEqual(Subscriber.num_calls, 1)
@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+import unittest
+
+from bot.simulator import Simulator
+from bot.strategist import Strategy
+
+
+class Test(unittest.TestCase):
+
+    class __Fixed_Strategy(Strategy):
+        """Strategy with given predictions"""
+        window = 3
+
+        def __init__(self, predictions: np.ndarray):
+            self.predictions = predictions
+
+        def predict_series(self, table: pd.DataFrame) -> np.ndarray:
+            return self.predictions
+
+    @staticmethod
+    def __simulate_rows(
+        prices: np.ndarray,
+        predictions: np.ndarray,
+        money: float,
+        commission: float,
+        withdrawal_coef: float,
+    ) -> np.ndarray:
+        """Row by row account simulation"""
+        free, amount, income = money, 0.0, 0.0
+        equity = []
+        for i, price in enumerate(prices):
+            if i > 0 and price > prices[i - 1]:
+                bonus = amount * (price - prices[i - 1]) * withdrawal_coef
+                amount -= bonus / price
+                income += bonus * (1 - commission)
+            if predictions[i] > 0:
+                sold = predictions[i] * amount
+                amount -= sold
+                free += sold * price * (1 - commission)
+            elif predictions[i] < 0:
+                spent = -predictions[i] * free
+                free -= spent
+                amount += spent * (1 - commission) / price
+            equity.append(free + amount * price + income)
+        return np.array(equity)
+
+    def test_simulate(self):
+        """Checks equity curve with row by row simulation"""
+        rng = np.random.default_rng(0)
+        num_rows = 1000
+        prices = 100 * np.exp(np.cumsum(rng.normal(0, 1e-2, num_rows)))
+        predictions = np.round(rng.uniform(-1, 1, num_rows), 1)
+        predictions[rng.uniform(size=num_rows) < 0.7] = 0
+        table = pd.DataFrame({'Close': prices})
+
+        for withdrawal_coef in [0, 0.2]:
+            equity = Simulator(
+                table,
+                self.__Fixed_Strategy(predictions.copy()),
+                money=1000,
+                commission=1e-3,
+                withdrawal_coef=withdrawal_coef,
+            ).simulate()
+            expected_predictions = predictions.copy()
+            expected_predictions[:2] = 0
+            expected = self.__simulate_rows(
+                prices,
+                expected_predictions,
+                1000,
+                1e-3,
+                withdrawal_coef,
+            )
+            self.assertEqual(equity.shape, (num_rows,))
+            np.testing.assert_allclose(equity, expected, rtol=1e-9)
+
+    def test_no_orders(self):
+        """Checks equity without orders and all in first asset"""
+        prices = np.array([10, 11, 9, 12, 15, 14], dtype=float)
+        table = pd.DataFrame({'Close': prices})
+
+        equity = Simulator(
+            table,
+            self.__Fixed_Strategy(np.zeros(6)),
+            money=500,
+        ).simulate()
+        np.testing.assert_array_equal(equity, np.full(6, 500))
+
+        predictions = np.array([0, 0, -1, 0, 0, 0], dtype=float)
+        equity = Simulator(
+            table,
+            self.__Fixed_Strategy(predictions),
+            money=900,
+            commission=0,
+        ).simulate()
+        np.testing.assert_allclose(equity[2:], prices[2:] * 100)
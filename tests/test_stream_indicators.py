@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import unittest
+
+from bot.indicators import Indicators
+from bot.stream_indicators import StreamIndicators
+
+
+class Test(unittest.TestCase):
+    table_path = "tests/data_1m_120_rows.csv"
+
+    def test_parity(self):
+        """Checks that stream values are the same as batch ones"""
+        table = pd.read_csv(self.table_path)
+        for window in [2, 5, 12]:
+            for mode, obv_mode in [
+                ("truncated", "window"),
+                ("infinite", "cumulative"),
+            ]:
+                expected = table.copy()
+                Indicators(window, mode, obv_mode).calc_indicators(expected)
+                stream = StreamIndicators(
+                    window,
+                    ema_mode=mode,
+                    obv_mode=obv_mode,
+                )
+                for _, row in table.iterrows():
+                    stream.update(row)
+                result = stream.table
+
+                self.assertEqual(list(result.columns), list(expected.columns))
+                for col in set(expected.columns).difference(table.columns):
+                    assert np.array_equal(
+                        result[col].to_numpy(float),
+                        expected[col].to_numpy(float),
+                        equal_nan=True,
+                    ), f"{col} differs, {window}, {mode}, {obv_mode}"
+
+    def test_update_table(self):
+        """Checks adding only new rows and stored rows limit"""
+        table = pd.read_csv(self.table_path)
+        stream = StreamIndicators(indicators=['CCI'], num_stored_rows=50)
+        self.assertEqual(stream.update_table(table.iloc[:100]), 100)
+        self.assertEqual(stream.update_table(table.iloc[90:110]), 10)
+        self.assertEqual(stream.num_rows, 110)
+        self.assertTrue(stream.is_ready)
+        self.assertEqual(stream.table.shape[0], 50)
+        self.assertEqual(
+            stream.table['Open time'].iloc[-1],
+            table['Open time'].iloc[109],
+        )
+
+        expected = table.iloc[:110].copy()
+        Indicators().calc_indicators(expected, ['CCI'])
+        assert np.array_equal(
+            stream.table['CCI'].to_numpy(),
+            expected['CCI'].iloc[-50:].to_numpy(),
+        )
@@ -0,0 +1,61 @@
+import pandas as pd
+import unittest
+
+from bot.analyzer import Analyzer
+from bot.indicators import Indicators
+from bot.sweeper import Sweeper
+
+
+class Test(unittest.TestCase):
+    table_path = "tests/data_1m_120_rows.csv"
+
+    def test_grid(self):
+        """Checks grid results with direct Analyzer runs"""
+        table = pd.read_csv(self.table_path)
+        space = {
+            'indicator_window': [3, 5],
+            'CCI_min': [-100, -50],
+            'CCI_max': [50],
+            'commission': [1e-3],
+        }
+        results = Sweeper(table, "CCI", num_workers=2).grid(space)
+        self.assertEqual(results.shape[0], 4)
+        self.assertTrue(results['total_profit'].is_monotonic_decreasing)
+
+        for _, row in results.iterrows():
+            expected_table = table.copy()
+            Indicators(int(row['indicator_window'])).calc_indicators(
+                expected_table
+            )
+            expected_table = expected_table.drop(
+                columns=['Next Close', 'Close Delta']
+            ).iloc[5 * 4:].reset_index(drop=True)
+            expected = Analyzer().analyze(
+                expected_table,
+                "CCI",
+                row['commission'],
+                strategy_params={
+                    'CCI_min': row['CCI_min'],
+                    'CCI_max': row['CCI_max'],
+                },
+            )
+            for metric, value in expected.items():
+                self.assertAlmostEqual(row[metric], value, msg=metric)
+
+    def test_random(self):
+        """Checks random search params"""
+        table = pd.read_csv(self.table_path)
+        results = Sweeper(table, "CCI", num_workers=2).random(
+            {
+                'indicator_window': (3, 6),
+                'CCI_min': (-150.0, -50.0),
+                'CCI_max': [50, 100],
+            },
+            num_iter=5,
+            rank_by='avg_profit',
+        )
+        self.assertEqual(results.shape[0], 5)
+        self.assertTrue(results['avg_profit'].is_monotonic_decreasing)
+        self.assertTrue(results['indicator_window'].between(3, 6).all())
+        self.assertTrue(results['CCI_min'].between(-150, -50).all())
+        self.assertTrue(results['CCI_max'].isin([50, 100]).all())
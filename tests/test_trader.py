@@ -1,47 +1,39 @@
 import json
+import numpy as np
 import os
 import pandas as pd
+import shutil
+import tempfile
 import unittest
 
-from datetime import timedelta
-from dateutil.parser import parse as parse_dt
 from unittest.mock import patch
 
+from bot.log_writer import get_log_writer
+from bot.market_feed import ReplayFeed
+from bot.order_executor import OrderExecutor
 from bot.trader import Trader
 
 
-class TestEnd(Exception):
-    pass
-
-
 class Test(unittest.TestCase):
     settings_file = 'tests/settings_for_test.json'
 
-    def __mocked_Indicators(*args, **kwargs):
-        """Function to mock Indicators"""
-        class Indicators:
-            def calc_indicators(self, *args, **kwargs) -> None:
-                return
-
-        return Indicators()
-
-    def __mocked_Parser(*args, **kwargs):
-        """Function to mock Parser"""
-        class Parser:
-            def get_table(self, *args, **kwargs) -> pd.DataFrame:
-                return pd.read_csv("tests/data_1m_120_rows.csv")
-
-        return Parser()
-
     class __Mocked_Spot:
         """Spot mock"""
+        num_info_queries = 0
+
         def __init__(self, *args, **kwargs):
             return
 
-        def exchange_info(self, *args, **kwargs) -> dict:
+        def exchange_info(
+            self,
+            symbol: str = None,
+            symbols: list = None,
+        ) -> dict:
+            type(self).num_info_queries += 1
             return {
                 'symbols': [
                     {
+                        'symbol': symb,
                         'filters': [
                             {
                                 'filterType': 'LOT_SIZE',
@@ -54,6 +46,7 @@ class Test(unittest.TestCase):
                             }
                         ]
                     }
+                    for symb in (symbols or [symbol])
                 ]
             }
 
@@ -77,10 +70,13 @@ class Test(unittest.TestCase):
         class Strategy:
             row: int = 0
 
-            def predict(self, *args, **kwargs) -> float:
+            def __init__(self):
+                # open times of the last candles in predict tables
+                self.times = []
+
+            def predict(self, table, *args, **kwargs) -> float:
                 self.row += 1
-                if self.row > 2000:
-                    raise TestEnd("correct")
+                self.times.append(table.iloc[-1]['Open time'])
                 if self.row > 1000:
                     return 0
                 elif self.row > 500:
@@ -88,31 +84,67 @@ class Test(unittest.TestCase):
                 else:
                     return -0.9
 
+            def update(self, *args, **kwargs) -> None:
+                return
+
         return Strategy()
 
-    @patch('bot.trader.datetime')
-    @patch('bot.trader.wait_till')
-    @patch('bot.trader.Indicators', side_effect=__mocked_Indicators)
-    @patch('bot.trader.Parser', side_effect=__mocked_Parser)
-    @patch('bot.trader.get_strategy', side_effect=__mocked_Strategy)
+    @staticmethod
+    def __get_replay_table(num_rows: int) -> pd.DataFrame:
+        """Test candles repeated with consecutive times"""
+        table = pd.read_csv("tests/data_1m_120_rows.csv")
+        table = pd.concat(
+            [table] * (num_rows // table.shape[0] + 1),
+            ignore_index=True,
+        ).iloc[:num_rows]
+        open_time = pd.Timestamp("2023-05-23T08:56:00") + \
+            pd.to_timedelta(np.arange(num_rows), unit='min')
+        table['Open time'] = open_time
+        table['Close time'] = open_time + pd.Timedelta(59999, unit='ms')
+        table['Middle time'] = open_time + pd.Timedelta(29999, unit='ms')
+        return table
+
     @patch('bot.trader.Spot', new=__Mocked_Spot)
-    def test_trade(self, *args, **kwargs):
-        """Checks trading"""
-        args[4].now.return_value = parse_dt("2023-05-23T08:56:00")
+    def test_trade(self):
+        """Checks trading on replayed candles"""
         with open(self.settings_file, 'r') as f:
             settings = json.load(f)['trader']
+        num_stored_rows = settings['num_stored_rows']
+        table = self.__get_replay_table(num_stored_rows + 1200)
+        # lost stream candles are filled from history
+        feed = ReplayFeed(
+            table,
+            num_stored_rows,
+            missed_rows=[num_stored_rows + 10, num_stored_rows + 11],
+        )
 
-        with patch.object(self.__Mocked_Spot, 'new_order') as new_order:
-
-            trader = Trader('', '', settings_file_path=self.settings_file)
-            try:
-                trader.trade()
-            except TestEnd:
-                pass
-            except Exception:
-                raise
-            else:
-                raise "No test end"
+        strategy = self.__mocked_Strategy()
+        self.__Mocked_Spot.num_info_queries = 0
+
+        with patch.object(self.__Mocked_Spot, 'new_order') as new_order, \
+                patch.object(
+                    OrderExecutor,
+                    'close',
+                    autospec=True,
+                    side_effect=OrderExecutor.close,
+                ) as close, \
+                patch(
+                    'bot.trader.get_strategy',
+                    return_value=strategy,
+                ) as get_strategy:
+
+            trader = Trader(
+                '',
+                '',
+                settings_file_path=self.settings_file,
+                feed=feed,
+            )
+            trader.trade()
+            # own executor is closed when trading stops
+            close.assert_called_once()
+            self.assertFalse(feed.is_running)
+            # symbol filters are cached
+            self.assertEqual(self.__Mocked_Spot.num_info_queries, 1)
 
             # check new order calls
             self.assertEqual(len(new_order.call_args_list), 1000)
@@ -130,23 +162,89 @@ class Test(unittest.TestCase):
                 self.assertEqual(call_kwargs['side'], 'SELL')
 
         # check strategy creating
-        self.assertEqual(len(args[0].call_args_list), 1)
+        self.assertEqual(len(get_strategy.call_args_list), 1)
         self.assertEqual(
-            args[0].call_args_list[0].args[0],
+            get_strategy.call_args_list[0].args[0],
             settings["strategy"]
         )
-        # check parser creating
-        self.assertEqual(len(args[1].call_args_list), 1)
-        # check indicators creating
-        self.assertEqual(len(args[2].call_args_list), 1)
+        # check decisions on every candle close
+        times = pd.Series(strategy.times)
         self.assertEqual(
-            args[2].call_args_list[0].args[0],
-            settings["indicator_window"]
+            times.iloc[0],
+            table['Open time'].iloc[num_stored_rows],
         )
-        # check wait_till
-        priv_time = args[3].call_args_list[0].args[0] - timedelta(minutes=1)
-        for call in args[3].call_args_list:
-            self.assertEqual(call.args[0] - priv_time, timedelta(minutes=1))
-            priv_time = call.args[0]
+        self.assertEqual(times.iloc[-1], table['Open time'].iloc[-1])
+        # missed candles are passed together with the next one
+        self.assertEqual(times.shape[0], 1200 - 2)
+        self.assertEqual(times.diff().max(), pd.Timedelta(3, unit='min'))
 
+        # queued records are written before removing
+        get_log_writer(settings["log_file"]).flush()
         os.remove(settings["log_file"])
+
+    @patch('bot.trader.Spot', new=__Mocked_Spot)
+    def test_settings_reload(self):
+        """Checks strategy and indicators rebuilding by settings changes"""
+        settings_dir = tempfile.mkdtemp()
+        settings_file = os.path.join(settings_dir, 'settings.json')
+        with open(self.settings_file, 'r') as f:
+            settings = json.load(f)
+        with open(settings_file, 'w') as f:
+            json.dump(settings, f)
+        num_stored_rows = settings['trader']['num_stored_rows']
+        feed = ReplayFeed(
+            self.__get_replay_table(num_stored_rows + 40),
+            num_stored_rows,
+        )
+        # lengths of predict tables by strategies
+        lengths = []
+
+        def get_strategy(*args, **kwargs):
+            class Strategy:
+                def __init__(self):
+                    self.lengths = []
+                    lengths.append(self.lengths)
+
+                def predict(self, table, *args, **kwargs) -> float:
+                    self.lengths.append(table.shape[0])
+                    if len(lengths) == 1 and len(self.lengths) == 20:
+                        settings['trader']['strategy'] = 'SGD'
+                        settings['trader']['indicator_window'] = 6
+                        # feed window grows by history candles
+                        settings['trader']['num_stored_rows'] += 10
+                        with open(settings_file + '.tmp', 'w') as f:
+                            json.dump(settings, f)
+                        os.replace(settings_file + '.tmp', settings_file)
+                    return 0
+
+                def update(self, *args, **kwargs) -> None:
+                    return
+
+            return Strategy()
+
+        try:
+            with patch(
+                'bot.trader.get_strategy',
+                side_effect=get_strategy,
+            ) as get_strategy_mock:
+                Trader(
+                    '',
+                    '',
+                    settings_file_path=settings_file,
+                    feed=feed,
+                ).trade()
+        finally:
+            shutil.rmtree(settings_dir)
+
+        self.assertEqual(
+            [call.args[0] for call in get_strategy_mock.call_args_list],
+            ['CCI', 'SGD'],
+        )
+        # indicators with smaller window store more rows
+        self.assertEqual(len(lengths[0]), 20)
+        self.assertEqual(len(lengths[1]), 20)
+        self.assertEqual(set(lengths[0]), {num_stored_rows - 12 * 4})
+        self.assertEqual(set(lengths[1]), {num_stored_rows + 10 - 6 * 4})
+        get_log_writer(settings['trader']["log_file"]).flush()
+        os.remove(settings['trader']["log_file"])
+
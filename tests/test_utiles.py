@@ -1,11 +1,17 @@
+import numpy as np
+import pandas as pd
 import unittest
 
 from datetime import datetime
+from time import monotonic
 
-from bot.utiles import tf_to_minutes, time_to_int
+from bot.utiles import TokenBucket, int_to_times, tf_to_minutes
+from bot.utiles import time_to_int, times_to_int, times_to_str
 
 
 class Test(unittest.TestCase):
+    table_path = "tests/data_1m_120_rows.csv"
+
     def test_utiles(self):
         """tf_to_minutes check"""
         self.assertEqual(tf_to_minutes("123m"), 123)
@@ -21,3 +27,48 @@ class Test(unittest.TestCase):
             time_to_int(datetime(2020, 10, 11, 5, 2, 33)),
             1602392553000,
         )
+        self.assertEqual(
+            time_to_int(np.datetime64("2023-01-15T03:50:02.5")),
+            1673754602500,
+        )
+        self.assertEqual(time_to_int("Jan 15 2023 03:50:02"), 1673754602000)
+
+    def test_times(self):
+        """Checks vectorized time conversions with scalar ones"""
+        table = pd.read_csv(self.table_path)
+        for col in ['Open time', 'Close time', 'Middle time']:
+            expected = np.array([time_to_int(t) for t in table[col]])
+            result = times_to_int(table[col])
+            self.assertEqual(result.dtype, np.int64)
+            np.testing.assert_array_equal(result, expected, col)
+
+            times = int_to_times(result)
+            self.assertEqual(times.dtype, np.dtype('datetime64[ms]'))
+            np.testing.assert_array_equal(times_to_int(times), expected)
+            np.testing.assert_array_equal(
+                times_to_int(pd.Series(times)),
+                expected,
+            )
+            np.testing.assert_array_equal(
+                times_to_int(times_to_str(table[col])),
+                expected,
+            )
+            np.testing.assert_array_equal(times_to_int(result), expected)
+
+        self.assertEqual(
+            list(times_to_str(["2023-01-15 03:50:02.123"], 's')),
+            ['2023-01-15T03:50:02'],
+        )
+        np.testing.assert_array_equal(
+            times_to_int(["2023-01-15T06:50:02+03:00", "Jan 15 2023"]),
+            [1673754602000, 1673740800000],
+        )
+
+    def test_token_bucket(self):
+        """TokenBucket waits for refill"""
+        bucket = TokenBucket(4, refill_time=0.2)
+        start = monotonic()
+        for _ in range(6):
+            bucket.acquire(2)
+        # 4 tokens are available at once, 8 more take 0.4 seconds
+        self.assertGreater(monotonic() - start, 0.35)
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import unittest
+
+from bot.analyzer import Analyzer
+from bot.indicators import Indicators
+from bot.settings import Settings
+from bot.strategist import SGD_Strategy
+from bot.walk_forward import WalkForward
+
+
+class Test(unittest.TestCase):
+    table_path = "tests/data_1m_120_rows.csv"
+
+    def test_folds(self):
+        """Checks fold metrics with direct fit and analysis"""
+        table = pd.concat(
+            [pd.read_csv(self.table_path)] * 8,
+            ignore_index=True,
+        )
+        walk_forward = WalkForward(
+            table,
+            train_size=300,
+            test_size=100,
+            step=150,
+            num_workers=2,
+        )
+        # fixed seed to fit the same models
+        strategy_params = {'model_params': {'random_state': 0}}
+        results = walk_forward.run(1e-3, strategy_params)
+
+        settings = Settings.get().section('trader')
+        features = table.copy()
+        Indicators(settings['indicator_window']).calc_indicators(
+            features,
+            settings['indicators'],
+            drop_first=True,
+        )
+        num_folds = (features.shape[0] - 400) // 150 + 1
+        self.assertEqual(list(results['fold']), list(range(num_folds)))
+        self.assertEqual(
+            set(walk_forward.timing),
+            {'features', 'folds', 'fit', 'test'},
+        )
+
+        for _, row in results.iterrows():
+            start = row['fold'] * 150
+            strategy = SGD_Strategy(
+                strategy_params,
+                fit_table=features.iloc[start: start + 300],
+            )
+            test_table = features.iloc[start + 299: start + 400].drop(
+                columns=['Next Close', 'Close Delta'],
+            )
+            expected = Analyzer.get_result(
+                *Analyzer.calc_orders(
+                    np.asarray(strategy.predict_series(test_table))[1:],
+                    test_table['Close'].to_numpy(dtype=float)[1:],
+                ),
+                1e-3,
+            )
+            self.assertEqual(
+                row['test_start'],
+                pd.Timestamp(features['Open time'].iloc[start + 300]),
+            )
+            for metric, value in expected.items():
+                self.assertAlmostEqual(row[metric], value, msg=metric)